@@ -1,24 +1,194 @@
 """
 Ahrefs API client for getting search traffic data.
+
+Keyword and URL metrics are kept in a persistent TTL cache, and concurrent
+lookups of the same key share one in-flight request, since every API call
+spends plan units. Bulk lookups fan out over a bounded pool; calls are paced
+and retried by a RateLimitScheduler and short-circuited by a CircuitBreaker
+while Ahrefs is failing. Calls, latency, cache hits and unit spend are
+recorded in api_metrics (process-wide and per web request).
 """
+import json
 import requests
 import os
+import threading
+import time
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
-from typing import List, Dict, Optional
+from typing import Iterable, List, Dict, Optional
 from datetime import datetime, timedelta
+from api_metrics import ContextThreadPoolExecutor, registry
+from circuit_breaker import CircuitBreaker
+from http_replay import configure_session
+from rate_limiter import RateLimitScheduler, RateLimitTimeout
+from ttl_cache import TTLCache, cache_path
 
 load_dotenv()
 
 
+class _Flight:
+    """A request in progress that other callers for the same key wait on."""
+
+    __slots__ = ("done", "result")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[Dict] = None
+
+
 class AhrefsClient:
+    # Estimated API units per call, used for spend/savings accounting
+    UNITS_PER_CALL = {"keywords-explorer": 1, "url-metrics": 1}
+
     def __init__(self):
         """Initialize Ahrefs API client."""
         self.api_token = os.getenv("AHREFS_API_TOKEN")
-        self.base_url = "https://apiv2.ahrefs.com"
-        
+        self.base_url = os.getenv("AHREFS_BASE_URL", "https://apiv2.ahrefs.com").rstrip("/")
+
+        # Concurrent lookups in bulk calls (see get_keywords_metrics)
+        self.max_workers = int(os.getenv("AHREFS_MAX_WORKERS", "4"))
+
+        # Pooled keep-alive session (optionally record/replay, see http_replay)
+        self.http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=self.max_workers)
+        self.http.mount("https://", adapter)
+        self.http.mount("http://", adapter)
+        self.replay = configure_session(
+            self.http, pool_connections=2, pool_maxsize=self.max_workers
+        )
+
+        # Pacing plus jittered retries for 429/5xx and connection errors
+        self.rate_limiter = RateLimitScheduler(
+            rate=float(os.getenv("AHREFS_RATE_LIMIT_RPS", "5")),
+            burst=self.max_workers,
+            max_retries=int(os.getenv("AHREFS_MAX_RETRIES", "2")),
+            backoff_base=0.5,
+            backoff_max=10.0,
+            max_wait=float(os.getenv("AHREFS_MAX_WAIT", "10")),
+        )
+        # Stop calling (and waiting on timeouts) while Ahrefs keeps failing
+        self.breaker = CircuitBreaker(
+            failure_threshold=int(os.getenv("AHREFS_BREAKER_THRESHOLD", "5")),
+            reset_timeout=float(os.getenv("AHREFS_BREAKER_RESET", "60")),
+        )
+
+        # Metrics rarely change within days; cache them across processes
+        self.cache = TTLCache(
+            cache_path("ahrefs.sqlite3"),
+            namespace="ahrefs_metrics",
+            ttl=float(os.getenv("AHREFS_CACHE_TTL", str(7 * 86400))),
+            max_entries=int(os.getenv("AHREFS_CACHE_MAX_ENTRIES", "20000")),
+        )
+        # Single-flight: cache key -> request in progress
+        self._inflight: Dict[str, _Flight] = {}
+        self._inflight_lock = threading.Lock()
+        # Per-endpoint calls, latency and units, shared by every client
+        self.metrics = registry("ahrefs")
+
         if not self.api_token:
             print("Warning: AHREFS_API_TOKEN not found. Search traffic features will be limited.")
     
+    def _request(self, endpoint: str, params: Dict) -> Optional[Dict]:
+        """
+        Call one API endpoint; returns the JSON body or None on failure.
+
+        Throttled and failed calls are retried by the rate limiter. Calls are
+        skipped while the circuit breaker is open.
+        """
+        if not self.breaker.allow():
+            self.metrics.record_rejected(endpoint)
+            return None
+
+        def send() -> requests.Response:
+            start = time.perf_counter()
+            ok = False
+            try:
+                response = self.http.get(
+                    f"{self.base_url}/{endpoint}",
+                    params={**params, 'token': self.api_token, 'output': 'json'},
+                    timeout=10
+                )
+                ok = response.ok
+                return response
+            finally:
+                # Only successful calls are billed
+                self.metrics.record_call(
+                    endpoint,
+                    (time.perf_counter() - start) * 1000,
+                    ok,
+                    units=self.UNITS_PER_CALL.get(endpoint, 1) if ok else 0,
+                )
+
+        try:
+            response = self.rate_limiter.call(send)
+        except RateLimitTimeout as e:
+            # Our own wait budget ran out; says nothing about Ahrefs' health
+            print(f"Ahrefs API skipped: {e}")
+            return None
+        except Exception as e:
+            self.breaker.record_failure()
+            print(f"Ahrefs API error: {e}")
+            return None
+
+        # Auth and server-side errors mean Ahrefs is unusable right now;
+        # other 4xx are specific to this lookup
+        if response.status_code >= 500 or response.status_code in (401, 403, 429):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        try:
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            print(f"Ahrefs API error: {e}")
+            return None
+
+    def _cached_call(self, endpoint: str, cache_key: str, params: Dict) -> Optional[Dict]:
+        """
+        Serve a metrics lookup from cache, or from a request already in flight
+        for the same key, and only otherwise call the API.
+        """
+        # A miss is counted once, by the leader's re-check below; callers
+        # served a coalesced result are not cache misses
+        cached = self.cache.get(cache_key, count_miss=False)
+        if cached is not None:
+            self.metrics.record_saved(
+                endpoint, "cache_hits", self.UNITS_PER_CALL.get(endpoint, 1)
+            )
+            return json.loads(cached)
+
+        with self._inflight_lock:
+            flight = self._inflight.get(cache_key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[cache_key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            self.metrics.record_saved(
+                endpoint, "coalesced", self.UNITS_PER_CALL.get(endpoint, 1)
+            )
+            return flight.result
+
+        try:
+            # A previous leader may have filled the cache between the lookup
+            # above and this thread winning the slot
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self.metrics.record_saved(
+                    endpoint, "cache_hits", self.UNITS_PER_CALL.get(endpoint, 1)
+                )
+                flight.result = json.loads(cached)
+            else:
+                flight.result = self._request(endpoint, params)
+                if flight.result is not None:
+                    self.cache.set(cache_key, json.dumps(flight.result))
+        finally:
+            with self._inflight_lock:
+                del self._inflight[cache_key]
+            flight.done.set()
+        return flight.result
+
     def get_url_metrics(self, url: str) -> Optional[Dict]:
         """
         Get URL metrics from Ahrefs.
@@ -31,24 +201,12 @@ class AhrefsClient:
         """
         if not self.api_token:
             return None
-        
-        try:
-            response = requests.get(
-                f"{self.base_url}/url-metrics",
-                params={
-                    'target': url,
-                    'token': self.api_token,
-                    'output': 'json',
-                    'from': 'backlinks',
-                    'mode': 'domain'
-                },
-                timeout=10
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            print(f"Ahrefs API error: {e}")
-            return None
+
+        return self._cached_call(
+            "url-metrics",
+            f"url:{url}",
+            {'target': url, 'from': 'backlinks', 'mode': 'domain'},
+        )
     
     def get_keyword_metrics(self, keyword: str) -> Optional[Dict]:
         """
@@ -62,23 +220,59 @@ class AhrefsClient:
         """
         if not self.api_token:
             return None
-        
-        try:
-            response = requests.get(
-                f"{self.base_url}/keywords-explorer",
-                params={
-                    'keyword': keyword,
-                    'token': self.api_token,
-                    'output': 'json',
-                    'mode': 'exact'
-                },
-                timeout=10
-            )
-            response.raise_for_status()
-            return response.json()
-        except Exception as e:
-            print(f"Ahrefs API error: {e}")
-            return None
+
+        # Keyword metrics are case-insensitive, so share entries across casings
+        normalized = " ".join(keyword.lower().split())
+        return self._cached_call(
+            "keywords-explorer",
+            f"keyword:{normalized}",
+            {'keyword': keyword, 'mode': 'exact'},
+        )
+
+    def _bulk(self, lookup, keys: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        """Run `lookup` for every unique key over a bounded thread pool."""
+        unique = list(dict.fromkeys(k for k in keys if k))
+        if not unique or not self.api_token:
+            return {key: None for key in unique}
+        if len(unique) == 1:
+            return {unique[0]: lookup(unique[0])}
+
+        workers = max(1, min(self.max_workers, len(unique)))
+        with ContextThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="ahrefs"
+        ) as executor:
+            return dict(zip(unique, executor.map(lookup, unique)))
+
+    def get_keywords_metrics(self, keywords: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Get keyword metrics for many keywords at once.
+
+        Cached keywords cost nothing; the rest are fetched concurrently (at
+        most `max_workers` at a time), so total time stays roughly flat as the
+        batch grows.
+
+        Returns:
+            Dictionary mapping each keyword to its metrics (None on failure)
+        """
+        return self._bulk(self.get_keyword_metrics, keywords)
+
+    def get_urls_metrics(self, urls: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Get URL metrics for many URLs at once (see get_keywords_metrics).
+
+        Returns:
+            Dictionary mapping each URL to its metrics (None on failure)
+        """
+        return self._bulk(self.get_url_metrics, urls)
+
+    def stats(self) -> Dict:
+        """Per-endpoint calls/latency/units plus cache, breaker and pacing state."""
+        return {
+            **self.metrics.snapshot(),
+            "cache": self.cache.stats(),
+            "breaker": self.breaker.stats(),
+            "rate_limiter": self.rate_limiter.stats(),
+        }
     
     def get_reddit_post_traffic(self, reddit_url: str, keyword: str) -> Optional[Dict]:
         """
@@ -93,8 +287,23 @@ class AhrefsClient:
         """
         # Since Ahrefs doesn't directly track Reddit posts,
         # we'll use keyword metrics to estimate potential traffic
-        keyword_data = self.get_keyword_metrics(keyword)
+        return self.traffic_from_metrics(self.get_keyword_metrics(keyword))
+
+    def get_keywords_traffic(self, keywords: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Estimate Reddit post traffic for many keywords in one bulk lookup.
+
+        Returns:
+            Dictionary mapping each keyword to its traffic estimate (see
+            get_reddit_post_traffic), or None when unavailable
+        """
+        return {
+            keyword: self.traffic_from_metrics(keyword_data)
+            for keyword, keyword_data in self.get_keywords_metrics(keywords).items()
+        }
 
+    def traffic_from_metrics(self, keyword_data: Optional[Dict]) -> Optional[Dict]:
+        """Turn a keyword metrics response into a traffic estimate (or None)."""
         # The exact shape of Ahrefs' response can vary by plan/version.
         # We try a few common patterns and fall back gracefully.
         if not keyword_data:
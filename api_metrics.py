@@ -0,0 +1,233 @@
+"""
+Call accounting for paid upstream APIs (per-endpoint counts, latency
+histograms, cache hits and estimated unit spend).
+
+Every call is recorded twice: in a process-wide ApiMetrics registry, served
+by the /api/metrics endpoint, and in the RequestUsage of the web request
+being handled, if any. The current RequestUsage lives in a ContextVar, so it
+follows work into thread pools started with ContextThreadPoolExecutor (or
+run through contextvars.copy_context()).
+"""
+import bisect
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+# Latency histogram bucket upper bounds, in milliseconds
+LATENCY_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (not thread-safe; callers lock)."""
+
+    __slots__ = ("counts", "count", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, self.counts):
+            seen += count
+            if seen >= rank:
+                return float(bound)
+        return self.max_ms
+
+    def snapshot(self) -> Dict:
+        buckets = {f"le_{bound}ms": count for bound, count in zip(LATENCY_BUCKETS_MS, self.counts)}
+        buckets["over"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 1) if self.count else None,
+            "p50_ms": self.quantile(0.5),
+            "p95_ms": self.quantile(0.95),
+            "max_ms": round(self.max_ms, 1),
+            "buckets": buckets,
+        }
+
+
+class _EndpointStats:
+    __slots__ = ("calls", "errors", "cache_hits", "coalesced", "rejected",
+                 "units_spent", "units_saved", "latency")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.units_spent = 0
+        self.units_saved = 0
+        self.latency = LatencyHistogram()
+
+    def snapshot(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "cache_hits": self.cache_hits,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+            "units_spent": self.units_spent,
+            "units_saved": self.units_saved,
+            "latency": self.latency.snapshot(),
+        }
+
+
+class ApiMetrics:
+    """Thread-safe per-endpoint call statistics for one API."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._endpoints: Dict[str, _EndpointStats] = {}
+        self._lock = threading.Lock()
+
+    def _endpoint(self, endpoint: str) -> _EndpointStats:
+        stats = self._endpoints.get(endpoint)
+        if stats is None:
+            stats = self._endpoints[endpoint] = _EndpointStats()
+        return stats
+
+    def record_call(self, endpoint: str, ms: float, ok: bool, units: int = 0) -> None:
+        """One request sent upstream (retries count separately)."""
+        with self._lock:
+            stats = self._endpoint(endpoint)
+            stats.calls += 1
+            stats.errors += 0 if ok else 1
+            stats.units_spent += units
+            stats.latency.observe(ms)
+        usage = _current_usage.get()
+        if usage is not None:
+            usage.record(self.name, endpoint, "calls", units_spent=units, ms=ms)
+
+    def record_saved(self, endpoint: str, kind: str, units: int = 0) -> None:
+        """A lookup answered without a request (kind: cache_hits or coalesced)."""
+        with self._lock:
+            stats = self._endpoint(endpoint)
+            setattr(stats, kind, getattr(stats, kind) + 1)
+            stats.units_saved += units
+        usage = _current_usage.get()
+        if usage is not None:
+            usage.record(self.name, endpoint, kind, units_saved=units)
+
+    def record_rejected(self, endpoint: str) -> None:
+        """A call skipped because the circuit breaker was open."""
+        with self._lock:
+            self._endpoint(endpoint).rejected += 1
+        usage = _current_usage.get()
+        if usage is not None:
+            usage.record(self.name, endpoint, "rejected")
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            endpoints = {name: stats.snapshot() for name, stats in self._endpoints.items()}
+        totals = {
+            key: sum(e[key] for e in endpoints.values())
+            for key in ("calls", "errors", "cache_hits", "coalesced", "rejected",
+                        "units_spent", "units_saved")
+        }
+        return {"api": self.name, "totals": totals, "endpoints": endpoints}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+
+
+_registry: Dict[str, ApiMetrics] = {}
+_registry_lock = threading.Lock()
+
+
+def registry(name: str) -> ApiMetrics:
+    """Process-wide metrics for the named API (created on first use)."""
+    with _registry_lock:
+        metrics = _registry.get(name)
+        if metrics is None:
+            metrics = _registry[name] = ApiMetrics(name)
+        return metrics
+
+
+def snapshot_all() -> Dict[str, Dict]:
+    with _registry_lock:
+        apis = list(_registry.values())
+    return {metrics.name: metrics.snapshot() for metrics in apis}
+
+
+class RequestUsage:
+    """Upstream API usage attributed to one web request."""
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.started = time.perf_counter()
+        self._counts: Dict[str, Dict[str, Dict]] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        api: str,
+        endpoint: str,
+        kind: str,
+        units_spent: int = 0,
+        units_saved: int = 0,
+        ms: float = 0.0,
+    ) -> None:
+        with self._lock:
+            stats = self._counts.setdefault(api, {}).setdefault(
+                endpoint,
+                {"calls": 0, "cache_hits": 0, "coalesced": 0, "rejected": 0,
+                 "units_spent": 0, "units_saved": 0, "time_ms": 0.0},
+            )
+            stats[kind] += 1
+            stats["units_spent"] += units_spent
+            stats["units_saved"] += units_saved
+            stats["time_ms"] += ms
+
+    def summary(self) -> Dict:
+        with self._lock:
+            apis = {
+                api: {endpoint: dict(stats, time_ms=round(stats["time_ms"], 1))
+                      for endpoint, stats in endpoints.items()}
+                for api, endpoints in self._counts.items()
+            }
+        return {
+            "label": self.label,
+            "elapsed_ms": round((time.perf_counter() - self.started) * 1000, 1),
+            "apis": apis,
+        }
+
+
+_current_usage: contextvars.ContextVar[Optional[RequestUsage]] = contextvars.ContextVar(
+    "api_request_usage", default=None
+)
+
+
+@contextmanager
+def track_request(label: str = "") -> Iterator[RequestUsage]:
+    """Attribute upstream API calls made inside the block to a new RequestUsage."""
+    usage = RequestUsage(label)
+    token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(token)
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """ThreadPoolExecutor whose tasks run in a copy of the submitter's context."""
+
+    def submit(self, fn, /, *args, **kwargs):
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
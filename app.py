@@ -4,11 +4,12 @@ Flask web application for Reddit Comment Tool.
 from flask import Flask, render_template, request, jsonify
 import os
 from dotenv import load_dotenv
-from reddit_scraper import RedditScraper
+from api_metrics import snapshot_all, track_request
+from rate_limiter import time_budget
+from reddit_scraper import RedditScraper, start_velocity_polling
 from comment_generator import CommentGenerator
 from website_scraper import WebsiteScraper
 from demo_mode import generate_demo_posts
-from datetime import datetime
 from urllib.parse import urlparse
 
 load_dotenv()
@@ -18,14 +19,21 @@ app = Flask(__name__)
 # Initialize components
 scraper = None
 generator = None
+# Whether returned posts are watched for engagement velocity
+velocity_polling = False
 website_scraper = WebsiteScraper()
 demo_mode = os.getenv("DEMO_MODE", "false").lower() == "true"
+# Seconds a search may spend waiting on rate limits and retries; keep it
+# under gunicorn's worker timeout (30 s by default)
+search_time_budget = float(os.getenv("SEARCH_TIME_BUDGET", "25"))
 
 def init_components():
     """Initialize Reddit scraper and comment generator."""
-    global scraper, generator
+    global scraper, generator, velocity_polling
     try:
         scraper = RedditScraper()
+        # One background poller per host, moved to the new scraper
+        velocity_polling = start_velocity_polling(scraper)
     except Exception as e:
         scraper = None
         print(f"Warning: Reddit scraper initialization failed: {e}")
@@ -55,7 +63,9 @@ def scrape_website():
         return jsonify({'error': 'Website URL is required'}), 400
     
     try:
-        website_info = website_scraper.scrape_website(website_url)
+        website_info = website_scraper.scrape_website(
+            website_url, crawl=bool(data.get('crawl', False))
+        )
         return jsonify({'success': True, 'website_info': website_info})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -98,14 +108,31 @@ def search():
     # Try real Reddit API
     try:
         prioritize_traffic = data.get('prioritize_traffic', True)
-        posts = scraper.get_top_posts(keyword, top_n=top_n, prioritize_traffic=prioritize_traffic)
+        offline = bool(data.get('offline', False))
+        # Attribute every Ahrefs call made for this search to this request,
+        # and return what was found once the time budget runs out
+        with track_request(f"search:{keyword}") as usage, time_budget(search_time_budget):
+            posts = scraper.get_top_posts(
+                keyword, top_n=top_n, prioritize_traffic=prioritize_traffic, offline=offline
+            )
+        api_usage = usage.summary()
+
+        # Poll what users were shown so later searches can rank by velocity
+        if velocity_polling and not offline:
+            try:
+                scraper.watch_posts(posts)
+            except Exception as e:
+                print(f"Warning: could not watch posts for velocity: {e}")
         
-        # Convert datetime objects to strings for JSON serialization
-        for post in posts:
-            if isinstance(post.get('created_utc'), datetime):
-                post['created_utc'] = post['created_utc'].isoformat()
+        # Convert compact Post objects to JSON-ready dicts
+        posts = [post.to_dict() for post in posts]
         
-        return jsonify({'success': True, 'posts': posts, 'demo_mode': False})
+        return jsonify({
+            'success': True,
+            'posts': posts,
+            'demo_mode': False,
+            'api_usage': api_usage,
+        })
     except Exception as e:
         error_msg = str(e)
         # If Reddit API fails, fall back to demo mode
@@ -345,6 +372,17 @@ def check_config():
     })
 
 
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Upstream API call counts, latency histograms, cache hits and unit spend."""
+    result = {'apis': snapshot_all()}
+    if scraper is not None:
+        result['ahrefs'] = scraper.ahrefs.stats()
+        result['reddit_rate_limiter'] = scraper.rate_limiter.stats()
+        result['search_cache'] = scraper.search_cache.stats()
+    return jsonify(result)
+
+
 if __name__ == '__main__':
     # Try to initialize on startup
     init_components()
@@ -0,0 +1,159 @@
+"""
+HTML extraction speed: BeautifulSoup + regex passes vs. one PageExtractor pass.
+
+Before html_extract.PageExtractor, WebsiteScraper built a BeautifulSoup tree,
+ran several find() calls and decomposed nodes, and WebsiteAnalyzer stripped
+the same page again with sequential regex passes. This times both old paths
+against the single-pass extractor on each available backend (the stdlib
+regex tokenizer, and lxml when installed). Pages are the .html files in the given
+directory (e.g. saved product pages), or synthetic landing pages otherwise.
+Run from the repository root:
+
+    python benchmarks/bench_html_extract.py [pages_dir] [repeat]
+"""
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import html_extract  # noqa: E402
+from html_extract import PageExtractor  # noqa: E402
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:  # The old scraper path is skipped without bs4
+    BeautifulSoup = None
+
+WORDS = (
+    "fast simple secure pricing team plan features analytics dashboard "
+    "integrations workflow customers support start free trial build ship"
+).split()
+
+
+def synthetic_page(rng: random.Random, sections: int) -> str:
+    """A landing page with head metadata, chrome, inline script/CSS and sections."""
+    def sentence(n):
+        return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+    head = (
+        f"<head><title>{sentence(4)}</title>"
+        f'<meta name="description" content="{sentence(20)}">'
+        f'<meta name="keywords" content="{",".join(WORDS[:6])}">'
+        f'<meta property="og:title" content="{sentence(4)}">'
+        f"<style>{'.c{color:red}' * 200}</style>"
+        f"<script>{'var x = 1;' * 500}</script></head>"
+    )
+    nav = "<header><nav>" + "".join(f'<a href="/{w}">{w}</a>' for w in WORDS) + "</nav></header>"
+    body = "".join(
+        f'<section class="feature"><h2>{sentence(3)}</h2>'
+        f"<p>{sentence(40)}</p><ul>"
+        + "".join(f"<li>{sentence(8)}</li>" for _ in range(5))
+        + "</ul></section>"
+        for _ in range(sections)
+    )
+    footer = f"<footer>{sentence(30)}</footer><script>{'track();' * 300}</script>"
+    return (
+        f"<!doctype html><html>{head}<body>{nav}"
+        f'<div class="main-content"><h1>{sentence(5)}</h1>{body}</div>'
+        f"{footer}</body></html>"
+    )
+
+
+def load_pages(directory=None):
+    if directory:
+        pages = []
+        for name in sorted(os.listdir(directory)):
+            if name.endswith((".html", ".htm")):
+                with open(os.path.join(directory, name), encoding="utf-8", errors="replace") as f:
+                    pages.append(f.read())
+        return pages
+    rng = random.Random(0)
+    return [synthetic_page(rng, sections) for sections in (5, 20, 60, 150) for _ in range(5)]
+
+
+def old_scraper(html: str):
+    """WebsiteScraper's former BeautifulSoup extraction."""
+    soup = BeautifulSoup(html, "html.parser")
+    title = soup.find("title")
+    soup.find("meta", property="og:title")
+    soup.find("h1")
+    soup.find("meta", attrs={"name": "description"})
+    soup.find("meta", property="og:description")
+    soup.find("p")
+    soup.find("meta", attrs={"name": "keywords"})
+    for tag in soup(["script", "style", "nav", "footer", "header"]):
+        tag.decompose()
+    main = (
+        soup.find("main")
+        or soup.find("article")
+        or soup.find("div", class_=re.compile(r"content|main|article", re.I))
+    )
+    text = (main or soup).get_text(separator=" ", strip=True)
+    return title, " ".join(text.split())
+
+
+def old_analyzer(html: str) -> str:
+    """WebsiteAnalyzer's former regex text extraction."""
+    content = re.sub(r"<script[^>]*>.*?</script>", "", html, flags=re.DOTALL | re.IGNORECASE)
+    content = re.sub(r"<style[^>]*>.*?</style>", "", content, flags=re.DOTALL | re.IGNORECASE)
+    text = re.sub(r"<[^>]+>", " ", content)
+    return re.sub(r"\s+", " ", text)[:10000]
+
+
+def single_pass(backend: str, text_limit=None, scan_structured=False):
+    def run(html: str):
+        extractor = PageExtractor(
+            text_limit=text_limit, backend=backend, scan_structured=scan_structured
+        )
+        # Fed in download-sized chunks, as PageFetcher.fetch does
+        for start in range(0, len(html), 16 * 1024):
+            if extractor.feed(html[start:start + 16 * 1024]):
+                break
+        return extractor.close()
+    return run
+
+
+def measure(fn, pages, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages:
+            fn(html)
+    return time.perf_counter() - start
+
+
+def main():
+    directory = sys.argv[1] if len(sys.argv) > 1 else None
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    pages = load_pages(directory)
+    if not pages:
+        sys.exit(f"No .html files in {directory}")
+    total_mb = sum(len(html) for html in pages) * repeat / 1e6
+
+    backends = ["stdlib"] + (["lxml"] if html_extract.etree is not None else [])
+    cases = []
+    if BeautifulSoup is not None:
+        cases.append(("scraper: bs4 + find()", old_scraper))
+    for backend in backends:
+        cases.append((f"scraper: single pass ({backend})", single_pass(backend)))
+    cases.append(("analyzer: regex passes", old_analyzer))
+    for backend in backends:
+        # As WebsiteAnalyzer: first 10k characters, then JSON-LD/meta only
+        cases.append((f"analyzer: first 10k ({backend})", single_pass(backend, 10000, True)))
+
+    print(f"Pages: {len(pages)} ({total_mb / repeat:.2f} MB), repeat: {repeat}")
+    baseline = {}
+    for label, fn in cases:
+        seconds = measure(fn, pages, repeat)
+        group = label.split(":", 1)[0]
+        baseline.setdefault(group, seconds)
+        print(
+            f"{label:<34}{seconds * 1000:>9.0f} ms{total_mb / seconds:>9.1f} MB/s"
+            f"{baseline[group] / seconds:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
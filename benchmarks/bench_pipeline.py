@@ -0,0 +1,96 @@
+"""
+Parse / filter / rank / serialize throughput at production scale.
+
+Streams a seeded demo_mode.SyntheticCorpus (one million posts by default)
+through the same stages a search runs in RedditScraper - relevance and
+engagement filtering, thread dedup, near-duplicate collapsing, top-k
+ranking and JSON serialization - without any network access, and reports
+time and throughput per stage. Run from the repository root:
+
+    python benchmarks/bench_pipeline.py [corpus_size] [top_n] [--trace]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from demo_mode import SyntheticCorpus  # noqa: E402
+from dedup_index import DedupIndex, thread_keys  # noqa: E402
+from ranking import top_k  # noqa: E402
+
+KEYWORD = "python"
+BATCH_SIZE = 5000
+
+
+def _scraper():
+    import ttl_cache
+    from reddit_scraper import RedditScraper
+
+    ttl_cache.CACHE_DIR = tempfile.mkdtemp(prefix="bench_pipeline_")
+    return RedditScraper()
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    count = int(args[0]) if args else 1_000_000
+    top_n = int(args[1]) if len(args) > 1 else 50
+    if "--trace" in sys.argv:
+        tracemalloc.start()
+
+    scraper = _scraper()
+    corpus = SyntheticCorpus(KEYWORD, size=count, seed=1)
+    now = datetime.utcnow()
+    timings = {"generate": 0.0, "parse+filter": 0.0, "dedup": 0.0}
+    dedup = DedupIndex()
+    posts = []
+
+    for start in range(0, count, BATCH_SIZE):
+        t0 = time.perf_counter()
+        batch = corpus.slice(start, BATCH_SIZE)
+        t1 = time.perf_counter()
+        parsed = [
+            (raw, scraper._parse_public_post(raw, KEYWORD, now)) for raw in batch
+        ]
+        t2 = time.perf_counter()
+        for raw, post in parsed:
+            if post is not None and dedup.claim(thread_keys(raw)):
+                posts.append(post)
+        t3 = time.perf_counter()
+        timings["generate"] += t1 - t0
+        timings["parse+filter"] += t2 - t1
+        timings["dedup"] += t3 - t2
+
+    t0 = time.perf_counter()
+    collapsed = scraper.near_duplicates.collapse(posts)
+    t1 = time.perf_counter()
+    top = top_k(collapsed, top_n)
+    t2 = time.perf_counter()
+    payload = json.dumps([post.to_dict() for post in collapsed])
+    t3 = time.perf_counter()
+    timings["near-dup collapse"] = t1 - t0
+    timings["rank top_k"] = t2 - t1
+    timings["serialize (pool)"] = t3 - t2
+
+    print(
+        f"Corpus: {count} posts, {len(posts)} passed filters, "
+        f"{len(collapsed)} after collapsing, top_n: {top_n}"
+    )
+    for stage, seconds in timings.items():
+        if stage in ("generate", "parse+filter", "dedup"):
+            rate = count
+        else:
+            rate = len(posts) if stage == "near-dup collapse" else len(collapsed)
+        print(f"{stage:<20}{seconds * 1000:>10.0f} ms{rate / max(seconds, 1e-9):>14,.0f} posts/s")
+    print(f"{'JSON payload':<20}{len(payload) / 1e6:>10.1f} MB")
+    print(f"{'best post':<20}{top[0].title if top else '-'}")
+    if tracemalloc.is_tracing():
+        print(f"{'peak traced memory':<20}{tracemalloc.get_traced_memory()[1] / 2**20:>10.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Per-post memory footprint: legacy dict posts vs. slotted Post objects.
+
+Builds the same candidate pool both ways and measures the allocated bytes
+with tracemalloc. Run from the repository root:
+
+    python benchmarks/bench_post_memory.py [pool_size]
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reddit_post import Post  # noqa: E402
+
+SUBREDDITS = ["technology", "programming", "webdev", "startups", "marketing", "SEO"]
+
+
+def _raw_posts(count: int):
+    rng = random.Random(42)
+    now = time.time()
+    for i in range(count):
+        yield {
+            "title": f"Post number {i} about something interesting",
+            "permalink": f"/r/sub/comments/{i:x}/post_number_{i}/",
+            "subreddit": rng.choice(SUBREDDITS),
+            "score": rng.randint(0, 5000),
+            "num_comments": rng.randint(0, 800),
+            "created_utc": now - rng.randint(0, 365 * 86400),
+            # Fresh string per post, as JSON decoding would produce; longer
+            # bodies make the [:500] truncation allocate a copy, like real data
+            "selftext": "".join(
+                rng.choice("abcdefgh ") for _ in range(rng.randint(0, 1500))
+            ),
+            "author": f"user_{rng.randint(0, 2000)}",
+            "name": f"t3_{i:x}",
+        }
+
+
+def _as_dict(raw, now):
+    created = datetime.fromtimestamp(raw["created_utc"])
+    age_days = (now - created).days
+    return {
+        "title": raw["title"],
+        "url": f"https://reddit.com{raw['permalink']}",
+        "subreddit": raw["subreddit"],
+        "score": raw["score"],
+        "comments": raw["num_comments"],
+        "engagement_score": raw["score"] + raw["num_comments"] * 2,
+        "created_utc": created,
+        "age_days": age_days,
+        "is_recent": age_days <= 14,
+        "selftext": raw["selftext"][:500],
+        "author": raw["author"],
+        "search_traffic": 0,
+    }
+
+
+def _as_post(raw, now):
+    created_utc = float(raw["created_utc"])
+    age_days = (now - datetime.fromtimestamp(created_utc)).days
+    return Post(
+        title=raw["title"],
+        url=f"https://reddit.com{raw['permalink']}",
+        subreddit=raw["subreddit"],
+        score=raw["score"],
+        comments=raw["num_comments"],
+        engagement_score=raw["score"] + raw["num_comments"] * 2,
+        created_utc=created_utc,
+        age_days=age_days,
+        is_recent=age_days <= 14,
+        selftext=raw["selftext"][:500],
+        author=raw["author"],
+        fullname=raw["name"],
+    )
+
+
+def measure(build, count: int) -> float:
+    """Bytes retained per post by a pool built with `build`."""
+    raws = list(_raw_posts(count))
+    now = datetime.utcnow()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    pool = [build(raw, now) for raw in raws]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del pool
+    return (after - before) / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    dict_bytes = measure(_as_dict, count)
+    post_bytes = measure(_as_post, count)
+
+    print(f"Pool size: {count} posts")
+    print(f"{'representation':<16}{'bytes/post':>12}{'pool MiB':>12}")
+    for name, per_post in (("dict", dict_bytes), ("Post (slots)", post_bytes)):
+        print(f"{name:<16}{per_post:>12.0f}{per_post * count / 2 ** 20:>12.2f}")
+    print(f"Saved: {(1 - post_bytes / dict_bytes) * 100:.1f}% per post")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Ranking benchmark: full sort vs. partial top-k selection.
+
+Compares the previous `list.sort(key=combined_score)` ranking with
+ranking.top_k on Post objects and ranking.rank_columns on prebuilt column
+arrays, and checks that all three agree. Run from the repository root:
+
+    python benchmarks/bench_ranking.py [pool_size] [top_n]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ranking import DEFAULT_WEIGHTS, np, rank_columns, score_post, top_k  # noqa: E402
+from reddit_post import Post  # noqa: E402
+
+
+def _pool(count: int):
+    rng = random.Random(7)
+    now = time.time()
+    posts = []
+    for i in range(count):
+        score = int(rng.paretovariate(1.2) * 10)
+        comments = int(rng.paretovariate(1.4) * 3)
+        age_days = rng.randint(0, 365)
+        posts.append(
+            Post(
+                title=f"post {i}",
+                url=f"https://reddit.com/r/x/comments/{i:x}/",
+                subreddit="x",
+                score=score,
+                comments=comments,
+                engagement_score=score + comments * 2,
+                created_utc=now - age_days * 86400,
+                age_days=age_days,
+                is_recent=age_days <= 14,
+                search_traffic=rng.choice((0, 0, 0, 15, 120)),
+            )
+        )
+    return posts
+
+
+def _timed(fn, repeat: int = 5):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    top_n = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    posts = _pool(count)
+
+    sort_ms, by_sort = _timed(
+        lambda: sorted(posts, key=score_post, reverse=True)[:top_n]
+    )
+    topk_ms, by_topk = _timed(lambda: top_k(posts, top_n))
+    print(f"Pool size: {count}, top_n: {top_n}")
+    print(f"{'full sort':<28}{sort_ms:>10.2f} ms")
+    print(f"{'top_k (Post objects)':<28}{topk_ms:>10.2f} ms")
+    assert by_sort == by_topk, "top_k disagrees with a stable sort"
+
+    if np is not None:
+        traffic = np.array([p.search_traffic for p in posts], dtype=np.float64)
+        engagement = np.array([p.engagement_score for p in posts], dtype=np.float64)
+        is_recent = np.array([p.is_recent for p in posts], dtype=np.bool_)
+        cols_ms, idx = _timed(
+            lambda: rank_columns(traffic, engagement, is_recent, top_n, DEFAULT_WEIGHTS)
+        )
+        print(f"{'rank_columns (arrays)':<28}{cols_ms:>10.2f} ms")
+        assert [posts[i] for i in idx] == by_sort, "rank_columns disagrees"
+    else:
+        print("NumPy not installed: column ranking skipped")
+
+
+if __name__ == "__main__":
+    main()
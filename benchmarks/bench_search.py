@@ -0,0 +1,110 @@
+"""
+Search pipeline benchmark against the local stub server.
+
+Runs RedditScraper end to end (search paging, filtering, Ahrefs enrichment,
+dedup, ranking) with reddit.com and Ahrefs replaced by
+benchmarks/stub_server.py, and reports requests made, wall time and peak
+traced memory for small, large and multi-keyword workloads, each with cold
+and warm caches. Run from the repository root:
+
+    python benchmarks/bench_search.py [--latency 0.02] [--throttle-every 0]
+                                      [--fixtures DIR]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_server import StubServer  # noqa: E402
+
+KEYWORDS = ["python", "web scraping", "seo tools", "saas pricing", "email marketing"]
+
+WORKLOADS = {
+    "small": lambda scraper: scraper.get_top_posts("python", top_n=5),
+    "large": lambda scraper: scraper.get_top_posts("python", top_n=50),
+    "multi": lambda scraper: list(scraper.search_many(KEYWORDS, top_n=10)),
+}
+
+
+def _configure(stub_url: str) -> None:
+    """Point both clients at the stub and pace them by the stub's headers."""
+    os.environ["REDDIT_BASE_URL"] = stub_url
+    os.environ["AHREFS_BASE_URL"] = stub_url
+    os.environ.setdefault("AHREFS_API_TOKEN", "benchmark")
+    os.environ["REDDIT_RATE_LIMIT_RPS"] = "1000"
+    os.environ["REDDIT_RATE_LIMIT_BURST"] = "50"
+    os.environ.pop("REDDIT_CLIENT_ID", None)
+    os.environ.pop("HTTP_REPLAY_MODE", None)
+
+
+def _scraper(cache_dir: str):
+    import ttl_cache
+    from reddit_scraper import RedditScraper
+
+    ttl_cache.CACHE_DIR = cache_dir
+    return RedditScraper()
+
+
+def _run(stub: StubServer, name: str, trace: bool):
+    """One cold run and one warm run of a workload on a fresh cache directory."""
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="bench_search_") as cache_dir:
+        scraper = _scraper(cache_dir)
+        for phase in ("cold", "warm"):
+            stub.reset_stats()
+            if trace:
+                tracemalloc.start()
+            start = time.perf_counter()
+            WORKLOADS[name](scraper)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] if trace else None
+            if trace:
+                tracemalloc.stop()
+            stats = stub.stats()
+            rows.append((name, phase, stats["requests"], stats["throttled"], elapsed, peak))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search pipeline benchmark")
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--throttle-every", type=int, default=0)
+    parser.add_argument("--fixtures", default=None)
+    parser.add_argument("--workloads", default=",".join(WORKLOADS))
+    args = parser.parse_args()
+
+    stub = StubServer(
+        latency=args.latency,
+        throttle_every=args.throttle_every,
+        fixtures=args.fixtures,
+    ).start()
+    _configure(stub.url)
+    print(
+        f"stub {stub.url}  latency {args.latency * 1000:.0f} ms  "
+        f"429 every {args.throttle_every or '-'} requests\n"
+    )
+    print(
+        f"{'workload':<8} {'cache':<5} {'requests':>8} {'429s':>5} "
+        f"{'wall ms':>9} {'peak KiB':>9}"
+    )
+    try:
+        for name in args.workloads.split(","):
+            # Wall time is measured without tracemalloc, which slows allocation
+            timed = _run(stub, name, trace=False)
+            traced = _run(stub, name, trace=True)
+            for (wl, phase, reqs, throttled, elapsed, _), traced_row in zip(timed, traced):
+                print(
+                    f"{wl:<8} {phase:<5} {reqs:>8} {throttled:>5} "
+                    f"{elapsed * 1000:>9.1f} {traced_row[5] / 1024:>9.0f}"
+                )
+    finally:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+Local stand-in for reddit.com and the Ahrefs API.
+
+Serves recorded fixtures (see http_replay) when one matches the request, and
+otherwise pages of a seeded demo_mode.SyntheticCorpus per search query, with
+configurable latency and 429 injection. Point the clients at it with
+REDDIT_BASE_URL / AHREFS_BASE_URL.
+
+    python benchmarks/stub_server.py --port 8765 --latency 0.05 --throttle-every 20
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from demo_mode import SyntheticCorpus  # noqa: E402
+from http_replay import load_fixture  # noqa: E402
+
+
+class StubServer:
+    """Threaded HTTP server answering search, info and keyword-metrics requests."""
+
+    def __init__(
+        self,
+        port: int = 0,
+        latency: float = 0.0,
+        throttle_every: int = 0,
+        retry_after: float = 1.0,
+        fixtures: Optional[str] = None,
+        corpus_size: int = 1000,
+        seed: int = 0,
+    ):
+        """
+        Initialize the server (call start() to serve).
+
+        Args:
+            port: Port to bind on 127.0.0.1 (0 picks a free one)
+            latency: Seconds added to every response
+            throttle_every: Answer every Nth request with a 429 (0 disables)
+            retry_after: Retry-After seconds sent with injected 429s
+            fixtures: Directory of recorded fixtures served in preference to
+                      synthetic data
+            corpus_size: Synthetic posts available per search query
+            seed: Seed of the synthetic corpora
+        """
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.fixtures = fixtures
+        self.corpus_size = corpus_size
+        self.seed = seed
+        # One corpus per query, generated page by page on demand
+        self.now = time.time()
+        self._corpora: Dict[str, SyntheticCorpus] = {}
+
+        self.requests = Counter()
+        self.throttled = 0
+        self._lock = threading.Lock()
+        self._count = 0
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                stub._handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.requests.clear()
+            self.throttled = 0
+            self._count = 0
+
+    def stats(self) -> Dict:
+        return {
+            "requests": sum(self.requests.values()),
+            "by_path": dict(self.requests),
+            "throttled": self.throttled,
+        }
+
+    # -- request handling -------------------------------------------------
+
+    def _handle(self, handler: BaseHTTPRequestHandler) -> None:
+        parts = urlsplit(handler.path)
+        with self._lock:
+            self._count += 1
+            self.requests[parts.path] += 1
+            throttle = self.throttle_every and self._count % self.throttle_every == 0
+            if throttle:
+                self.throttled += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        headers = {
+            "Content-Type": "application/json; charset=UTF-8",
+            # A generous budget so pacing is driven by latency, not the bucket
+            "X-Ratelimit-Remaining": "10000",
+            "X-Ratelimit-Reset": "1",
+        }
+        if throttle:
+            headers["Retry-After"] = str(self.retry_after)
+            self._respond(handler, 429, headers, '{"error": 429}')
+            return
+
+        fixture = (
+            load_fixture(self.fixtures, "GET", handler.path) if self.fixtures else None
+        )
+        if fixture is not None:
+            headers.update(fixture.get("headers", {}))
+            self._respond(handler, fixture.get("status", 200), headers, fixture["body"])
+            return
+
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        if parts.path == "/search.json":
+            body = self._search(query)
+        elif parts.path == "/api/info.json":
+            body = self._info(query)
+        elif parts.path in ("/keywords-explorer", "/url-metrics"):
+            body = self._keyword_metrics(query)
+        else:
+            self._respond(handler, 404, headers, '{"error": 404}')
+            return
+        self._respond(handler, 200, headers, json.dumps(body))
+
+    @staticmethod
+    def _respond(handler, status: int, headers: Dict, body: str) -> None:
+        data = body.encode("utf-8")
+        handler.send_response(status)
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        handler.send_header("Content-Length", str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+
+    # -- synthetic data ---------------------------------------------------
+
+    def _corpus(self, keyword: str) -> SyntheticCorpus:
+        with self._lock:
+            corpus = self._corpora.get(keyword)
+            if corpus is None:
+                corpus = self._corpora[keyword] = SyntheticCorpus(
+                    keyword, size=self.corpus_size, seed=self.seed, now=self.now
+                )
+            return corpus
+
+    def _search(self, query: Dict) -> Dict:
+        limit = min(int(query.get("limit", 100)), 100)
+        return self._corpus(query.get("q", "")).listing(query.get("after"), limit)
+
+    def _info(self, query: Dict) -> Dict:
+        children = []
+        if "sr_name" in query:
+            for name in query["sr_name"].split(","):
+                children.append(
+                    {
+                        "kind": "t5",
+                        "data": {
+                            "display_name": name,
+                            "subscribers": 10000 + zlib.crc32(name.encode()) % 90000,
+                            "active_user_count": zlib.crc32(name.encode()) % 500,
+                            "over18": False,
+                            "created_utc": 1200000000.0,
+                        },
+                    }
+                )
+        else:
+            with self._lock:
+                corpora = list(self._corpora.values())
+            for name in query.get("id", "").split(","):
+                post_id = name[3:] if name.startswith("t3_") else name
+                for corpus in corpora:
+                    data = corpus.post(post_id)
+                    if data is not None:
+                        children.append({"kind": "t3", "data": data})
+                        break
+        return {"kind": "Listing", "data": {"children": children, "after": None}}
+
+    @staticmethod
+    def _keyword_metrics(query: Dict) -> Dict:
+        keyword = query.get("keyword") or query.get("target", "")
+        seed = zlib.crc32(keyword.encode())
+        return {
+            "metrics": {
+                "search_volume": 100 + seed % 20000,
+                "keyword_difficulty": seed % 100,
+                "cpc": (seed % 500) / 100,
+            }
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--throttle-every", type=int, default=0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--fixtures", default=None)
+    parser.add_argument("--corpus-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = StubServer(
+        port=args.port,
+        latency=args.latency,
+        throttle_every=args.throttle_every,
+        retry_after=args.retry_after,
+        fixtures=args.fixtures,
+        corpus_size=args.corpus_size,
+        seed=args.seed,
+    )
+    print(f"Serving on {server.url} (Ctrl+C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
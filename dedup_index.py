@@ -0,0 +1,139 @@
+"""
+Deduplication index for Reddit threads within a search, and a post cache
+shared by a batch of searches.
+
+Threads are keyed by their base36 post id, taken from the fullname
+(`t3_abc123`) or the permalink (`/r/sub/comments/abc123/...`). A crosspost
+is also keyed by its parent's id, so a crosspost and its original count as
+one thread. Within one keyword's search the first sighting of a thread is
+kept; later sightings (another page, a crosspost, or the PRAW fallback) are
+skipped before they are scored or enriched.
+
+Related keywords in a batch often reach the same threads. Each keyword keeps
+its own DedupIndex, so a thread can appear in every keyword's results, while
+a PostCache shared by the batch builds each post only once.
+"""
+import copy
+import re
+import threading
+from typing import Callable, Dict, FrozenSet, Iterable, Optional
+
+from reddit_post import Post
+
+_PERMALINK_ID = re.compile(r"/comments/([a-z0-9]+)", re.IGNORECASE)
+
+
+def _id_from_fullname(fullname: Optional[str]) -> Optional[str]:
+    if fullname and fullname.startswith("t3_"):
+        return fullname[3:].lower()
+    return None
+
+
+def id_from_permalink(permalink: Optional[str]) -> Optional[str]:
+    """Base36 post id from a permalink or full post URL, if present."""
+    match = _PERMALINK_ID.search(permalink or "")
+    return match.group(1).lower() if match else None
+
+
+def thread_keys(data: Dict) -> FrozenSet[str]:
+    """
+    Keys identifying a thread in a raw listing child (or PRAW vars()).
+
+    Includes the post's own id and, for crossposts, the parent's id.
+    """
+    keys = set()
+    for key in (
+        _id_from_fullname(data.get("name")),
+        (data.get("id") or "").lower() or None,
+        id_from_permalink(data.get("permalink")),
+        _id_from_fullname(data.get("crosspost_parent")),
+    ):
+        if key:
+            keys.add(key)
+    for parent in data.get("crosspost_parent_list") or []:
+        key = _id_from_fullname(parent.get("name")) or id_from_permalink(
+            parent.get("permalink")
+        )
+        if key:
+            keys.add(key)
+    return frozenset(keys)
+
+
+class DedupIndex:
+    """Thread-safe set of threads already processed in a search."""
+
+    def __init__(self):
+        self._keys = set()
+        self._lock = threading.Lock()
+        self.unique = 0
+        self.duplicates = 0
+
+    def __len__(self) -> int:
+        return self.unique
+
+    def seen(self, keys: Iterable[str]) -> bool:
+        """True (and counts a duplicate) if any key belongs to a claimed thread."""
+        with self._lock:
+            if any(key in self._keys for key in keys):
+                self.duplicates += 1
+                return True
+            return False
+
+    def claim(self, keys: Iterable[str]) -> bool:
+        """
+        Claim a thread for processing.
+
+        Returns False (and counts a duplicate) if the thread was already
+        claimed; threads without any key are never deduplicated.
+        """
+        keys = frozenset(keys)
+        if not keys:
+            return True
+        with self._lock:
+            if any(key in self._keys for key in keys):
+                self.duplicates += 1
+                return False
+            self._keys.update(keys)
+            self.unique += 1
+            return True
+
+    def stats(self) -> Dict:
+        return {"unique_threads": self.unique, "duplicates_skipped": self.duplicates}
+
+
+class PostCache:
+    """Thread-safe map of fullname -> Post built once per search batch."""
+
+    def __init__(self):
+        self._posts: Dict[str, Post] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._posts)
+
+    def get_or_build(self, fullname: Optional[str], build: Callable[[], Post]) -> Post:
+        """
+        Return a copy of the post cached for `fullname`, building it once.
+
+        Callers get their own copy, since ranking inputs (traffic, velocity,
+        cluster size) are set per keyword. Posts without a fullname are not
+        cached.
+        """
+        if not fullname or fullname == "t3_":
+            return build()
+        with self._lock:
+            post = self._posts.get(fullname)
+            if post is not None:
+                self.hits += 1
+                return copy.copy(post)
+        # Built outside the lock; a concurrent build of the same post is harmless
+        post = build()
+        with self._lock:
+            self.misses += 1
+            self._posts.setdefault(fullname, post)
+        return copy.copy(post)
+
+    def stats(self) -> Dict:
+        return {"posts_built": self.misses, "posts_reused": self.hits}
@@ -1,9 +1,17 @@
 """
 Demo mode - generates sample Reddit posts for testing without Reddit API
+
+Also provides SyntheticCorpus, a seeded generator of Reddit-shaped listings
+at any scale (millions of posts) for load tests and benchmarks (see
+benchmarks/stub_server.py). generate_demo_posts does not use SyntheticCorpus.
 """
-from typing import List, Dict
+from typing import Iterator, List, Dict, Optional
 from datetime import datetime, timedelta
+import itertools
+import math
 import random
+import time
+import zlib
 
 
 def generate_demo_posts(keyword: str, count: int = 5) -> List[Dict]:
@@ -98,3 +106,207 @@ def generate_demo_posts(keyword: str, count: int = 5) -> List[Dict]:
     
     return sample_posts[:count]
 
+
+# Subreddits in popularity order; picks follow a Zipf-like distribution
+CORPUS_SUBREDDITS = [
+    "AskReddit", "technology", "programming", "webdev", "startups",
+    "Entrepreneur", "marketing", "SEO", "smallbusiness", "productivity",
+    "learnprogramming", "Python", "javascript", "datascience", "SaaS",
+    "sysadmin", "devops", "cscareerquestions", "freelance", "ecommerce",
+    "digital_marketing", "socialmedia", "growthhacking", "indiehackers",
+    "nocode", "sideproject", "ProductManagement", "UXDesign", "analytics",
+    "content_marketing",
+]
+_TITLE_TEMPLATES = [
+    "Best practices for {kw} in {year}?",
+    "Anyone else struggling with {kw}?",
+    "How do you handle {kw} for {topic}?",
+    "{kw} vs {topic}: which one should I pick?",
+    "I built a {topic} tool around {kw}, feedback welcome",
+    "What's your {kw} stack for {topic}?",
+    "Is {kw} worth it for a small {topic} team?",
+    "Lessons learned after a year of {kw}",
+    "Beginner question about {kw} and {topic}",
+    "{kw} finally clicked for me - here's what helped",
+]
+_OTHER_TEMPLATES = [
+    "What's the best way to learn {topic}?",
+    "Weekly {topic} discussion thread",
+    "My {topic} side project just hit its first milestone",
+    "Hiring for {topic} - what should I look for?",
+    "Unpopular opinion about {topic}",
+]
+_WORDS = (
+    "api data cloud pricing growth users traffic search content email design "
+    "mobile backend frontend analytics automation workflow startup budget "
+    "customers revenue launch testing hosting security performance database "
+    "scaling hiring remote agency clients outreach newsletter community "
+    "onboarding retention churn funnel landing conversion ranking links"
+).split()
+_BASE36 = "0123456789abcdefghijklmnopqrstuvwxyz"
+# Posts generated per seeded block; listings of any page size cut across blocks
+_BLOCK = 100
+# Leading id characters that identify the corpus (keyword hash) in post ids
+_PREFIX_LEN = 7
+
+
+def _base36(number: int, width: int = 0) -> str:
+    digits = []
+    while number:
+        number, rem = divmod(number, 36)
+        digits.append(_BASE36[rem])
+    return ("".join(reversed(digits)) or "0").rjust(width, "0")
+
+
+class SyntheticCorpus:
+    """
+    Deterministic, lazily generated corpus of raw Reddit listing posts.
+
+    Post `i` of a corpus depends only on (seed, keyword, i, now), so pages can
+    be generated independently and in any order without holding the corpus
+    in memory. Distributions are shaped after real search results: log-normal
+    scores with comments correlated to score, recency-skewed ages, Zipf-like
+    subreddit and author popularity, and a mix of link posts and self posts
+    with log-normal body lengths.
+    """
+
+    def __init__(
+        self,
+        keyword: str,
+        size: int = 1_000_000,
+        seed: int = 0,
+        now: Optional[float] = None,
+        relevant_share: float = 0.7,
+    ):
+        """
+        Initialize the corpus.
+
+        Args:
+            keyword: Search term mixed into the titles/bodies of relevant posts
+            size: Number of posts in the corpus
+            seed: Seed for every random choice
+            now: Reference epoch time for post ages (defaults to the current time)
+            relevant_share: Fraction of posts that mention the keyword
+        """
+        self.keyword = keyword
+        self.size = size
+        self.seed = seed
+        self.now = float(now if now is not None else int(time.time()))
+        self.relevant_share = relevant_share
+        self.key = zlib.crc32(f"{seed}:{keyword}".encode())
+        self.prefix = _base36(self.key, _PREFIX_LEN)
+
+        rng = random.Random(self.key)
+        # Shared filler text; bodies are slices of it (cheap at any scale)
+        self._filler = " ".join(rng.choice(_WORDS) for _ in range(4000))
+        weights = [1 / (rank + 1) ** 1.1 for rank in range(len(CORPUS_SUBREDDITS))]
+        self._subreddit_cum = list(itertools.accumulate(weights))
+
+    def post_id(self, index: int) -> str:
+        return self.prefix + _base36(index)
+
+    def index_of(self, post_id: str) -> Optional[int]:
+        """Corpus index of a post id, or None if it belongs to another corpus."""
+        if len(post_id) <= _PREFIX_LEN or not post_id.startswith(self.prefix):
+            return None
+        try:
+            index = int(post_id[_PREFIX_LEN:], 36)
+        except ValueError:
+            return None
+        return index if index < self.size else None
+
+    def _block(self, block: int) -> List[Dict]:
+        rng = random.Random(self.key * 1_000_003 + block)
+        start = block * _BLOCK
+        posts = []
+        keyword = self.keyword
+        for index in range(start, min(start + _BLOCK, self.size)):
+            post_id = self.post_id(index)
+            subreddit = rng.choices(CORPUS_SUBREDDITS, cum_weights=self._subreddit_cum)[0]
+            relevant = rng.random() < self.relevant_share
+            topic = " ".join(rng.sample(_WORDS, 2))
+            template = rng.choice(_TITLE_TEMPLATES if relevant else _OTHER_TEMPLATES)
+            title = template.format(kw=keyword, topic=topic, year=2020 + rng.randrange(6))
+
+            score = min(int(rng.lognormvariate(2.0, 1.6)), 150_000)
+            comments = min(
+                int(score * rng.lognormvariate(-1.2, 0.9)) + rng.randrange(4), 40_000
+            )
+            age_days = min(rng.expovariate(1 / 60), 3 * 365)
+
+            if rng.random() < 0.35:
+                selftext = ""  # link post
+            else:
+                length = min(int(rng.lognormvariate(5.8, 1.0)), 10_000)
+                offset = rng.randrange(len(self._filler) // 2)
+                selftext = self._filler[offset : offset + length]
+                if relevant and rng.random() < 0.5:
+                    selftext = f"{selftext} {keyword}"
+
+            posts.append(
+                {
+                    "id": post_id,
+                    "name": f"t3_{post_id}",
+                    "title": title,
+                    "selftext": selftext,
+                    "permalink": f"/r/{subreddit}/comments/{post_id}/thread/",
+                    "subreddit": subreddit,
+                    "score": score,
+                    "num_comments": comments,
+                    "created_utc": round(self.now - age_days * 86400, 1),
+                    "author": f"user_{int(rng.paretovariate(1.1)) % 50_000}",
+                    "subreddit_subscribers": 5_000_000
+                    // (CORPUS_SUBREDDITS.index(subreddit) + 1),
+                    "over_18": False,
+                }
+            )
+        return posts
+
+    def post(self, post_id: str) -> Optional[Dict]:
+        """Regenerate a single post by id (e.g. for /api/info lookups)."""
+        index = self.index_of(post_id)
+        if index is None:
+            return None
+        return self._block(index // _BLOCK)[index % _BLOCK]
+
+    def slice(self, start: int, count: int) -> List[Dict]:
+        """Posts [start, start + count) of the corpus."""
+        end = min(start + count, self.size)
+        posts: List[Dict] = []
+        for block in range(start // _BLOCK, math.ceil(end / _BLOCK)):
+            block_start = block * _BLOCK
+            posts.extend(
+                self._block(block)[max(start - block_start, 0) : end - block_start]
+            )
+        return posts
+
+    def batches(self, batch_size: int = 1000) -> Iterator[List[Dict]]:
+        """The whole corpus as in-memory batches of raw posts."""
+        for start in range(0, self.size, batch_size):
+            yield self.slice(start, batch_size)
+
+    def iter_posts(self) -> Iterator[Dict]:
+        for block in range(math.ceil(self.size / _BLOCK)):
+            yield from self._block(block)
+
+    def listing(self, after: Optional[str] = None, limit: int = 100) -> Dict:
+        """
+        One page of the corpus shaped like a reddit.com search response.
+
+        `after` is the fullname of the last post of the previous page, as
+        returned in the previous page's `after` field.
+        """
+        start = 0
+        if after:
+            index = self.index_of(after[3:] if after.startswith("t3_") else after)
+            start = index + 1 if index is not None else self.size
+        children = [{"kind": "t3", "data": raw} for raw in self.slice(start, limit)]
+        next_after = (
+            children[-1]["data"]["name"]
+            if children and start + len(children) < self.size
+            else None
+        )
+        return {
+            "kind": "Listing",
+            "data": {"after": next_after, "dist": len(children), "children": children},
+        }
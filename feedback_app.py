@@ -148,7 +148,7 @@ def analyze_website():
         url = 'https://' + url
     
     try:
-        product_info = website_analyzer.analyze_website(url)
+        product_info = website_analyzer.analyze_website(url, crawl=bool(data.get('crawl', False)))
         return jsonify({'success': True, 'product_info': product_info})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
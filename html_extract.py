@@ -0,0 +1,544 @@
+"""
+Single-pass, incremental HTML extraction shared by the website scrapers.
+
+PageExtractor is fed HTML in chunks as it downloads and collects everything
+the scrapers need in one pass over parser events: title, meta description and
+keywords, OpenGraph tags, headings, the main content region and the page's
+visible text, plus links and any JSON-LD blocks (see structured_data,
+site_crawler). It replaces building a BeautifulSoup tree, running several
+find() calls and decomposing nodes, and sequential regex passes over the full
+document.
+
+The lxml target parser is used when lxml is installed (an optional
+dependency, see requirements.txt); otherwise a regex tokenizer drives the
+same handlers with the events the stdlib HTMLParser would produce, without
+HTMLParser's per-tag overhead. Past the text limit, where only <meta> tags
+and JSON-LD are still wanted, the stdlib backend hands the rest of the page
+to a scanner (_StructuredScanner) that skips every other tag.
+"""
+import html
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from lxml import etree  # Optional: faster parser backend
+except ImportError:  # pragma: no cover - optional dependency
+    etree = None
+
+# Elements whose content is never visible text
+INVISIBLE_TAGS = frozenset({"script", "style", "noscript", "template", "svg"})
+# Page chrome left out of the main content (as WebsiteScraper always did)
+CHROME_TAGS = frozenset({"script", "style", "nav", "footer", "header"})
+HEADING_TAGS = frozenset({"h1", "h2", "h3"})
+# Main content candidates, in order of preference
+_CONTENT_CLASS = re.compile(r"content|main|article", re.IGNORECASE)
+MAX_HEADINGS = 30
+MAX_LINKS = 500
+# HTML characters read past the text limit for <meta> tags and JSON-LD
+STRUCTURED_SCAN_CHARS = 64 * 1024
+
+
+@dataclass(slots=True)
+class PageInfo:
+    title: str = ""
+    description: str = ""
+    keywords: str = ""
+    meta: Dict[str, str] = field(default_factory=dict)  # <meta name=...> -> content
+    og: Dict[str, str] = field(default_factory=dict)  # og:title/product:* -> content
+    headings: List[str] = field(default_factory=list)  # h1-h3, in page order
+    main_content: str = ""  # main/article/content region, without page chrome
+    text: str = ""  # all visible text (cut to the extractor's text_limit)
+    json_ld: List[str] = field(default_factory=list)  # raw application/ld+json blocks
+    links: List[Tuple[str, str]] = field(default_factory=list)  # (href, anchor text)
+
+
+class _Capture:
+    """Text of one element, collected until its matching end tag."""
+
+    __slots__ = ("tag", "depth", "parts", "href")
+
+    def __init__(self, tag: str, href: str = ""):
+        self.tag = tag
+        self.depth = 1
+        self.parts: List[str] = []
+        self.href = href
+
+
+class _Handlers:
+    """Parser event handlers (the lxml target interface)."""
+
+    def __init__(self, text_limit: Optional[int]):
+        self.text_limit = text_limit
+        self.meta: Dict[str, str] = {}
+        self.og: Dict[str, str] = {}
+        self.headings: List[str] = []
+        self.title: Optional[str] = None
+        self.h1: Optional[str] = None
+        self.first_paragraph: Optional[str] = None
+        # Visible text, and text outside page chrome (main content fallback)
+        self.text_parts: List[str] = []
+        self.text_length = 0
+        self.content_parts: List[str] = []
+        # Words of the first <main>, <article> and content-classed <div>
+        self.regions: Dict[str, List[str]] = {}  # keyed by tag
+        self.json_ld: List[str] = []
+        self.links: List[Tuple[str, str]] = []
+
+        self._invisible = 0
+        self._chrome = 0
+        self._captures: List[_Capture] = []  # title/h1-h3/p/a being collected
+        self._open_regions: List[_Capture] = []
+        self._seen: set = set()
+        # Text since the last tag; parsers may split a run of text anywhere
+        # (e.g. at chunk boundaries), so it is handled as one at the next tag
+        self._pending: List[str] = []
+        self._json_ld: Optional[List[str]] = None  # JSON-LD script being read
+
+    @property
+    def enough(self) -> bool:
+        return self.text_limit is not None and self.text_length >= self.text_limit
+
+    @property
+    def in_json_ld(self) -> bool:
+        return self._json_ld is not None
+
+    def start(self, tag, attrib):
+        self._flush()
+        tag = tag.lower() if isinstance(tag, str) else ""
+        if self.enough:
+            # Past the text limit: only metadata and JSON-LD
+            self._captures.clear()
+            self._open_regions.clear()
+            if tag == "meta":
+                self._meta(attrib)
+            elif tag == "script" and "ld+json" in (attrib.get("type") or "").lower():
+                self._json_ld = []
+            return
+        for capture in self._captures:
+            if capture.tag == tag:
+                capture.depth += 1
+        for region in self._open_regions:
+            if region.tag == tag:
+                region.depth += 1
+
+        if tag in INVISIBLE_TAGS:
+            self._invisible += 1
+        if tag in CHROME_TAGS:
+            self._chrome += 1
+
+        if tag == "meta":
+            self._meta(attrib)
+        elif tag == "script" and "ld+json" in (attrib.get("type") or "").lower():
+            self._json_ld = []
+        elif tag == "title" and "title" not in self._seen:
+            self._begin("title")
+        elif tag in HEADING_TAGS:
+            self._begin(tag)
+        elif tag == "p" and "p" not in self._seen:
+            self._begin("p")
+        elif tag == "a" and attrib.get("href") and len(self.links) < MAX_LINKS:
+            self._captures.append(_Capture("a", attrib["href"].strip()))
+
+        region = None
+        if tag in ("main", "article") and tag not in self.regions:
+            region = tag
+        elif (
+            tag == "div"
+            and "div" not in self.regions
+            and _CONTENT_CLASS.search(attrib.get("class", "") or "")
+        ):
+            region = "div"
+        if region is not None:
+            self.regions[region] = []
+            self._open_regions.append(_Capture(tag))
+
+    def _begin(self, tag: str) -> None:
+        if tag in ("title", "p"):
+            self._seen.add(tag)
+        self._captures.append(_Capture(tag))
+
+    def _meta(self, attrib) -> None:
+        content = (attrib.get("content") or "").strip()
+        name = (attrib.get("name") or "").strip().lower()
+        prop = (attrib.get("property") or "").strip().lower()
+        if name and name not in self.meta:
+            self.meta[name] = content
+        if prop.startswith(("og:", "product:")) and prop not in self.og:
+            self.og[prop] = content
+
+    def end(self, tag):
+        self._flush()
+        tag = tag.lower() if isinstance(tag, str) else ""
+        if tag == "script" and self._json_ld is not None:
+            self.json_ld.append("".join(self._json_ld))
+            self._json_ld = None
+        if tag in INVISIBLE_TAGS and self._invisible:
+            self._invisible -= 1
+        if tag in CHROME_TAGS and self._chrome:
+            self._chrome -= 1
+
+        if self._captures:
+            for capture in list(self._captures):
+                if capture.tag == tag:
+                    capture.depth -= 1
+                    if capture.depth == 0:
+                        self._captures.remove(capture)
+                        self._finish(capture)
+        if self._open_regions:
+            for region in list(self._open_regions):
+                if region.tag == tag:
+                    region.depth -= 1
+                    if region.depth == 0:
+                        self._open_regions.remove(region)
+
+    def _finish(self, capture: _Capture) -> None:
+        raw = "".join(capture.parts)
+        if capture.tag == "title":
+            self.title = raw.strip()
+        elif capture.tag == "p":
+            self.first_paragraph = raw.strip()
+        elif capture.tag == "a":
+            if len(self.links) < MAX_LINKS:
+                self.links.append((capture.href, " ".join(raw.split())))
+        else:
+            heading = " ".join(raw.split())
+            if capture.tag == "h1" and self.h1 is None:
+                self.h1 = raw.strip()
+            if heading and len(self.headings) < MAX_HEADINGS:
+                self.headings.append(heading)
+
+    def data(self, data):
+        if self._json_ld is not None:
+            self._json_ld.append(data)
+        elif not self._invisible:
+            self._pending.append(data)
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        data = "".join(self._pending)
+        self._pending.clear()
+        for capture in self._captures:
+            capture.parts.append(data)
+
+        if self.enough:
+            # Past the text limit only metadata and JSON-LD are still read
+            return
+        words = data.split()
+        if not words:
+            return
+        chunk = " ".join(words)
+        self.text_parts.append(chunk)
+        self.text_length += len(chunk) + 1
+        if not self._chrome:
+            self.content_parts.append(chunk)
+            for region in self._open_regions:
+                self.regions[region.tag].append(chunk)
+
+    def comment(self, text):
+        pass
+
+    def close(self):
+        self._flush()
+
+
+# Attributes of a tag up to its ">"; quotes only delimit a value right after
+# "=", and a quoted value may contain ">"
+_TAG_ATTRIBUTES = r"((?:[^>=]|=\s*\"[^\"]*\"|=\s*'[^']*'|=(?!\s*[\"']))*)"
+_TAG = re.compile(r"<(/?)([a-zA-Z][^\t\n\f\r />]*)" + _TAG_ATTRIBUTES + ">")
+# A tag cut off by the end of the input (possibly inside a quoted value)
+_PARTIAL_TAG = re.compile(
+    r"</?[a-zA-Z][^\t\n\f\r />]*" + _TAG_ATTRIBUTES + r"(?:=\s*(?:\"[^\"]*|'[^']*)?)?\Z"
+)
+# Past the text limit: comments, and <meta>/<script>/<style> tags
+_STRUCTURED_TAG = re.compile(
+    r"<!--|<(meta|script|style)\b" + _TAG_ATTRIBUTES + ">", re.IGNORECASE
+)
+_ATTRIBUTE = re.compile(
+    r"""([^\s=/>"']+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?"""
+)
+_CLOSE_TAG = {
+    "script": re.compile(r"</script\s*>", re.IGNORECASE),
+    "style": re.compile(r"</style\s*>", re.IGNORECASE),
+}
+
+
+def _attributes(source: str) -> Dict[str, str]:
+    """Attributes of a start tag, unescaped like HTMLParser's (first one wins)."""
+    attrib: Dict[str, str] = {}
+    for name, double, single, bare in _ATTRIBUTE.findall(source):
+        name = name.lower()
+        if name not in attrib:
+            attrib[name] = html.unescape(double or single or bare)
+    return attrib
+
+
+class _StructuredScanner:
+    """
+    Finds <meta> tags and JSON-LD scripts without tokenizing other tags.
+
+    Comments and the bodies of other scripts/styles are skipped as HTMLParser
+    would. A construct split across chunks is kept until the next feed().
+    """
+
+    def __init__(self, handlers: _Handlers, rawdata: str = ""):
+        self.handlers = handlers
+        self.rawdata = rawdata
+        self.in_json_ld = False  # an ld+json script is waiting for its end tag
+
+    def feed(self, data: str) -> None:
+        text = self.rawdata + data
+        pos = 0
+        self.in_json_ld = False
+        while True:
+            match = _STRUCTURED_TAG.search(text, pos)
+            if match is None:
+                # Keep the last tag, which may still be arriving
+                start = text.rfind("<", pos)
+                pos = start if start != -1 else len(text)
+                break
+            tag = match.group(1)
+            if tag is None:
+                end = text.find("-->", match.end())
+                if end == -1:
+                    pos = match.start()
+                    break
+                pos = end + 3
+                continue
+            tag = tag.lower()
+            attrib = _attributes(match.group(2))
+            if tag == "meta":
+                self.handlers.start("meta", attrib)
+                self.handlers.end("meta")
+                pos = match.end()
+                continue
+            close = _CLOSE_TAG[tag].search(text, match.end())
+            json_ld = tag == "script" and "ld+json" in attrib.get("type", "").lower()
+            if close is None:
+                self.in_json_ld = json_ld
+                pos = match.start()
+                break
+            if json_ld:
+                self.handlers.start("script", attrib)
+                self.handlers.data(text[match.end() : close.start()])
+                self.handlers.end("script")
+            pos = close.end()
+        self.rawdata = text[pos:]
+
+    def close(self) -> None:
+        # Like HTMLParser, an unterminated script yields nothing
+        self.rawdata = ""
+
+
+class _StdlibParser:
+    """
+    Regex tokenizer feeding the shared handlers (the stdlib backend).
+
+    Emits the events HTMLParser(convert_charrefs=True) would for the tags and
+    text the handlers use, at a fraction of HTMLParser's per-tag cost:
+    character references in text and attribute values are unescaped, comments,
+    doctypes and processing instructions are skipped, and <script>/<style>
+    bodies are passed through raw. Text is only handed over once the next tag
+    arrives, so references split across chunks are unescaped whole.
+    """
+
+    def __init__(self, handlers: _Handlers):
+        self.handlers = handlers
+        self.rawdata = ""  # input not tokenized yet
+        self.cdata_elem: Optional[str] = None  # open <script>/<style>
+
+    def _text(self, text: str) -> None:
+        self.handlers.data(html.unescape(text) if "&" in text else text)
+
+    def feed(self, data: str) -> None:
+        handlers = self.handlers
+        text = self.rawdata + data
+        pos = 0
+        while True:
+            if self.cdata_elem is not None:
+                close = _CLOSE_TAG[self.cdata_elem].search(text, pos)
+                if close is None:
+                    break
+                if close.start() > pos:
+                    handlers.data(text[pos : close.start()])
+                handlers.end(self.cdata_elem)
+                self.cdata_elem = None
+                pos = close.end()
+                continue
+
+            lt = text.find("<", pos)
+            if lt == -1:
+                break
+            if lt > pos:
+                self._text(text[pos:lt])
+                pos = lt
+            match = _TAG.match(text, lt)
+            if match is not None:
+                closing, tag, attributes = match.groups()
+                tag = tag.lower()
+                if closing:
+                    handlers.end(tag)
+                else:
+                    handlers.start(tag, _attributes(attributes) if attributes else {})
+                    if attributes.endswith("/"):
+                        handlers.end(tag)
+                    elif tag in _CLOSE_TAG:
+                        self.cdata_elem = tag
+                pos = match.end()
+                continue
+            if text.startswith("<!--", lt):
+                end = text.find("-->", lt + 4)
+                if end == -1:
+                    break
+                pos = end + 3
+                continue
+            if lt + 1 == len(text) or _PARTIAL_TAG.match(text, lt):
+                # A tag still arriving
+                break
+            if text.startswith(("<!", "<?", "</"), lt):
+                end = text.find(">", lt)
+                if end == -1:
+                    break
+                # Doctype, processing instruction or malformed end tag
+                pos = end + 1
+                continue
+            # A "<" that starts no tag is text
+            self._text("<")
+            pos = lt + 1
+        self.rawdata = text[pos:]
+
+    def close(self) -> None:
+        rest, self.rawdata = self.rawdata, ""
+        if self.cdata_elem is not None:
+            # Like HTMLParser, an unterminated script/style is passed as is
+            if rest:
+                self.handlers.data(rest)
+        elif rest:
+            self._text(rest)
+
+
+class PageExtractor:
+    """Incremental single-pass page extractor."""
+
+    def __init__(
+        self,
+        text_limit: Optional[int] = None,
+        backend: Optional[str] = None,
+        scan_structured: bool = False,
+        structured_budget: int = STRUCTURED_SCAN_CHARS,
+    ):
+        """
+        Initialize the extractor.
+
+        Args:
+            text_limit: Characters of visible text wanted; once collected,
+                        feed() returns True so the caller can stop downloading
+            backend: "lxml" or "stdlib" (default: lxml when installed)
+            scan_structured: Keep parsing past `text_limit` for <meta> tags and
+                             JSON-LD blocks (often at the end of <body>)
+            structured_budget: Characters of HTML that scan reads past
+                               `text_limit` before feed() asks to stop (a
+                               JSON-LD block being read is always finished)
+        """
+        self.handlers = _Handlers(text_limit)
+        self.scan_structured = scan_structured
+        self._structured_left = structured_budget
+        self.backend = backend or ("lxml" if etree is not None else "stdlib")
+        if self.backend == "lxml":
+            if etree is None:
+                raise ImportError("lxml is not installed")
+            self._parser = etree.HTMLParser(target=self.handlers, recover=True)
+        else:
+            self._parser = _StdlibParser(self.handlers)
+        self._closed = False
+
+    def feed(self, data: str) -> bool:
+        """
+        Parse the next chunk of HTML.
+
+        Returns:
+            True once `text_limit` characters of visible text have been
+            collected, and with `scan_structured` the structured-data budget
+            spent too (the signature PageFetcher.fetch expects from `consume`)
+        """
+        if self._done():
+            return True
+        if self.handlers.enough:
+            self._structured_left -= len(data)
+        self._parser.feed(data)
+        if self._should_scan():
+            # Only metadata and JSON-LD are wanted from here on; carry over
+            # what the tokenizer has buffered but not parsed yet
+            self._parser = _StructuredScanner(self.handlers, self._parser.rawdata)
+        return self._done()
+
+    def _should_scan(self) -> bool:
+        """Whether the stdlib parser can hand over to the structured scanner."""
+        parser = self._parser
+        return (
+            isinstance(parser, _StdlibParser)
+            and self.scan_structured
+            and self.handlers.enough
+            and not self.handlers.in_json_ld
+            and parser.cdata_elem is None  # not inside a <script>/<style>
+        )
+
+    def _done(self) -> bool:
+        handlers = self.handlers
+        if not handlers.enough:
+            return False
+        if not self.scan_structured:
+            return True
+        if isinstance(self._parser, _StructuredScanner) and self._parser.in_json_ld:
+            return False
+        return self._structured_left <= 0 and not handlers.in_json_ld
+
+    def close(self) -> PageInfo:
+        """Finish parsing and return what was extracted."""
+        handlers = self.handlers
+        if not self._closed:
+            self._closed = True
+            try:
+                self._parser.close()
+            except Exception:
+                # lxml raises on empty documents; nothing was extracted anyway
+                pass
+            handlers.close()  # the stdlib parser does not call it
+
+        meta, og = handlers.meta, handlers.og
+        title = handlers.title or og.get("og:title", "") or handlers.h1 or ""
+        description = meta.get("description") or og.get("og:description") or ""
+        if not description and handlers.first_paragraph and len(handlers.first_paragraph) > 50:
+            description = handlers.first_paragraph[:200]
+
+        main_words = None
+        for region in ("main", "article", "div"):
+            if region in handlers.regions:
+                main_words = handlers.regions[region]
+                break
+        if main_words is None:
+            main_words = handlers.content_parts
+
+        text = " ".join(handlers.text_parts)
+        if handlers.text_limit is not None:
+            text = text[: handlers.text_limit]
+        return PageInfo(
+            title=title,
+            description=description,
+            keywords=meta.get("keywords", ""),
+            meta=dict(meta),
+            og=dict(og),
+            headings=list(handlers.headings),
+            main_content=" ".join(main_words),
+            text=text,
+            json_ld=list(handlers.json_ld),
+            links=list(handlers.links),
+        )
+
+
+def extract(html: str, text_limit: Optional[int] = None, backend: Optional[str] = None) -> PageInfo:
+    """Extract PageInfo from a complete document."""
+    extractor = PageExtractor(text_limit=text_limit, backend=backend)
+    extractor.feed(html)
+    return extractor.close()
@@ -0,0 +1,157 @@
+"""
+Record/replay HTTP fixtures for requests.Session.
+
+Mounting a ReplayAdapter on a session makes every request either go to the
+network and be saved as a JSON fixture ("record"), or be answered from a
+saved fixture without any network access ("replay"). Fixtures are keyed by
+method, path and query string (host and credentials excluded), so pages
+recorded from reddit.com or Ahrefs can also be served by
+benchmarks/stub_server.py.
+
+Sessions opt in through the environment:
+
+    HTTP_REPLAY_MODE=record|replay
+    HTTP_REPLAY_DIR=path/to/fixtures
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+# Query parameters never written to fixtures or used in keys
+SECRET_PARAMS = {"token", "access_token", "api_key"}
+# Response headers worth keeping (rate-limit pacing and caching)
+KEPT_HEADERS = (
+    "Content-Type",
+    "Retry-After",
+    "X-Ratelimit-Remaining",
+    "X-Ratelimit-Reset",
+    "X-Ratelimit-Used",
+    "ETag",
+    "Last-Modified",
+    "Cache-Control",
+)
+
+
+def fixture_key(method: str, url: str) -> str:
+    """Stable fixture name for a request, independent of host and secrets."""
+    parts = urlsplit(url)
+    query = sorted(
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k not in SECRET_PARAMS
+    )
+    canonical = f"{method.upper()} {parts.path}?{urlencode(query)}"
+    return hashlib.sha1(canonical.encode()).hexdigest()[:20]
+
+
+def load_fixture(directory: str, method: str, url: str) -> Optional[Dict]:
+    """Return a saved fixture for a request, or None."""
+    path = os.path.join(directory, fixture_key(method, url) + ".json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class ReplayAdapter(HTTPAdapter):
+    """Transport adapter that records responses to, or replays them from, disk."""
+
+    def __init__(self, directory: str, mode: str = "replay", **kwargs):
+        """
+        Initialize the adapter.
+
+        Args:
+            directory: Fixture directory (created when recording)
+            mode: "record" (network + save) or "replay" (disk only)
+            **kwargs: Passed to HTTPAdapter (pool sizes for recording)
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown replay mode: {mode}")
+        super().__init__(**kwargs)
+        self.directory = directory
+        self.mode = mode
+        self.recorded = 0
+        self.replayed = 0
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        if self.mode == "replay":
+            fixture = load_fixture(self.directory, request.method, request.url)
+            if fixture is None:
+                raise requests.ConnectionError(
+                    f"No recorded fixture for {request.method} {request.url}",
+                    request=request,
+                )
+            with self._lock:
+                self.replayed += 1
+            return self._build(request, fixture)
+
+        resp = super().send(request, **kwargs)
+        self._save(request, resp)
+        return resp
+
+    def _save(self, request, resp) -> None:
+        parts = urlsplit(request.url)
+        query = [
+            (k, v)
+            for k, v in parse_qsl(parts.query, keep_blank_values=True)
+            if k not in SECRET_PARAMS
+        ]
+        fixture = {
+            "method": request.method,
+            "path": parts.path,
+            "query": urlencode(query),
+            "status": resp.status_code,
+            "headers": {k: resp.headers[k] for k in KEPT_HEADERS if k in resp.headers},
+            "body": resp.content.decode(resp.encoding or "utf-8", errors="replace"),
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(
+            self.directory, fixture_key(request.method, request.url) + ".json"
+        )
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(fixture, f)
+        with self._lock:
+            self.recorded += 1
+
+    @staticmethod
+    def _build(request, fixture: Dict) -> requests.Response:
+        resp = requests.Response()
+        resp.status_code = fixture.get("status", 200)
+        resp.headers = CaseInsensitiveDict(fixture.get("headers", {}))
+        resp._content = fixture.get("body", "").encode("utf-8")
+        # No raw stream behind the body: streamed reads and close() use _content
+        resp._content_consumed = True
+        resp.encoding = "utf-8"
+        resp.url = request.url
+        resp.request = request
+        resp.reason = "Replayed"
+        return resp
+
+
+def configure_session(session: requests.Session, **adapter_kwargs) -> Optional[ReplayAdapter]:
+    """
+    Mount a ReplayAdapter on `session` when HTTP_REPLAY_MODE is set.
+
+    Returns:
+        The mounted adapter, or None when record/replay is off
+    """
+    mode = os.getenv("HTTP_REPLAY_MODE", "").strip().lower()
+    if not mode or mode == "off":
+        return None
+    directory = os.getenv(
+        "HTTP_REPLAY_DIR",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures"),
+    )
+    adapter = ReplayAdapter(directory, mode=mode, **adapter_kwargs)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return adapter
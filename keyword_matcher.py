@@ -0,0 +1,115 @@
+"""
+Precompiled keyword relevance matching.
+
+A KeywordMatcher is built once per keyword set and scores every keyword
+against a post (title and body) in a single regex pass, instead of
+lowercasing and substring-scanning the text once per keyword and field.
+"""
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+class KeywordMatcher:
+    """
+    Scores a set of keywords against text in one pass.
+
+    Semantics match the original per-keyword check: a keyword is relevant to
+    a field (title or body) when the whole keyword appears in it, or, for
+    multi-word keywords, when at least 70% of its words appear in that same
+    field. Matching is case-insensitive substring matching.
+    """
+
+    WORD_MATCH_RATIO = 0.7
+    # Joins title and body for the single scan; no search term can contain it
+    _SEPARATOR = "\x00"
+
+    def __init__(self, keywords: Iterable[str]):
+        """
+        Compile the matcher.
+
+        Args:
+            keywords: Keywords to score (blank entries are ignored)
+        """
+        self.keywords: Tuple[str, ...] = tuple(
+            dict.fromkeys(k for k in keywords if k and k.strip())
+        )
+
+        # keyword -> (phrase, words); words is empty for single-word keywords
+        self._specs: Dict[str, Tuple[str, Tuple[str, ...]]] = {}
+        terms: Set[str] = set()
+        for keyword in self.keywords:
+            phrase = keyword.lower()
+            words = tuple(phrase.split())
+            self._specs[keyword] = (phrase, words if len(words) > 1 else ())
+            terms.add(phrase)
+            terms.update(words)
+
+        # A zero-width lookahead lets matches overlap, so every position is
+        # tried; longest-first alternation means a hit at a position also
+        # implies every shorter term that is a prefix of it.
+        ordered = sorted(terms, key=len, reverse=True)
+        self._pattern = (
+            re.compile("(?=(" + "|".join(re.escape(t) for t in ordered) + "))")
+            if ordered
+            else None
+        )
+        self._implied: Dict[str, Tuple[str, ...]] = {
+            term: tuple(t for t in ordered if term.startswith(t)) for term in ordered
+        }
+
+    def _found_terms(self, title: str, body: str) -> Tuple[Set[str], Set[str]]:
+        """Return the terms present in the title and in the body."""
+        found_title: Set[str] = set()
+        found_body: Set[str] = set()
+        if self._pattern is None or not (title or body):
+            return found_title, found_body
+
+        title = title.lower()
+        text = f"{title}{self._SEPARATOR}{body.lower()}"
+        split = len(title)
+        seen: Set[Tuple[bool, str]] = set()
+        for match in self._pattern.finditer(text):
+            in_title = match.start() < split
+            term = match.group(1)
+            if (in_title, term) in seen:
+                continue
+            seen.add((in_title, term))
+            (found_title if in_title else found_body).update(self._implied[term])
+        return found_title, found_body
+
+    def _field_relevant(self, keyword: str, found: Set[str]) -> bool:
+        phrase, words = self._specs[keyword]
+        if phrase in found:
+            return True
+        if words:
+            matches = sum(1 for word in words if word in found)
+            return matches >= len(words) * self.WORD_MATCH_RATIO
+        return False
+
+    def relevant_keywords(self, title: str, body: str = "") -> List[str]:
+        """Return the keywords relevant to a post, in keyword order."""
+        found_title, found_body = self._found_terms(title or "", body or "")
+        if not (found_title or found_body):
+            return []
+        return [
+            keyword
+            for keyword in self.keywords
+            if self._field_relevant(keyword, found_title)
+            or self._field_relevant(keyword, found_body)
+        ]
+
+    def is_relevant(self, keyword: str, title: str, body: str = "") -> bool:
+        """Check one of the matcher's keywords against a post."""
+        if keyword not in self._specs:
+            raise KeyError(f"Keyword not compiled into matcher: {keyword!r}")
+        found_title, found_body = self._found_terms(title or "", body or "")
+        return self._field_relevant(keyword, found_title) or self._field_relevant(
+            keyword, found_body
+        )
+
+
+@lru_cache(maxsize=256)
+def get_matcher(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    """Return a (cached) compiled matcher for a keyword set."""
+    return KeywordMatcher(keywords)
@@ -0,0 +1,190 @@
+"""
+Near-duplicate title clustering (MinHash + LSH).
+
+Reposts and near-identical titles across subreddits are grouped by the
+Jaccard similarity of their character shingles to each cluster's first
+title (its head). MinHash signatures of the heads are split into LSH bands,
+and a new title is compared only with a bounded number of heads sharing a
+band bucket with it, which keeps clustering linear in the pool size. Each
+cluster collapses to its best-scoring post, which records the cluster size.
+"""
+import random
+import re
+import zlib
+from collections import deque
+from typing import Callable, Deque, Dict, FrozenSet, List, Sequence
+
+try:
+    import numpy as np  # Optional: vectorizes MinHash signatures
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from reddit_post import Post
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+_PRIME = (1 << 31) - 1
+
+
+def title_shingles(title: str, size: int = 4) -> FrozenSet[int]:
+    """Hashed character shingles of a normalized title."""
+    text = _NON_WORD.sub(" ", (title or "").lower()).strip()
+    if len(text) <= size:
+        return frozenset([zlib.crc32(text.encode())]) if text else frozenset()
+    return frozenset(
+        zlib.crc32(text[i : i + size].encode()) for i in range(len(text) - size + 1)
+    )
+
+
+def jaccard(a: FrozenSet[int], b: FrozenSet[int]) -> float:
+    if not a or not b:
+        return 0.0
+    common = len(a & b)
+    return common / (len(a) + len(b) - common)
+
+
+class NearDuplicateClusterer:
+    """Groups posts whose titles are near duplicates."""
+
+    def __init__(
+        self,
+        threshold: float = 0.7,
+        bands: int = 4,
+        rows: int = 4,
+        seed: int = 1,
+        max_candidates: int = 16,
+    ):
+        """
+        Initialize the clusterer.
+
+        Args:
+            threshold: Minimum shingle Jaccard similarity for two titles to match
+            bands: LSH bands; with `rows` this sets the candidate threshold,
+                   roughly (1 / bands) ** (1 / rows) (~0.71 for 4 x 4)
+            rows: MinHash values per band
+            seed: Seed for the hash permutations (fixed for stable clusters)
+            max_candidates: Cluster heads a title is compared with at most
+                            (also the heads remembered per LSH bucket)
+        """
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        self.max_candidates = max_candidates
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.randrange(1, _PRIME), rng.randrange(0, _PRIME))
+            for _ in range(bands * rows)
+        ]
+        if np is not None:
+            # a * h stays below 2**63 (a < 2**31, crc32 h < 2**32)
+            self._perm_a = np.array([[a] for a, _ in self._perms], dtype=np.uint64)
+            self._perm_b = np.array([[b] for _, b in self._perms], dtype=np.uint64)
+
+    def signature(self, shingles: FrozenSet[int]) -> tuple:
+        """MinHash signature of a shingle set."""
+        if not shingles:
+            return ()
+        if np is not None:
+            hashes = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+            values = (self._perm_a * hashes + self._perm_b) % np.uint64(_PRIME)
+            return tuple(values.min(axis=1).tolist())
+        return tuple(min((a * h + b) % _PRIME for h in shingles) for a, b in self._perms)
+
+    def index(self) -> "NearDuplicateIndex":
+        """An empty incremental index using this clusterer's settings."""
+        return NearDuplicateIndex(self)
+
+    def cluster(self, posts: Sequence[Post]) -> List[List[int]]:
+        """
+        Cluster posts by title similarity (see NearDuplicateIndex.add).
+
+        Returns:
+            Lists of indices into `posts`, one per cluster (singletons included),
+            ordered by each cluster's first member
+        """
+        index = self.index()
+        for post in posts:
+            index.add(post)
+        return index.clusters
+
+    def count(self, posts: Sequence[Post]) -> int:
+        """Number of posts left once `posts` are collapsed."""
+        return len(self.cluster(posts))
+
+    def collapse(
+        self,
+        posts: Sequence[Post],
+        key: Callable[[Post], float] = lambda post: post.engagement_score,
+    ) -> List[Post]:
+        """
+        Keep the best post (by `key`) of each cluster, in original order.
+
+        The representative's `cluster_size` is set to its cluster's size.
+        """
+        representatives = []
+        for members in self.cluster(posts):
+            best = max(members, key=lambda i: (key(posts[i]), -i))
+            posts[best].cluster_size = len(members)
+            representatives.append(best)
+        return [posts[i] for i in sorted(representatives)]
+
+
+class NearDuplicateIndex:
+    """Clusters built one post at a time, e.g. as search pages arrive."""
+
+    def __init__(self, clusterer: NearDuplicateClusterer):
+        self.clusterer = clusterer
+        self.clusters: List[List[int]] = []
+        self.comparisons = 0
+        self._heads: List[FrozenSet[int]] = []  # head shingles per cluster
+        self._buckets: Dict[tuple, Deque[int]] = {}  # LSH bucket -> cluster ids
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Number of clusters so far."""
+        return len(self.clusters)
+
+    def add(self, post: Post) -> int:
+        """
+        Add the next post and return the id of the cluster it joins.
+
+        A post joins a cluster only if its title meets the threshold against
+        the cluster's head, so A~B and B~C do not chain A and C together
+        unless A~C too. Candidates are the heads sharing an LSH bucket with
+        it, most shared bands first, at most `max_candidates` of them; it
+        joins the most similar one or else starts a new cluster.
+        """
+        clusterer = self.clusterer
+        sh = title_shingles(post.title)
+        sig = clusterer.signature(sh)
+        keys = [
+            (band,) + sig[band * clusterer.rows : (band + 1) * clusterer.rows]
+            for band in range(clusterer.bands if sig else 0)
+        ]
+
+        shared: Dict[int, int] = {}
+        for key in keys:
+            for cluster_id in self._buckets.get(key, ()):
+                shared[cluster_id] = shared.get(cluster_id, 0) + 1
+        candidates = sorted(shared, key=lambda c: (-shared[c], c))
+        best, best_similarity = None, clusterer.threshold
+        for cluster_id in candidates[: clusterer.max_candidates]:
+            self.comparisons += 1
+            similarity = jaccard(sh, self._heads[cluster_id])
+            if similarity >= best_similarity and (
+                best is None or similarity > best_similarity
+            ):
+                best, best_similarity = cluster_id, similarity
+
+        index = self._size
+        self._size += 1
+        if best is None:
+            best = len(self.clusters)
+            self.clusters.append([])
+            self._heads.append(sh)
+            for key in keys:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = self._buckets[key] = deque(maxlen=clusterer.max_candidates)
+                bucket.append(best)
+        self.clusters[best].append(index)
+        return best
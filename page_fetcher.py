@@ -0,0 +1,376 @@
+"""
+Shared page fetch layer for the website scrapers.
+
+WebsiteScraper and WebsiteAnalyzer download product pages through one
+PageFetcher: a pooled session with a single user agent, backed by a disk
+cache that honors Cache-Control / Expires and revalidates stale pages with
+conditional GETs (If-None-Match / If-Modified-Since). A page analyzed in
+feedback_app.py and scraped in app.py is downloaded once; later requests are
+answered from the cache or with a 304.
+
+Downloads are streamed: only allow-listed content types are read, reading
+stops at a byte budget, and a `consume` callback (e.g.
+html_extract.PageExtractor.feed) can end the download early once it
+has what it needs. Pages cut short that way are cached under their own key,
+so they never replace the full page other callers need.
+"""
+import codecs
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ttl_cache import TTLCache, cache_path
+
+USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+)
+_MAX_AGE = re.compile(r"(?:^|,)\s*max-age\s*=\s*(\d+)", re.IGNORECASE)
+_HEADER_CHARSET = re.compile(r"charset\s*=\s*[\"']?([^\s;\"']+)", re.IGNORECASE)
+# <meta charset="..."> and <meta http-equiv="Content-Type" content="...; charset=...">
+_META_CHARSET = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?\s*([a-zA-Z0-9_.:-]+)", re.IGNORECASE)
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+# Bytes searched for a <meta> charset declaration
+CHARSET_SNIFF_BYTES = 4096
+# Media types worth downloading as page text
+ALLOWED_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+CHUNK_SIZE = 16 * 1024
+# Cache key suffix of pages whose download `consume` stopped early
+PARTIAL_KEY_SUFFIX = "#partial"
+
+
+class UnsupportedContentType(requests.RequestException):
+    """The response is not a page we can extract text from (e.g. a PDF)."""
+
+
+@dataclass(slots=True)
+class FetchedPage:
+    url: str  # URL requested
+    final_url: str  # URL after redirects
+    status: int
+    content_type: str
+    text: str
+    from_cache: bool = False  # served without a request
+    revalidated: bool = False  # confirmed unchanged by a 304
+    truncated: bool = False  # download stopped early (byte budget or consume)
+
+
+def _freshness(headers, default_ttl: float, now: float) -> Optional[float]:
+    """
+    Epoch time until which a response may be reused without revalidation.
+
+    Returns None when the response must not be stored at all.
+    """
+    cache_control = headers.get("Cache-Control", "") or ""
+    directives = cache_control.lower()
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return now
+    match = _MAX_AGE.search(cache_control)
+    if match:
+        try:
+            age = float(headers.get("Age", 0) or 0)
+        except ValueError:
+            age = 0.0
+        return now + max(int(match.group(1)) - age, 0)
+    expires = headers.get("Expires")
+    if expires:
+        try:
+            return parsedate_to_datetime(expires).timestamp()
+        except (TypeError, ValueError):
+            return now  # invalid Expires means already expired
+    return now + default_ttl
+
+
+def _body_encoding(content_type: str, head: bytes) -> str:
+    """
+    Encoding of a body starting with `head`: a BOM, else the Content-Type
+    charset, else a <meta> charset declaration, else UTF-8.
+
+    requests' own fallback (ISO-8859-1 for any text/* response without a
+    charset) garbles the UTF-8 pages that declare their charset in <meta>.
+    """
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    match = _HEADER_CHARSET.search(content_type or "")
+    if match:
+        candidate = match.group(1)
+    else:
+        match = _META_CHARSET.search(head[:CHARSET_SNIFF_BYTES])
+        candidate = match.group(1).decode("ascii") if match else "utf-8"
+    try:
+        return codecs.lookup(candidate).name
+    except LookupError:
+        return "utf-8"
+
+
+class PageFetcher:
+    """HTTP GET with a conditional-request disk cache."""
+
+    def __init__(
+        self,
+        cache: Optional[TTLCache] = None,
+        default_ttl: float = 300,
+        max_bytes: int = 2_000_000,
+        allowed_types: Tuple[str, ...] = ALLOWED_CONTENT_TYPES,
+    ):
+        """
+        Initialize the fetcher.
+
+        Args:
+            cache: Backing store for pages (a shared on-disk cache by default)
+            default_ttl: Seconds a page without Cache-Control/Expires is reused
+                         before it is revalidated
+            max_bytes: Most bytes of a response body read (the rest is dropped)
+            allowed_types: Media types downloaded; others raise
+                           UnsupportedContentType before the body is read
+        """
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.allowed_types = allowed_types
+        self.cache = cache or TTLCache(
+            cache_path("pages.sqlite3"),
+            namespace="pages",
+            # Upper bound on how long validators are kept for revalidation
+            ttl=float(os.getenv("PAGE_CACHE_RETENTION", str(7 * 86400))),
+            max_entries=int(os.getenv("PAGE_CACHE_MAX_ENTRIES", "500")),
+        )
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": USER_AGENT})
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.requests_sent = 0
+        self.not_modified = 0
+        self.served_from_cache = 0
+        self.bytes_read = 0
+        self.stopped_early = 0
+
+    def _load(self, url: str) -> Optional[Dict]:
+        entry = self.cache.get_entry(url)
+        if entry is None or time.time() - entry[1] >= self.cache.ttl:
+            return None
+        try:
+            return json.loads(entry[0])
+        except ValueError:
+            return None
+
+    def _store(self, url: str, record: Dict, headers) -> None:
+        fresh_until = _freshness(headers, self.default_ttl, time.time())
+        if fresh_until is None:
+            self.cache.delete(url)
+            return
+        record["fresh_until"] = fresh_until
+        self.cache.set(url, json.dumps(record))
+
+    @staticmethod
+    def _serves(record: Dict, consume, text_limit: Optional[int]) -> bool:
+        """Whether a cached record holds all the text this call wants."""
+        if not record.get("stopped"):
+            return True
+        # A partial page only serves callers that want no more of it
+        limit = record.get("text_limit")
+        return (
+            consume is not None
+            and text_limit is not None
+            and limit is not None
+            and text_limit <= limit
+        )
+
+    def _lookup(
+        self, url: str, consume, text_limit: Optional[int]
+    ) -> Tuple[str, Optional[Dict]]:
+        """
+        Pick the cached record (and its key) to answer or revalidate a call.
+
+        The full page and a partial page (if this call could use one) are
+        both candidates; a fresh one wins over a stale one, and the full page
+        over the partial one.
+        """
+        keys = [url]
+        if consume is not None and text_limit is not None:
+            keys.append(url + PARTIAL_KEY_SUFFIX)
+        usable = []
+        for key in keys:
+            record = self._load(key)
+            if record is not None and self._serves(record, consume, text_limit):
+                usable.append((key, record))
+        now = time.time()
+        fresh = [item for item in usable if now < item[1].get("fresh_until", 0)]
+        return (fresh or usable or [(url, None)])[0]
+
+    @staticmethod
+    def _page(url: str, record: Dict, **flags) -> FetchedPage:
+        return FetchedPage(
+            url=url,
+            final_url=record["final_url"],
+            status=record["status"],
+            content_type=record["content_type"],
+            text=record["text"],
+            truncated=record.get("truncated", False),
+            **flags,
+        )
+
+    def _read_body(
+        self, response: requests.Response, consume: Optional[Callable[[str], bool]]
+    ) -> Tuple[str, bool, bool]:
+        """
+        Stream and decode a response body within the byte budget.
+
+        Returns:
+            (text, truncated, stopped by consume)
+        """
+        content_type = response.headers.get("Content-Type", "")
+        decoder = None
+        parts = []
+        remaining = self.max_bytes
+        truncated = stopped = False
+        try:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                if len(chunk) >= remaining:
+                    chunk = chunk[:remaining]
+                    truncated = True
+                remaining -= len(chunk)
+                self.bytes_read += len(chunk)
+                if decoder is None:
+                    encoding = _body_encoding(content_type, chunk)
+                    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+                text = decoder.decode(chunk)
+                parts.append(text)
+                if consume is not None and consume(text):
+                    truncated = stopped = True
+                    self.stopped_early += 1
+                    break
+                if truncated:
+                    break
+            else:
+                if decoder is not None:
+                    parts.append(decoder.decode(b"", final=True))
+        finally:
+            response.close()
+        return "".join(parts), truncated, stopped
+
+    def fetch(
+        self,
+        url: str,
+        timeout: float = 10,
+        consume: Optional[Callable[[str], bool]] = None,
+        allowed_types: Optional[Tuple[str, ...]] = None,
+        text_limit: Optional[int] = None,
+    ) -> FetchedPage:
+        """
+        GET a page, reusing or revalidating a cached copy when allowed.
+
+        Args:
+            url: Page URL
+            timeout: Connect/read timeout in seconds
+            consume: Called with the page text in order (chunk by chunk while
+                     downloading, all at once when served from cache); returning
+                     True stops the download
+            allowed_types: Media types accepted for this call (default: the
+                           fetcher's allowed_types)
+            text_limit: Characters of text `consume` stops at (None: the whole
+                        page). A page cut short by `consume` is cached next to
+                        the full page, never in its place, and only reused by
+                        later calls with the same or a smaller limit.
+
+        Raises:
+            UnsupportedContentType: If the content type is not allow-listed
+            requests.RequestException: On network errors and 4xx/5xx responses
+        """
+        key, cached = self._lookup(url, consume, text_limit)
+        if cached is not None and time.time() < cached.get("fresh_until", 0):
+            self.served_from_cache += 1
+            if consume is not None:
+                consume(cached["text"])
+            return self._page(url, cached, from_cache=True)
+
+        headers = {}
+        if cached is not None:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        self.requests_sent += 1
+        response = self.session.get(url, headers=headers, timeout=timeout, stream=True)
+        if response.status_code == 304 and cached is not None:
+            response.close()
+            self.not_modified += 1
+            # Validators and freshness may be updated by the 304
+            cached["etag"] = response.headers.get("ETag", cached.get("etag"))
+            cached["last_modified"] = response.headers.get(
+                "Last-Modified", cached.get("last_modified")
+            )
+            self._store(key, cached, response.headers)
+            if consume is not None:
+                consume(cached["text"])
+            return self._page(url, cached, revalidated=True)
+
+        try:
+            response.raise_for_status()
+            content_type = response.headers.get("Content-Type", "")
+            media_type = content_type.split(";", 1)[0].strip().lower()
+            if media_type and media_type not in (allowed_types or self.allowed_types):
+                raise UnsupportedContentType(
+                    f"Unsupported content type: {media_type}", response=response
+                )
+        except requests.RequestException:
+            response.close()
+            raise
+
+        text, truncated, stopped = self._read_body(response, consume)
+        record = {
+            "final_url": response.url,
+            "status": response.status_code,
+            "content_type": content_type,
+            "text": text,
+            "truncated": truncated,
+            "stopped": stopped,
+            "text_limit": text_limit if stopped else None,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        self._store(url + PARTIAL_KEY_SUFFIX if stopped else url, record, response.headers)
+        return self._page(url, record)
+
+    def stats(self) -> Dict:
+        return {
+            "cache": self.cache.stats(),
+            "requests_sent": self.requests_sent,
+            "not_modified": self.not_modified,
+            "served_from_cache": self.served_from_cache,
+            "bytes_read": self.bytes_read,
+            "stopped_early": self.stopped_early,
+        }
+
+
+_default: Optional[PageFetcher] = None
+_default_lock = threading.Lock()
+
+
+def default_fetcher() -> PageFetcher:
+    """The process-wide fetcher shared by WebsiteScraper and WebsiteAnalyzer."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = PageFetcher(
+                default_ttl=float(os.getenv("PAGE_CACHE_DEFAULT_TTL", "300")),
+                max_bytes=int(os.getenv("PAGE_MAX_BYTES", "2000000")),
+            )
+        return _default
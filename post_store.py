@@ -0,0 +1,240 @@
+"""
+Local store of every Reddit post RedditScraper has fetched.
+
+Posts are upserted into SQLite with an FTS5 full-text index over title and
+selftext, so past research can be queried by keyword, subreddit, date range
+and engagement without touching reddit.com. When the SQLite build lacks
+FTS5, keyword queries fall back to LIKE scans.
+"""
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from reddit_post import Post
+from ttl_cache import open_sqlite, transaction
+
+_COLUMNS = (
+    "fullname",
+    "title",
+    "selftext",
+    "url",
+    "subreddit",
+    "author",
+    "score",
+    "comments",
+    "engagement_score",
+    "created_utc",
+    "search_traffic",
+    "search_volume",
+    "keyword_difficulty",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    fullname TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    selftext TEXT NOT NULL,
+    url TEXT NOT NULL,
+    subreddit TEXT NOT NULL,
+    author TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    comments INTEGER NOT NULL,
+    engagement_score INTEGER NOT NULL,
+    created_utc REAL NOT NULL,
+    search_traffic INTEGER NOT NULL DEFAULT 0,
+    search_volume INTEGER,
+    keyword_difficulty REAL,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS posts_subreddit ON posts (subreddit);
+CREATE INDEX IF NOT EXISTS posts_created_utc ON posts (created_utc);
+CREATE INDEX IF NOT EXISTS posts_engagement_score ON posts (engagement_score);
+"""
+
+
+class PostStore:
+    """Persistent post table with an offline full-text index."""
+
+    def __init__(self, path: str):
+        """
+        Initialize the store.
+
+        Args:
+            path: SQLite database file (created if missing)
+        """
+        self.path = path
+        self.fts_enabled = True
+        self._lock = threading.Lock()
+        self._connection = open_sqlite(path, SCHEMA, setup=self._create_fts)
+
+    def _create_fts(self, conn: sqlite3.Connection) -> None:
+        """Add the FTS5 index and its sync triggers, when SQLite supports FTS5."""
+        try:
+            conn.executescript(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+                    title, selftext, content='posts', content_rowid='rowid'
+                );
+                CREATE TRIGGER IF NOT EXISTS posts_ai AFTER INSERT ON posts BEGIN
+                    INSERT INTO posts_fts(rowid, title, selftext)
+                    VALUES (new.rowid, new.title, new.selftext);
+                END;
+                CREATE TRIGGER IF NOT EXISTS posts_ad AFTER DELETE ON posts BEGIN
+                    INSERT INTO posts_fts(posts_fts, rowid, title, selftext)
+                    VALUES ('delete', old.rowid, old.title, old.selftext);
+                END;
+                CREATE TRIGGER IF NOT EXISTS posts_au AFTER UPDATE ON posts BEGIN
+                    INSERT INTO posts_fts(posts_fts, rowid, title, selftext)
+                    VALUES ('delete', old.rowid, old.title, old.selftext);
+                    INSERT INTO posts_fts(rowid, title, selftext)
+                    VALUES (new.rowid, new.title, new.selftext);
+                END;
+                """
+            )
+        except sqlite3.OperationalError as e:
+            print(f"Warning: FTS5 unavailable, local keyword search will scan: {e}")
+            self.fts_enabled = False
+
+    def add(self, posts: Iterable[Post]) -> int:
+        """
+        Insert or refresh posts (keyed by fullname).
+
+        Returns:
+            Number of posts written
+        """
+        now = time.time()
+        rows = [
+            tuple(getattr(post, column) for column in _COLUMNS) + (now,)
+            for post in posts
+            if post.fullname and post.fullname != "t3_"
+        ]
+        if not rows:
+            return 0
+
+        placeholders = ", ".join("?" for _ in range(len(_COLUMNS) + 1))
+        updates = ", ".join(
+            f"{column} = excluded.{column}" for column in _COLUMNS[1:]
+        )
+        try:
+            with self._lock:
+                with transaction(self._connection()) as conn:
+                    conn.executemany(
+                        f"INSERT INTO posts ({', '.join(_COLUMNS)}, fetched_at) "
+                        f"VALUES ({placeholders}) "
+                        f"ON CONFLICT(fullname) DO UPDATE SET {updates}, "
+                        f"fetched_at = excluded.fetched_at",
+                        rows,
+                    )
+        except (sqlite3.Error, OSError) as e:
+            print(f"Post store write failed: {e}")
+            return 0
+        return len(rows)
+
+    @staticmethod
+    def _fts_query(text: str, match_any: bool) -> str:
+        """Quote each token so user input can't break FTS5 query syntax."""
+        tokens = ['"' + token.replace('"', '""') + '"' for token in text.split()]
+        return (" OR " if match_any else " ").join(tokens)
+
+    def query(
+        self,
+        text: Optional[str] = None,
+        subreddit: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        min_score: Optional[int] = None,
+        min_comments: Optional[int] = None,
+        min_engagement: Optional[int] = None,
+        match_any: bool = False,
+        limit: int = 50,
+    ) -> List[Post]:
+        """
+        Query stored posts, most engaging first.
+
+        Args:
+            text: Full-text query over title and selftext (all words must match
+                  unless `match_any` is set)
+            subreddit: Exact subreddit name (case-insensitive)
+            since: Only posts created at or after this time
+            until: Only posts created before this time
+            min_score: Minimum upvote score
+            min_comments: Minimum number of comments
+            min_engagement: Minimum engagement score
+            match_any: Match posts containing any word of `text`
+            limit: Maximum number of posts returned
+
+        Returns:
+            List of Posts with ages computed against the current time
+        """
+        try:
+            with self._lock:
+                # Opening the database also detects FTS5 support
+                self._connection()
+        except (sqlite3.Error, OSError) as e:
+            print(f"Post store query failed: {e}")
+            return []
+
+        clauses = []
+        params: list = []
+
+        if text and text.split():
+            if self.fts_enabled:
+                clauses.append(
+                    "posts.rowid IN (SELECT rowid FROM posts_fts WHERE posts_fts MATCH ?)"
+                )
+                params.append(self._fts_query(text, match_any))
+            else:
+                likes = []
+                for word in text.split():
+                    likes.append("(title LIKE ? OR selftext LIKE ?)")
+                    params.extend([f"%{word}%", f"%{word}%"])
+                clauses.append("(" + (" OR " if match_any else " AND ").join(likes) + ")")
+        if subreddit:
+            clauses.append("subreddit = ? COLLATE NOCASE")
+            params.append(subreddit)
+        if since is not None:
+            clauses.append("created_utc >= ?")
+            params.append(since.timestamp())
+        if until is not None:
+            clauses.append("created_utc < ?")
+            params.append(until.timestamp())
+        for column, minimum in (
+            ("score", min_score),
+            ("comments", min_comments),
+            ("engagement_score", min_engagement),
+        ):
+            if minimum is not None:
+                clauses.append(f"{column} >= ?")
+                params.append(minimum)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = (
+            f"SELECT {', '.join(_COLUMNS)} FROM posts {where} "
+            f"ORDER BY engagement_score DESC LIMIT ?"
+        )
+        params.append(limit)
+
+        try:
+            with self._lock:
+                rows = self._connection().execute(sql, params).fetchall()
+        except (sqlite3.Error, OSError) as e:
+            print(f"Post store query failed: {e}")
+            return []
+
+        now = datetime.utcnow()
+        posts = []
+        for row in rows:
+            post = Post.from_record(dict(zip(_COLUMNS, row), age_days=0, is_recent=False))
+            post.refresh_age(now)
+            posts.append(post)
+        return posts
+
+    def count(self) -> int:
+        """Number of stored posts."""
+        try:
+            with self._lock:
+                return self._connection().execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+        except (sqlite3.Error, OSError):
+            return 0
@@ -0,0 +1,107 @@
+"""
+Post ranking: a scoring stage plus partial top-k selection.
+
+The combined score is `traffic * w_traffic + engagement * w_engagement *
+recent_bonus + velocity * w_velocity` (recent_bonus applies to posts under
+two weeks old). Velocity is opt-in: it is only known for threads the
+scraper polls, which happens when REDDIT_VELOCITY_POLL_SECONDS > 0 (the app
+then watches the posts each search returns), and RedditScraper weighs it by
+REDDIT_VELOCITY_WEIGHT rather than the 0.0 default here. Large pools
+are scored with NumPy over column arrays and selected with argpartition;
+small pools, or environments without NumPy, use heapq.nlargest. Both paths
+return the same order as a stable descending sort.
+"""
+import heapq
+from dataclasses import dataclass
+from typing import List, Sequence
+
+try:
+    import numpy as np  # Optional: only used to speed up large pools
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from reddit_post import Post
+
+
+@dataclass(frozen=True)
+class RankingWeights:
+    """Pluggable weights for the combined ranking score."""
+
+    traffic: float = 3.0
+    engagement: float = 1.0
+    recent_bonus: float = 1.2
+    velocity: float = 0.0
+
+
+DEFAULT_WEIGHTS = RankingWeights()
+
+# Below this pool size NumPy's setup cost outweighs its speed
+NUMPY_MIN_POOL = 256
+
+
+def score_post(post: Post, weights: RankingWeights = DEFAULT_WEIGHTS) -> float:
+    """Combined ranking score for a single post."""
+    bonus = weights.recent_bonus if post.is_recent else 1.0
+    score = (post.search_traffic or 0) * weights.traffic + (
+        post.engagement_score or 0
+    ) * weights.engagement * bonus
+    if weights.velocity:
+        score += post.velocity * weights.velocity
+    return score
+
+
+def rank_columns(
+    traffic,
+    engagement,
+    is_recent,
+    k: int,
+    weights: RankingWeights = DEFAULT_WEIGHTS,
+    velocity=None,
+):
+    """
+    Indices of the k best rows of column arrays, best first (requires NumPy).
+
+    Ties keep their original order, matching a stable descending sort.
+    """
+    scores = np.asarray(traffic, dtype=np.float64) * weights.traffic + np.asarray(
+        engagement, dtype=np.float64
+    ) * weights.engagement * np.where(is_recent, weights.recent_bonus, 1.0)
+    if weights.velocity and velocity is not None:
+        scores = scores + np.asarray(velocity, dtype=np.float64) * weights.velocity
+
+    n = scores.size
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < n:
+        # Partition, then pull the threshold ties back in original order
+        threshold = scores[np.argpartition(-scores, k - 1)[:k]].min()
+        above = np.flatnonzero(scores > threshold)
+        ties = np.flatnonzero(scores == threshold)[: k - above.size]
+        candidates = np.concatenate((above, ties))
+    else:
+        candidates = np.arange(n)
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
+
+
+def top_k(
+    posts: Sequence[Post], k: int, weights: RankingWeights = DEFAULT_WEIGHTS
+) -> List[Post]:
+    """Return the k highest scoring posts, best first."""
+    if k <= 0 or not posts:
+        return []
+
+    if np is None or len(posts) < NUMPY_MIN_POOL:
+        return heapq.nlargest(k, posts, key=lambda post: score_post(post, weights))
+
+    n = len(posts)
+    traffic = np.fromiter((p.search_traffic or 0 for p in posts), np.float64, n)
+    engagement = np.fromiter((p.engagement_score or 0 for p in posts), np.float64, n)
+    is_recent = np.fromiter((p.is_recent for p in posts), np.bool_, n)
+    velocity = (
+        np.fromiter((p.velocity for p in posts), np.float64, n)
+        if weights.velocity
+        else None
+    )
+    order = rank_columns(traffic, engagement, is_recent, k, weights, velocity)
+    return [posts[i] for i in order]
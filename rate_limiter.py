@@ -0,0 +1,230 @@
+"""
+Rate-limit aware request scheduler.
+
+Requests are paced with a token bucket whose refill rate follows the
+`X-Ratelimit-Remaining` / `X-Ratelimit-Reset` headers Reddit returns, so we
+run at the maximum allowed rate instead of bursting and then getting 429s.
+Callers that cannot get a token wait in line rather than failing; throttled
+or failed requests are retried with jittered exponential backoff.
+
+Waiting is bounded: each call may spend at most `max_wait` seconds on tokens
+and backoff, and a `time_budget` block (e.g. one web request) caps every call
+made inside it, including calls in thread pools that copy the context. A
+call that would wait past its deadline raises RateLimitTimeout (or returns
+the last throttled response) instead of sleeping, so a request thread
+degrades to partial results rather than outliving its worker timeout.
+"""
+import contextvars
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "rate_limit_deadline", default=None
+)
+
+
+class RateLimitTimeout(Exception):
+    """A request could not be sent before its wait deadline."""
+
+
+@contextmanager
+def time_budget(seconds: float) -> Iterator[None]:
+    """Bound the time every scheduler call inside the block may wait, in total."""
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    if outer is not None:
+        deadline = min(deadline, outer)
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+class RateLimitScheduler:
+    """Token bucket + retry loop shared by every request to one API."""
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        rate: float = 1.0,
+        burst: int = 5,
+        max_retries: int = 4,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        max_wait: Optional[float] = None,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            rate: Initial requests per second (replaced once headers arrive)
+            burst: Bucket capacity, i.e. how many requests may go out back to back
+            max_retries: Retries for 429/5xx responses and connection errors
+            backoff_base: First backoff ceiling in seconds (doubles per attempt)
+            backoff_max: Upper bound for a single backoff sleep
+            max_wait: Seconds one call may spend waiting for tokens and
+                      backoff in total (None: only bounded by time_budget)
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_wait = max_wait
+
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiting = 0
+        self._cond = threading.Condition()
+
+        self.requests_sent = 0
+        self.retries = 0
+        self.timeouts = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of callers currently waiting for a token."""
+        return self._waiting
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def _deadline(self) -> Optional[float]:
+        """Monotonic deadline of a call starting now (max_wait and time_budget)."""
+        deadline = _deadline.get()
+        if self.max_wait is not None:
+            own = time.monotonic() + self.max_wait
+            deadline = own if deadline is None else min(deadline, own)
+        return deadline
+
+    def acquire(self, deadline: Optional[float] = None) -> None:
+        """
+        Block until a request may be sent.
+
+        Raises RateLimitTimeout, without waiting, when the next token (or the
+        end of a server-imposed block) comes after `deadline`.
+        """
+        with self._cond:
+            self._waiting += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    if now < self._blocked_until:
+                        wait = self._blocked_until - now
+                    else:
+                        self._refill(now)
+                        if self._tokens >= 1:
+                            self._tokens -= 1
+                            return
+                        wait = (1 - self._tokens) / max(self.rate, 1e-3)
+                    if deadline is not None and now + wait > deadline:
+                        self.timeouts += 1
+                        raise RateLimitTimeout(
+                            f"no request slot within the wait budget ({wait:.1f}s needed)"
+                        )
+                    self._cond.wait(wait)
+            finally:
+                self._waiting -= 1
+
+    def update_from_headers(self, headers) -> None:
+        """Adapt pacing to the server's remaining budget for the current window."""
+        try:
+            remaining = float(headers.get("X-Ratelimit-Remaining"))
+            reset = float(headers.get("X-Ratelimit-Reset"))
+        except (TypeError, ValueError):
+            return
+
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            if remaining < 1:
+                # Budget exhausted: hold everyone until the window resets
+                self._tokens = 0.0
+                self._blocked_until = max(self._blocked_until, now + reset)
+            else:
+                # Spread what is left evenly over the rest of the window
+                if reset > 0:
+                    self.rate = remaining / reset
+                self._tokens = min(self._tokens, remaining)
+            self._cond.notify_all()
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Full-jitter exponential backoff, never shorter than Retry-After."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        try:
+            delay = max(delay, float(retry_after)) if retry_after else delay
+        except ValueError:
+            pass
+        return min(delay, self.backoff_max)
+
+    def call(self, send: Callable, *args, **kwargs):
+        """
+        Send a request through the scheduler.
+
+        Args:
+            send: Function performing the request and returning a response
+                  object with `status_code` and `headers`
+
+        Returns:
+            The last response received. Connection errors are re-raised once
+            retries are exhausted, and a throttled response is returned as is
+            when its backoff would end past the call's deadline.
+
+        Raises:
+            RateLimitTimeout: No token became available before the deadline
+        """
+        deadline = self._deadline()
+        attempt = 0
+        while True:
+            self.acquire(deadline)
+            self.requests_sent += 1
+            try:
+                resp = send(*args, **kwargs)
+            except OSError:
+                # requests' ConnectionError/Timeout derive from OSError
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                if self._past(deadline, delay):
+                    raise
+                self.retries += 1
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            self.update_from_headers(resp.headers)
+            if resp.status_code not in self.RETRY_STATUSES or attempt >= self.max_retries:
+                return resp
+
+            delay = self._backoff(attempt, resp.headers.get("Retry-After"))
+            if self._past(deadline, delay):
+                return resp
+            self.retries += 1
+            time.sleep(delay)
+            attempt += 1
+
+    def _past(self, deadline: Optional[float], delay: float) -> bool:
+        """Whether sleeping `delay` seconds would run past `deadline`."""
+        if deadline is not None and time.monotonic() + delay > deadline:
+            self.timeouts += 1
+            return True
+        return False
+
+    def stats(self) -> Dict:
+        """Current pacing state, for logging and debugging."""
+        return {
+            "rate_per_second": round(self.rate, 3),
+            "queue_depth": self.queue_depth,
+            "requests_sent": self.requests_sent,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+        }
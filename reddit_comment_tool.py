@@ -123,7 +123,7 @@ def main():
     # Search for posts
     console.print(f"[dim]Searching Reddit for '{args.keyword}'...[/dim]")
     try:
-        posts = scraper.get_top_posts(args.keyword, top_n=args.number)
+        posts = [post.to_dict() for post in scraper.get_top_posts(args.keyword, top_n=args.number)]
         console.print(f"[green]✓[/green] Found {len(posts)} high-traffic posts\n")
     except Exception as e:
         console.print(f"[red]✗[/red] Error searching Reddit: {e}")
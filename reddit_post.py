@@ -0,0 +1,83 @@
+"""
+Compact in-memory representation of a Reddit post.
+
+RedditScraper keeps hundreds to thousands of candidate posts alive per
+search, so posts are slotted dataclasses rather than dicts: no per-instance
+__dict__, the creation time is a float instead of a datetime, and repeated
+strings (subreddit, author) are interned. Posts are converted to plain dicts
+only at the JSON boundary (see Post.to_dict).
+"""
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional
+
+
+@dataclass(slots=True)
+class Post:
+    title: str
+    url: str
+    subreddit: str
+    score: int
+    comments: int
+    engagement_score: int
+    created_utc: float  # epoch seconds, as returned by Reddit
+    age_days: int
+    is_recent: bool
+    selftext: str = ""
+    author: str = "[unknown]"
+    search_traffic: int = 0
+    search_volume: Optional[int] = None
+    keyword_difficulty: Optional[float] = None
+    fullname: str = ""  # Reddit "thing" id, e.g. t3_abc123
+    cluster_size: int = 1  # near-duplicate titles collapsed into this post
+    velocity: float = 0.0  # engagement gained per hour (watched threads only)
+    acceleration: float = 0.0  # change in velocity per hour
+
+    def __post_init__(self):
+        self.subreddit = sys.intern(self.subreddit)
+        self.author = sys.intern(self.author)
+
+    @property
+    def created(self) -> datetime:
+        """Creation time as a naive datetime (local time, as before)."""
+        return datetime.fromtimestamp(self.created_utc)
+
+    def refresh_age(self, now: datetime) -> None:
+        """Recompute age_days / is_recent against `now`."""
+        self.age_days = (now - self.created).days
+        self.is_recent = self.age_days <= 14
+
+    def to_dict(self) -> Dict:
+        """JSON-ready dict in the shape the web UI and CLI expect."""
+        data = {
+            "title": self.title,
+            "url": self.url,
+            "subreddit": self.subreddit,
+            "score": self.score,
+            "comments": self.comments,
+            "engagement_score": self.engagement_score,
+            "created_utc": self.created.isoformat(),
+            "age_days": self.age_days,
+            "is_recent": self.is_recent,
+            "selftext": self.selftext,
+            "author": self.author,
+            "search_traffic": self.search_traffic,
+            "cluster_size": self.cluster_size,
+            "velocity": self.velocity,
+            "acceleration": self.acceleration,
+        }
+        if self.search_volume is not None:
+            data["search_volume"] = self.search_volume
+        if self.keyword_difficulty is not None:
+            data["keyword_difficulty"] = self.keyword_difficulty
+        return data
+
+    def to_record(self) -> Dict:
+        """Lossless JSON-safe dict for on-disk stores."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_record(cls, record: Dict) -> "Post":
+        """Rebuild a post saved with to_record (unknown keys are ignored)."""
+        return cls(**{k: v for k, v in record.items() if k in cls.__slots__})
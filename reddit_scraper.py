@@ -7,27 +7,97 @@ Primary strategy:
 
 Now with Ahrefs integration for search traffic data.
 """
+import json
 import os
+import threading
+import time
+from concurrent.futures import as_completed
+from dataclasses import dataclass
 from dotenv import load_dotenv
-from typing import List, Dict, Optional
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
+from urllib.parse import urlparse
 from ahrefs_client import AhrefsClient
+from api_metrics import ContextThreadPoolExecutor
+from http_replay import configure_session
+from dedup_index import DedupIndex, PostCache, id_from_permalink, thread_keys
+from keyword_matcher import get_matcher
+from near_duplicates import NearDuplicateClusterer, NearDuplicateIndex
+from post_store import PostStore
+from reddit_post import Post
+from subreddit_metadata import SubredditMetadataCache, aggregate_by_subreddit
+from ranking import RankingWeights, top_k
+from rate_limiter import RateLimitScheduler, RateLimitTimeout
+from ttl_cache import TTLCache, cache_path
+from velocity_tracker import VelocityTracker
 import re
 import requests
+from requests.adapters import HTTPAdapter
 
 try:
     import praw  # Optional: only used if credentials are present
 except ImportError:  # pragma: no cover - optional dependency
     praw = None
 
+try:
+    import fcntl  # POSIX only: elects one velocity poller per host
+except ImportError:  # pragma: no cover - platform dependent
+    fcntl = None
+
 load_dotenv()
 
 
+@dataclass(slots=True)
+class PublicSearchStatus:
+    """How a public JSON search went (decides the PRAW fallback)."""
+    failed: bool = False  # a page request failed
+    timed_out: bool = False  # ... because the request's wait budget ran out
+    scanned: int = 0  # raw posts received
+    duplicates: int = 0  # posts skipped as already seen in this search
+
+
 class RedditScraper:
+    # Reddit caps listing pages at 100 items
+    PAGE_SIZE = 100
+    # Filtered candidates gathered per requested result before paging stops
+    CANDIDATE_POOL_FACTOR = 5
+    # Monitor mode: posts kept per tracked keyword, and the most raw posts an
+    # incremental refresh scans before giving up on reaching the watermark
+    MONITOR_POOL_SIZE = 1000
+    MONITOR_SCAN_LIMIT = 500
+    # /api/info resolves at most 100 fullnames per request
+    INFO_BATCH_SIZE = 100
+    # Raw fields kept in the info cache (full payloads are several KB each)
+    INFO_FIELDS = (
+        "name",
+        "id",
+        "title",
+        "selftext",
+        "permalink",
+        "subreddit",
+        "score",
+        "num_comments",
+        "created_utc",
+        "author",
+        "crosspost_parent",
+        "subreddit_subscribers",
+        "over_18",
+    )
+    # Characters of selftext kept in cached search pages (all the parser reads)
+    SEARCH_SELFTEXT_LIMIT = 500
+
     def __init__(self):
         """Initialize Reddit clients and Ahrefs client."""
         self.ahrefs = AhrefsClient()
         self.two_weeks_ago = datetime.utcnow() - timedelta(days=14)
+        # Velocity only affects threads being polled (see start_velocity_polling)
+        self.ranking_weights = RankingWeights(
+            velocity=float(os.getenv("REDDIT_VELOCITY_WEIGHT", "1.0"))
+        )
+        # Collapses reposts / near-identical titles after parsing
+        self.near_duplicates = NearDuplicateClusterer(
+            threshold=float(os.getenv("REDDIT_NEAR_DUPLICATE_THRESHOLD", "0.7"))
+        )
 
         # Optional official Reddit API client (only if real credentials exist)
         self.reddit = None
@@ -45,7 +115,14 @@ class RedditScraper:
             except Exception as e:
                 print(f"Warning: Failed to initialize PRAW client, will use web search instead: {e}")
 
-        # Session for public JSON search (no auth)
+        # Bounded fan-out for multi-keyword research (see search_many)
+        self.max_workers = int(os.getenv("REDDIT_MAX_WORKERS", "8"))
+        self.per_host_limit = int(os.getenv("REDDIT_PER_HOST_LIMIT", "4"))
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_slots_lock = threading.Lock()
+
+        # Session for public JSON search (no auth), pooled so concurrent
+        # searches reuse keep-alive connections instead of reconnecting
         self.http = requests.Session()
         self.http.headers.update(
             {
@@ -53,227 +130,487 @@ class RedditScraper:
                 or "Mozilla/5.0 (RedditCommentTool; +https://reddit.com)"
             }
         )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_workers)
+        self.http.mount("https://", adapter)
+        self.http.mount("http://", adapter)
+        # Optional record/replay of responses (HTTP_REPLAY_MODE), for benchmarks
+        self.replay = configure_session(
+            self.http, pool_connections=4, pool_maxsize=self.max_workers
+        )
+        # Overridable so benchmarks can point searches at a local stub server
+        self.base_url = os.getenv("REDDIT_BASE_URL", "https://www.reddit.com").rstrip("/")
+
+        # Paces reddit.com requests from its X-Ratelimit-* headers; requests
+        # queue for a token instead of failing, and 429/5xx are retried, but
+        # no request waits longer than REDDIT_MAX_WAIT seconds
+        self.rate_limiter = RateLimitScheduler(
+            rate=float(os.getenv("REDDIT_RATE_LIMIT_RPS", "1.0")),
+            burst=int(os.getenv("REDDIT_RATE_LIMIT_BURST", "5")),
+            max_retries=int(os.getenv("REDDIT_MAX_RETRIES", "4")),
+            max_wait=float(os.getenv("REDDIT_MAX_WAIT", "20")),
+        )
+
+        # On-disk cache of search pages, pruned to the fields the parser reads
+        # (see _prune_search_page) and shared by all workers/processes
+        self.search_cache = TTLCache(
+            cache_path("reddit_search.sqlite3"),
+            namespace="reddit_search",
+            ttl=float(os.getenv("REDDIT_CACHE_TTL", "900")),
+            max_entries=int(os.getenv("REDDIT_CACHE_MAX_ENTRIES", "5000")),
+        )
+
+        # Raw post data resolved through /api/info (or seen via PRAW), by fullname
+        self.info_cache = TTLCache(
+            cache_path("reddit_search.sqlite3"),
+            namespace="reddit_info",
+            ttl=float(os.getenv("REDDIT_CACHE_TTL", "900")),
+            max_entries=int(os.getenv("REDDIT_CACHE_MAX_ENTRIES", "5000")) * 4,
+        )
+
+        # Every fetched post, indexed for offline research (see search_local)
+        self.post_store = PostStore(cache_path("reddit_posts.sqlite3"))
+
+        # Score/comment time series for watched threads (see watch_posts)
+        # Scheduled polling is started by the app in one process per host
+        # (see start_velocity_polling), not per scraper instance
+        self.velocity = VelocityTracker(
+            lambda fullnames: self._fetch_info(fullnames, refresh=True),
+            cache_path("reddit_velocity.sqlite3"),
+            max_watched=int(os.getenv("REDDIT_VELOCITY_MAX_WATCHED", "1000")),
+        )
+
+        # Subscribers / active users per subreddit, refreshed in bulk
+        self.subreddits = SubredditMetadataCache(
+            self._fetch_subreddit_info,
+            TTLCache(
+                cache_path("reddit_search.sqlite3"),
+                namespace="subreddit_info",
+                ttl=float(os.getenv("REDDIT_SUBREDDIT_TTL", "86400")),
+                max_entries=int(os.getenv("REDDIT_CACHE_MAX_ENTRIES", "5000")),
+            ),
+            stale_ttl=float(os.getenv("REDDIT_SUBREDDIT_STALE_TTL", "604800")),
+        )
+
+        # Per-keyword watermark + ranked pool for monitor mode
+        self.monitor_store = TTLCache(
+            cache_path("reddit_monitor.sqlite3"),
+            namespace="keyword_monitor",
+            ttl=float(os.getenv("REDDIT_MONITOR_RETENTION_DAYS", "30")) * 86400,
+            max_entries=500,
+        )
+
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        """Return the semaphore limiting concurrent requests to url's host."""
+        host = urlparse(url).netloc
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.per_host_limit)
+                self._host_slots[host] = slot
+            return slot
+
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        """
+        GET through the shared session.
+
+        The request waits for a rate-limit token, then for a free per-host
+        slot; throttled responses are retried by the scheduler.
+        """
+        def send() -> requests.Response:
+            with self._host_slot(url):
+                return self.http.get(url, **kwargs)
+
+        return self.rate_limiter.call(send)
     
-    def _is_keyword_relevant(self, text: str, keyword: str) -> bool:
-        """Check if text is relevant to the keyword."""
-        if not text:
+    @staticmethod
+    def _search_cache_key(params: Dict) -> str:
+        """Cache key for a search page: normalized query plus sort/paging params."""
+        normalized = dict(params)
+        normalized["q"] = " ".join(str(params.get("q", "")).lower().split())
+        return json.dumps(normalized, sort_keys=True)
+
+    @classmethod
+    def _prune_search_page(cls, data: Dict) -> Dict:
+        """
+        Keep only what the search parser reads from a listing page.
+
+        Raw `limit=100` pages are several hundred KB; the pruned page keeps
+        the `after` cursor and the INFO_FIELDS of each child, with selftext
+        cut to SEARCH_SELFTEXT_LIMIT characters.
+        """
+        listing = data.get("data", {}) if isinstance(data, dict) else {}
+        children = []
+        for child in listing.get("children", []) or []:
+            raw = child.get("data", {})
+            kept = {k: raw[k] for k in cls.INFO_FIELDS if k in raw}
+            if kept.get("selftext"):
+                kept["selftext"] = kept["selftext"][: cls.SEARCH_SELFTEXT_LIMIT]
+            children.append({"data": kept})
+        return {"data": {"after": listing.get("after"), "children": children}}
+
+    def _fetch_search_page(self, params: Dict, use_cache: bool = True) -> Dict:
+        """
+        Fetch one page of public search results, served from cache when warm.
+
+        With `use_cache=False` the page is always fetched (and not stored),
+        e.g. for monitor refreshes that must see the latest posts.
+        """
+        key = self._search_cache_key(params)
+        cached = self.search_cache.get(key) if use_cache else None
+        if cached is not None:
+            return json.loads(cached)
+
+        resp = self._get(
+            f"{self.base_url}/search.json",
+            params=params,
+            timeout=10,
+        )
+        resp.raise_for_status()
+        # Cold and warm reads return the same pruned page
+        data = self._prune_search_page(resp.json())
+        if use_cache:
+            self.search_cache.set(key, json.dumps(data))
+        return data
+
+    def _is_keyword_relevant(self, text: str, keyword: str, body: str = "") -> bool:
+        """
+        Check if text (and optionally a body) is relevant to the keyword.
+
+        Uses the precompiled matcher for the keyword, so title and body are
+        scored in one pass (see keyword_matcher.KeywordMatcher for semantics).
+        """
+        if not keyword or not keyword.strip():
             return False
-        
-        text_lower = text.lower()
-        keyword_lower = keyword.lower()
-        
-        # Check for exact match or word boundaries
-        if keyword_lower in text_lower:
-            return True
-        
-        # Check for similar keywords (split by spaces)
-        keyword_words = keyword_lower.split()
-        if len(keyword_words) > 1:
-            # If multi-word keyword, check if most words appear
-            matches = sum(1 for word in keyword_words if word in text_lower)
-            if matches >= len(keyword_words) * 0.7:  # 70% of words match
-                return True
-        
-        return False
+        return get_matcher((keyword,)).is_relevant(keyword, text, body)
     
     def _calculate_engagement_score(self, score: int, comments: int) -> int:
         """Calculate engagement score."""
         return score + (comments * 2)
     
-    def _search_via_public_json(self, keyword: str, limit: int = 200) -> List[Dict]:
+    def _build_post(
+        self, post: Dict, now: datetime, selftext_limit: Optional[int] = 500
+    ) -> Post:
+        """Build a Post from raw listing/info fields (no filtering)."""
+        selftext = post.get("selftext", "") or ""
+        score = int(post.get("score", 0))
+        num_comments = int(post.get("num_comments", 0))
+        created_utc = float(post.get("created_utc") or now.timestamp())
+        age_days = (now - datetime.fromtimestamp(created_utc)).days
+
+        return Post(
+            title=post.get("title", ""),
+            url=f"https://reddit.com{post.get('permalink', '')}",
+            subreddit=post.get("subreddit", "unknown"),
+            score=score,
+            comments=num_comments,
+            engagement_score=self._calculate_engagement_score(score, num_comments),
+            created_utc=created_utc,
+            age_days=age_days,
+            is_recent=age_days <= 14,
+            selftext=selftext[:selftext_limit] if selftext_limit else selftext,
+            author=post.get("author", "[unknown]"),
+            fullname=post.get("name") or f"t3_{post.get('id', '')}",
+        )
+
+    def _parse_public_post(
+        self,
+        post: Dict,
+        keyword: str,
+        now: datetime,
+        min_recent_engagement: int = 10,
+        min_older_engagement: int = 5,
+        post_cache: Optional[PostCache] = None,
+    ) -> Optional[Post]:
         """
-        Use Reddit's public JSON search endpoint (no API key required).
-        This is best-effort and may be rate-limited by Reddit.
+        Turn one raw listing child into a Post.
+
+        Returns None when the post is not relevant to the keyword or does not
+        meet the engagement thresholds. With a `post_cache` (see search_many),
+        a thread already built for another keyword is copied, not rebuilt.
         """
-        posts: List[Dict] = []
-        now = datetime.utcnow()
+        # Keyword relevance (title and body in a single pass)
+        selftext = post.get("selftext", "") or ""
+        if not self._is_keyword_relevant(post.get("title", ""), keyword, selftext[:500]):
+            return None
 
-        try:
-            resp = self.http.get(
-                "https://www.reddit.com/search.json",
-                params={
-                    "q": keyword,
-                    "sort": "hot",
-                    "t": "year",
-                    "limit": min(limit, 100),
-                    "type": "link",
-                },
-                timeout=10,
+        if post_cache is None:
+            post_data = self._build_post(post, now)
+        else:
+            post_data = post_cache.get_or_build(
+                post.get("name") or f"t3_{post.get('id', '')}",
+                lambda: self._build_post(post, now),
             )
-            resp.raise_for_status()
-            data = resp.json()
-        except Exception as e:
-            print(f"Public Reddit search failed: {e}")
-            return posts
 
-        children = (
-            data.get("data", {}).get("children", [])
-            if isinstance(data, dict)
-            else []
-        )
+        # Relaxed engagement filters to surface more threads
+        if post_data.is_recent and post_data.engagement_score < min_recent_engagement:
+            return None
+        if not post_data.is_recent and post_data.engagement_score < min_older_engagement:
+            return None
+
+        return post_data
+
+    @classmethod
+    def _submission_data(cls, submission) -> Dict:
+        """Raw listing fields of a PRAW submission, read without lazy fetches."""
+        fields = vars(submission)
+        data = {k: v for k, v in fields.items() if k in cls.INFO_FIELDS}
+        # Subreddit/Redditor objects stringify to their names without a fetch
+        data["subreddit"] = str(fields.get("subreddit") or "unknown")
+        author = fields.get("author")
+        data["author"] = str(author) if author else "[deleted]"
+        return data
+
+    def _iter_search_pages(
+        self,
+        keyword: str,
+        limit: int = 200,
+        sort: str = "hot",
+        status: Optional[PublicSearchStatus] = None,
+        use_cache: bool = True,
+    ) -> Iterator[List[Dict]]:
+        """
+        Lazily walk Reddit's public JSON search, following `after` cursors.
+
+        Yields the raw `data` dict of every child, one list per page. Paging
+        stops when the listing is exhausted, `limit` raw posts have been
+        scanned, a request fails, or the consumer stops iterating. Failures
+        and the number of posts scanned are recorded in `status`. Pages come
+        from the search cache unless `use_cache` is False.
+        """
+        after = None
+        scanned = 0
+
+        while scanned < limit:
+            params = {
+                "q": keyword,
+                "sort": sort,
+                "t": "year",
+                "limit": min(limit - scanned, self.PAGE_SIZE),
+                "type": "link",
+            }
+            if after:
+                params["after"] = after
 
-        for child in children:
             try:
-                post = child.get("data", {})
-                title = post.get("title", "")
-                selftext = post.get("selftext", "") or ""
-                permalink = post.get("permalink", "")
-                subreddit = post.get("subreddit", "unknown")
-                score = int(post.get("score", 0))
-                num_comments = int(post.get("num_comments", 0))
-
-                created_utc_ts = post.get("created_utc")
-                if created_utc_ts:
-                    post_created = datetime.fromtimestamp(created_utc_ts)
-                else:
-                    post_created = now
-
-                age_days = (now - post_created).days
-                is_recent = age_days <= 14
-
-                # Keyword relevance
-                title_relevant = self._is_keyword_relevant(title, keyword)
-                content_relevant = self._is_keyword_relevant(selftext[:500], keyword)
-                if not (title_relevant or content_relevant):
-                    continue
+                data = self._fetch_search_page(params, use_cache=use_cache)
+            except Exception as e:
+                print(f"Public Reddit search failed: {e}")
+                if status is not None:
+                    status.failed = True
+                    status.timed_out = isinstance(e, RateLimitTimeout)
+                return
+
+            listing = data.get("data", {}) if isinstance(data, dict) else {}
+            children = listing.get("children", []) or []
+            if not children:
+                return
+            scanned += len(children)
+            if status is not None:
+                status.scanned += len(children)
+
+            yield [child.get("data", {}) for child in children]
+
+            after = listing.get("after")
+            if not after:
+                return
+
+    def _iter_public_json(
+        self,
+        keyword: str,
+        limit: int = 200,
+        min_candidates: Optional[int] = None,
+        dedup: Optional[DedupIndex] = None,
+        status: Optional[PublicSearchStatus] = None,
+        post_cache: Optional[PostCache] = None,
+    ) -> Iterator[Post]:
+        """
+        Yield filtered posts from public JSON search as each page arrives.
 
-                engagement_score = self._calculate_engagement_score(score, num_comments)
+        Stops paging once the posts yielded still number at least
+        `min_candidates` after near-duplicate collapse (the current page is
+        always finished, since it has already been paid for).
+        Threads already claimed in `dedup` are skipped before parsing.
+        """
+        now = datetime.utcnow()
+        # Clusters grow with each page instead of re-clustering the pool
+        near = self.near_duplicates.index()
+        if dedup is None:
+            dedup = DedupIndex()
 
-                # Relaxed engagement filters to surface more threads
-                if is_recent and engagement_score < 10:
+        for page in self._iter_search_pages(keyword, limit=limit, status=status):
+            for raw in page:
+                keys = thread_keys(raw)
+                if dedup.seen(keys):
+                    if status is not None:
+                        status.duplicates += 1
                     continue
-                if not is_recent and engagement_score < 5:
+                try:
+                    post_data = self._parse_public_post(
+                        raw, keyword, now, post_cache=post_cache
+                    )
+                except Exception as e:
+                    print(f"Error processing public post: {e}")
                     continue
 
-                post_data = {
-                    "title": title,
-                    "url": f"https://reddit.com{permalink}",
-                    "subreddit": subreddit,
-                    "score": score,
-                    "comments": num_comments,
-                    "engagement_score": engagement_score,
-                    "created_utc": post_created,
-                    "age_days": age_days,
-                    "is_recent": is_recent,
-                    "selftext": selftext[:500],
-                    "author": post.get("author", "[unknown]"),
-                    "search_traffic": 0,
-                }
+                if post_data is not None and dedup.claim(keys):
+                    near.add(post_data)
+                    yield post_data
 
-                posts.append(post_data)
-            except Exception as e:
-                print(f"Error processing public post: {e}")
-                continue
+            if self._enough_candidates(near, min_candidates):
+                return
 
-        return posts
+    @staticmethod
+    def _enough_candidates(near: NearDuplicateIndex, min_candidates: Optional[int]) -> bool:
+        """Whether the posts in `near` hold `min_candidates` once near duplicates collapse."""
+        return bool(min_candidates) and len(near) >= min_candidates
+
+    def _search_via_public_json(
+        self,
+        keyword: str,
+        limit: int = 200,
+        min_candidates: Optional[int] = None,
+        dedup: Optional[DedupIndex] = None,
+        status: Optional[PublicSearchStatus] = None,
+        post_cache: Optional[PostCache] = None,
+    ) -> List[Post]:
+        """
+        Use Reddit's public JSON search endpoint (no API key required).
+        This is best-effort and may be rate-limited by Reddit.
+        """
+        return list(
+            self._iter_public_json(
+                keyword,
+                limit=limit,
+                min_candidates=min_candidates,
+                dedup=dedup,
+                status=status,
+                post_cache=post_cache,
+            )
+        )
+
+    def _enrich_with_traffic(self, posts: List[Post], keyword: str) -> None:
+        """Attach the keyword's Ahrefs traffic estimate to every post in place."""
+        try:
+            traffic_data = self.ahrefs.get_reddit_post_traffic(
+                reddit_url="", keyword=keyword
+            )
+        except Exception as e:
+            print(f"Ahrefs enrichment failed: {e}")
+            traffic_data = None
+        self._apply_traffic(posts, traffic_data)
+
+    @staticmethod
+    def _apply_traffic(posts: List[Post], traffic_data: Optional[Dict]) -> None:
+        """Copy a traffic estimate (see AhrefsClient.get_reddit_post_traffic) onto posts."""
+        if traffic_data:
+            for post in posts:
+                post.search_traffic = traffic_data.get("estimated_traffic", 0)
+                post.search_volume = traffic_data.get("search_volume", 0)
+                post.keyword_difficulty = traffic_data.get("keyword_difficulty", 0)
 
     def search_subreddits(
         self,
         keyword: str,
         limit: int = 200,
         prioritize_traffic: bool = True,
-    ) -> List[Dict]:
+        min_candidates: Optional[int] = None,
+        dedup: Optional[DedupIndex] = None,
+        post_cache: Optional[PostCache] = None,
+        status: Optional[PublicSearchStatus] = None,
+    ) -> List[Post]:
         """
         Search for posts across Reddit containing the keyword.
         Tries official API (if configured), otherwise falls back to public JSON.
+
+        `limit` bounds how many raw posts are scanned; `min_candidates` lets the
+        search stop early once that many relevant posts remain after
+        near-duplicate collapse.
+        `dedup` is shared by both sources so each thread is processed at most
+        once per keyword; `post_cache` lets a batch of keywords (see
+        search_many) build each thread's Post only once.
+        Near-duplicate titles are collapsed to their most engaging post, whose
+        `cluster_size` records how many posts it stands for.
+        How the public search went is recorded in `status`, if given.
         """
+        if dedup is None:
+            dedup = DedupIndex()
+
         # Try public JSON search first (no keys needed)
-        posts = self._search_via_public_json(keyword, limit=limit)
+        if status is None:
+            status = PublicSearchStatus()
+        posts = self._search_via_public_json(
+            keyword,
+            limit=limit,
+            min_candidates=min_candidates,
+            dedup=dedup,
+            status=status,
+            post_cache=post_cache,
+        )
 
         # Enrich with Ahrefs keyword metrics (same keyword for all posts)
         if posts and prioritize_traffic:
-            try:
-                traffic_data = self.ahrefs.get_reddit_post_traffic(
-                    reddit_url="", keyword=keyword
-                )
-            except Exception as e:
-                print(f"Ahrefs enrichment failed: {e}")
-                traffic_data = None
-
-            if traffic_data:
-                for post in posts:
-                    post["search_traffic"] = traffic_data.get("estimated_traffic", 0)
-                    post["search_volume"] = traffic_data.get("search_volume", 0)
-                    post["keyword_difficulty"] = traffic_data.get(
-                        "keyword_difficulty", 0
-                    )
+            self._enrich_with_traffic(posts, keyword)
 
         if posts:
-            return posts
+            self.post_store.add(posts)
+            return self.near_duplicates.collapse(posts)
+
+        if not status.failed and status.scanned:
+            # The search worked; its results were just irrelevant, and PRAW
+            # would find the same threads
+            return []
+
+        if status.timed_out:
+            # Out of wait budget (e.g. the web request's); a PRAW search
+            # would only run past it
+            return []
 
         # Fallback: if public search fails but we have PRAW + keys, use that
         if self.reddit:
-            print("Public search empty, falling back to official Reddit API (PRAW).")
-            posts: List[Dict] = []
+            print("Public search failed, falling back to official Reddit API (PRAW).")
+            posts: List[Post] = []
+            near = self.near_duplicates.index()
             now = datetime.utcnow()
 
+            # The search listing already carries every field we need (PRAW
+            # pages it 100 at a time), so each submission is read from its
+            # fetched fields only, never through lazy attributes.
             for submission in self.reddit.subreddit("all").search(
                 keyword, limit=limit, sort="hot"
             ):
+                keys = thread_keys(vars(submission))
+                if dedup.seen(keys):
+                    continue
                 try:
-                    post_created = datetime.fromtimestamp(submission.created_utc)
-                    age_days = (now - post_created).days
-                    is_recent = age_days <= 14
-
-                    title_relevant = self._is_keyword_relevant(
-                        submission.title, keyword
-                    )
-                    content_relevant = self._is_keyword_relevant(
-                        submission.selftext[:500] if submission.selftext else "",
+                    raw = self._submission_data(submission)
+                    self._cache_info(raw)
+                    post_data = self._parse_public_post(
+                        raw,
                         keyword,
+                        now,
+                        min_recent_engagement=20,
+                        min_older_engagement=10,
+                        post_cache=post_cache,
                     )
-                    if not (title_relevant or content_relevant):
-                        continue
-
-                    engagement_score = self._calculate_engagement_score(
-                        submission.score, submission.num_comments
-                    )
-
-                    if is_recent and engagement_score < 20:
-                        continue
-                    if not is_recent and engagement_score < 10:
-                        continue
-
-                    post_data = {
-                        "title": submission.title,
-                        "url": f"https://reddit.com{submission.permalink}",
-                        "subreddit": submission.subreddit.display_name,
-                        "score": submission.score,
-                        "comments": submission.num_comments,
-                        "engagement_score": engagement_score,
-                        "created_utc": post_created,
-                        "age_days": age_days,
-                        "is_recent": is_recent,
-                        "selftext": submission.selftext[:500]
-                        if submission.selftext
-                        else "",
-                        "author": str(submission.author)
-                        if submission.author
-                        else "[deleted]",
-                        "search_traffic": 0,
-                    }
-
-                    if prioritize_traffic and not is_recent:
-                        traffic_data = self.ahrefs.get_reddit_post_traffic(
-                            post_data["url"], keyword
-                        )
-                        if traffic_data:
-                            post_data["search_traffic"] = traffic_data.get(
-                                "estimated_traffic", 0
-                            )
-                            post_data["search_volume"] = traffic_data.get(
-                                "search_volume", 0
-                            )
-                            post_data["keyword_difficulty"] = traffic_data.get(
-                                "keyword_difficulty", 0
-                            )
-
-                    posts.append(post_data)
+                    if post_data is not None and dedup.claim(keys):
+                        posts.append(post_data)
+                        near.add(post_data)
                 except Exception as e:
                     print(f"Error processing post via PRAW: {e}")
                     continue
 
-            return posts
+                if self._enough_candidates(near, min_candidates):
+                    break
+
+            # Traffic estimates are per keyword, so one lookup covers every
+            # older post (previously this ran once per post)
+            if prioritize_traffic:
+                older = [post for post in posts if not post.is_recent]
+                if older:
+                    self._enrich_with_traffic(older, keyword)
+
+            self.post_store.add(posts)
+            return self.near_duplicates.collapse(posts)
 
         # If everything fails, return empty list (UI will show \"no posts\" or demo mode will kick in)
         return []
@@ -282,8 +619,12 @@ class RedditScraper:
         self, 
         keyword: str, 
         top_n: int = 10,
-        prioritize_traffic: bool = True
-    ) -> List[Dict]:
+        prioritize_traffic: bool = True,
+        weights: Optional[RankingWeights] = None,
+        dedup: Optional[DedupIndex] = None,
+        offline: bool = False,
+        post_cache: Optional[PostCache] = None,
+    ) -> List[Post]:
         """
         Get top N posts for a keyword, prioritizing by search traffic or engagement.
         
@@ -291,65 +632,540 @@ class RedditScraper:
             keyword: Search term
             top_n: Number of top posts to return
             prioritize_traffic: If True, prioritize by search traffic; if False, by engagement
+            weights: Ranking weights (defaults to `self.ranking_weights`)
+            dedup: Index of threads already processed by this search
+            offline: Rank posts from the local post store instead of searching Reddit
+            post_cache: Posts already built by other keywords of a batch (see search_many)
             
         Returns:
-            List of top post dictionaries, sorted by:
+            List of top posts, sorted by:
             - For older posts: search traffic (if available) or engagement
             - For recent posts (< 2 weeks): engagement score
         """
-        # Fetch a generous pool so we can filter/sort and still have many results
-        fetch_limit = max(top_n * 10, 400)
-        all_posts = self.search_subreddits(
-            keyword, limit=fetch_limit, prioritize_traffic=prioritize_traffic
-        )
+        if offline:
+            all_posts = self.search_local(keyword, limit=self._fetch_limit(top_n))
+        else:
+            all_posts = self._search_candidates(
+                keyword, top_n, prioritize_traffic, dedup=dedup, post_cache=post_cache
+            )
         
         if not all_posts:
             return []
 
-        # Single combined ranking:
-        # - High Ahrefs traffic strongly favored
-        # - Recent posts get a small bonus
-        # - Engagement always matters
-        def combined_score(post):
-            traffic = post.get("search_traffic", 0) or 0
-            engagement = post.get("engagement_score", 0) or 0
-            is_recent = post.get("is_recent", False)
-            recent_bonus = 1.2 if is_recent else 1.0
-            return traffic * 3.0 + engagement * recent_bonus
-
-        all_posts.sort(key=combined_score, reverse=True)
-
-        # Ensure we return at least top_n if that many exist
-        return all_posts[: min(top_n, len(all_posts))]
+        self._annotate_velocity(all_posts)
+        return self._rank_posts(all_posts, top_n, weights)
+
+    @staticmethod
+    def _fetch_limit(top_n: int) -> int:
+        """Raw posts scanned for a top-N search."""
+        return max(top_n * 10, 400)
+
+    def _search_candidates(
+        self,
+        keyword: str,
+        top_n: int,
+        prioritize_traffic: bool = True,
+        dedup: Optional[DedupIndex] = None,
+        post_cache: Optional[PostCache] = None,
+    ) -> List[Post]:
+        """The candidate pool of a top-N search, before ranking."""
+        # Scan a generous pool so we can filter/sort and still have many results,
+        # but stop paging once enough candidates exist for the requested top N
+        return self.search_subreddits(
+            keyword,
+            limit=self._fetch_limit(top_n),
+            prioritize_traffic=prioritize_traffic,
+            min_candidates=top_n * self.CANDIDATE_POOL_FACTOR,
+            dedup=dedup,
+            post_cache=post_cache,
+        )
+
+    def watch_posts(self, posts: Iterable[Post]) -> None:
+        """
+        Track engagement velocity for these threads.
+
+        Watched threads are re-polled by `self.velocity` (see
+        start_velocity_polling to poll on a schedule), and their
+        velocity/acceleration are attached to them in later searches.
+        """
+        self.velocity.watch(post.fullname for post in posts)
+
+    def _annotate_velocity(self, posts: List[Post]) -> None:
+        """Attach tracked velocity/acceleration to posts in place."""
+        try:
+            rates = self.velocity.velocities(post.fullname for post in posts)
+        except Exception as e:
+            print(f"Velocity lookup failed: {e}")
+            return
+        for post in posts:
+            rate = rates.get(post.fullname)
+            if rate:
+                post.velocity = rate["velocity"]
+                post.acceleration = rate["acceleration"]
+
+    def search_local(
+        self,
+        keyword: Optional[str] = None,
+        subreddit: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        min_score: Optional[int] = None,
+        min_comments: Optional[int] = None,
+        min_engagement: Optional[int] = None,
+        limit: int = 50,
+    ) -> List[Post]:
+        """
+        Query previously fetched posts without touching reddit.com.
+
+        Candidates come from the post store's full-text index (any word of the
+        keyword) and are then checked with the same relevance rules as a live
+        search. See PostStore.query for the filter arguments.
+        """
+        posts = self.post_store.query(
+            text=keyword,
+            subreddit=subreddit,
+            since=since,
+            until=until,
+            min_score=min_score,
+            min_comments=min_comments,
+            min_engagement=min_engagement,
+            match_any=True,
+            limit=limit,
+        )
+        if keyword and keyword.strip():
+            posts = [
+                post
+                for post in posts
+                if self._is_keyword_relevant(post.title, keyword, post.selftext[:500])
+            ]
+        return posts
+
+    def _rank_posts(
+        self,
+        posts: List[Post],
+        top_n: int,
+        weights: Optional[RankingWeights] = None,
+    ) -> List[Post]:
+        """
+        Return the best top_n posts by the combined ranking score.
+
+        Single combined ranking (see ranking.py):
+        - High Ahrefs traffic strongly favored
+        - Recent posts get a small bonus
+        - Engagement always matters
+        Only the top_n are selected; the rest of the pool is never fully sorted.
+        """
+        return top_k(posts, top_n, weights or self.ranking_weights)
+
+    def _fetch_newer_posts(
+        self, keyword: str, newest_utc: float, newest_name: Optional[str]
+    ) -> Tuple[List[Post], float, Optional[str]]:
+        """
+        Walk the newest-first listing until reaching the stored watermark.
+
+        Returns the relevant new posts and the updated watermark
+        (newest created_utc and fullname seen, relevant or not). If a page
+        request fails before the watermark is reached, the old watermark is
+        kept so the next refresh fills the gap.
+        """
+        now = datetime.utcnow()
+        fresh: List[Post] = []
+        top_utc, top_name = newest_utc, newest_name
+        status = PublicSearchStatus()
+        reached = False
+
+        # A cached newest-first page would hide posts made since it was
+        # stored, so monitor refreshes always go to reddit.com
+        for page in self._iter_search_pages(
+            keyword,
+            limit=self.MONITOR_SCAN_LIMIT,
+            sort="new",
+            status=status,
+            use_cache=False,
+        ):
+            for raw in page:
+                created = float(raw.get("created_utc") or 0)
+                if raw.get("name") == newest_name or created < newest_utc:
+                    reached = True
+                    break
+                if created > top_utc:
+                    top_utc, top_name = created, raw.get("name")
+                try:
+                    post_data = self._parse_public_post(raw, keyword, now)
+                except Exception as e:
+                    print(f"Error processing public post: {e}")
+                    continue
+                if post_data is not None:
+                    fresh.append(post_data)
+            if reached:
+                break
+
+        if status.failed and not reached:
+            return fresh, newest_utc, newest_name
+        return fresh, top_utc, top_name
+
+    def monitor_keyword(
+        self,
+        keyword: str,
+        top_n: int = 10,
+        prioritize_traffic: bool = True,
+    ) -> List[Post]:
+        """
+        Incrementally refresh a tracked keyword and return its current top N.
+
+        The first call seeds a stored pool with a regular search and records a
+        watermark. Later calls only fetch posts newer than the watermark
+        (usually one or two requests), merge them into the stored pool and
+        re-rank it. A seed search that fails (e.g. rate limited or out of
+        time) returns what it found but stores nothing, so the next call
+        seeds again.
+
+        Args:
+            keyword: Tracked search term
+            top_n: Number of top posts to return
+            prioritize_traffic: Enrich new posts with Ahrefs traffic estimates
+
+        Returns:
+            List of top posts, ranked like get_top_posts
+        """
+        key = " ".join(keyword.lower().split())
+        now = datetime.utcnow()
+        cached = self.monitor_store.get(key)
+
+        if cached is None:
+            seed_time = time.time()
+            status = PublicSearchStatus()
+            fresh = self.search_subreddits(
+                keyword,
+                limit=max(top_n * 10, 400),
+                prioritize_traffic=prioritize_traffic,
+                status=status,
+            )
+            if status.failed:
+                # A "now" watermark over a missing or partial pool would hide
+                # the older posts from every later refresh
+                return self._rank_posts(fresh, top_n) if fresh else []
+            pool: Dict[str, Post] = {}
+            newest_utc, newest_name = seed_time, None
+        else:
+            state = json.loads(cached)
+            pool = {}
+            for record in state.get("posts", []):
+                post = Post.from_record(record)
+                post.refresh_age(now)
+                pool[post.url] = post
+            fresh, newest_utc, newest_name = self._fetch_newer_posts(
+                keyword, state.get("newest_utc", 0.0), state.get("newest_name")
+            )
+            if fresh and prioritize_traffic:
+                self._enrich_with_traffic(fresh, keyword)
+            self.post_store.add(fresh)
+
+        for post in fresh:
+            pool[post.url] = post
+
+        ranked = self._rank_posts(list(pool.values()), self.MONITOR_POOL_SIZE)
+        self.monitor_store.set(
+            key,
+            json.dumps(
+                {
+                    "newest_utc": newest_utc,
+                    "newest_name": newest_name,
+                    "posts": [post.to_record() for post in ranked],
+                }
+            ),
+        )
+        return ranked[: min(top_n, len(ranked))]
     
-    def get_post_details(self, post_url: str) -> Dict:
+    def search_many(
+        self,
+        keywords: Iterable[str],
+        top_n: int = 10,
+        prioritize_traffic: bool = True,
+        max_workers: Optional[int] = None,
+        weights: Optional[RankingWeights] = None,
+    ) -> Iterator[Tuple[str, List[Post]]]:
         """
-        Get detailed information about a specific post.
+        Run get_top_posts for many keywords concurrently.
+
+        Keywords fan out over a bounded thread pool sharing this scraper's
+        pooled session; requests per host are capped by `per_host_limit`.
+        Traffic metrics for every keyword are fetched alongside the searches
+        in one deduplicated bulk Ahrefs lookup, and each keyword's pool is
+        enriched and ranked as soon as its own search finishes.
+        Each keyword is deduplicated on its own, so a thread found by several
+        related keywords can appear in each of their results (ranked exactly
+        as a single-keyword search would); the batch shares a PostCache, so
+        the thread's Post is built only once.
+
+        Args:
+            keywords: Search terms (blank and duplicate entries are skipped)
+            top_n: Number of top posts to return per keyword
+            prioritize_traffic: Enrich posts with Ahrefs traffic estimates
+            max_workers: Thread pool size (defaults to `self.max_workers`)
+            weights: Ranking weights passed through to get_top_posts
 
-        For now this is a best-effort helper and will use PRAW only if available.
-        The main UI does not rely on this.
-        """
-        if not self.reddit:
-            return {
-                "title": "",
-                "url": post_url,
-                "subreddit": "",
-                "score": 0,
-                "comments": 0,
-                "selftext": "",
-                "created_utc": datetime.utcnow(),
-                "author": "[unknown]",
+        Yields:
+            (keyword, posts) tuples as they complete (not in input order). A
+            keyword whose search raised yields an empty list. Searches not yet
+            started are cancelled if the caller stops early.
+        """
+        unique = list(dict.fromkeys(k.strip() for k in keywords if k and k.strip()))
+        if not unique:
+            return
+
+        workers = max(1, min(max_workers or self.max_workers, len(unique)))
+        post_cache = PostCache()
+        # Tasks inherit the caller's context (per-request API accounting)
+        executor = ContextThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="reddit-search"
+        )
+        # The bulk lookup runs beside the searches rather than taking a slot
+        traffic_executor = ContextThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="ahrefs-bulk"
+        )
+        try:
+            traffic_future = (
+                traffic_executor.submit(self.ahrefs.get_keywords_traffic, unique)
+                if prioritize_traffic
+                else None
+            )
+            futures = {
+                executor.submit(
+                    self._search_candidates,
+                    keyword,
+                    top_n,
+                    prioritize_traffic=False,
+                    post_cache=post_cache,
+                ): keyword
+                for keyword in unique
             }
+            traffic: Optional[Dict[str, Optional[Dict]]] = None
+            for future in as_completed(futures):
+                keyword = futures[future]
+                try:
+                    posts = future.result()
+                except Exception as e:
+                    print(f"Search for '{keyword}' failed: {e}")
+                    posts = []
+                if not posts:
+                    yield keyword, []
+                    continue
+
+                if traffic is None and traffic_future is not None:
+                    try:
+                        traffic = traffic_future.result()
+                    except Exception as e:
+                        print(f"Ahrefs enrichment failed: {e}")
+                        traffic = {}
+                if traffic and traffic.get(keyword):
+                    self._apply_traffic(posts, traffic[keyword])
+                    # The search stored these posts before their traffic was known
+                    self.post_store.add(posts)
+                self._annotate_velocity(posts)
+                yield keyword, self._rank_posts(posts, top_n, weights)
+        finally:
+            # If the caller stops early, don't start keywords nobody will read
+            executor.shutdown(wait=False, cancel_futures=True)
+            traffic_executor.shutdown(wait=False)
+
+    def _cache_info(self, raw: Dict) -> None:
+        """Store the kept fields of a raw post in the info cache."""
+        name = raw.get("name")
+        if name:
+            self.info_cache.set(
+                name, json.dumps({k: raw[k] for k in self.INFO_FIELDS if k in raw})
+            )
+
+    def _fetch_info(
+        self, fullnames: Iterable[str], refresh: bool = False
+    ) -> Dict[str, Dict]:
+        """
+        Resolve fullnames to raw post data.
+
+        Cached entries are served locally (unless `refresh` is set, e.g. for
+        velocity polling); the rest are looked up through /api/info,
+        INFO_BATCH_SIZE fullnames per request.
+        """
+        found: Dict[str, Dict] = {}
+        missing: List[str] = []
+        for name in dict.fromkeys(fullnames):
+            cached = None if refresh else self.info_cache.get(name)
+            if cached is not None:
+                found[name] = json.loads(cached)
+            else:
+                missing.append(name)
 
-        submission = self.reddit.submission(url=post_url)
-
-        return {
-            "title": submission.title,
-            "url": f"https://reddit.com{submission.permalink}",
-            "subreddit": submission.subreddit.display_name,
-            "score": submission.score,
-            "comments": submission.num_comments,
-            "selftext": submission.selftext,
-            "created_utc": datetime.fromtimestamp(submission.created_utc),
-            "author": str(submission.author) if submission.author else "[deleted]",
+        for start in range(0, len(missing), self.INFO_BATCH_SIZE):
+            batch = missing[start : start + self.INFO_BATCH_SIZE]
+            try:
+                resp = self._get(
+                    f"{self.base_url}/api/info.json",
+                    params={"id": ",".join(batch), "raw_json": 1},
+                    timeout=10,
+                )
+                resp.raise_for_status()
+                data = resp.json()
+            except Exception as e:
+                print(f"Reddit info lookup failed: {e}")
+                continue
+
+            for child in data.get("data", {}).get("children", []) or []:
+                raw = child.get("data", {})
+                if raw.get("name"):
+                    found[raw["name"]] = raw
+                    self._cache_info(raw)
+
+        return found
+
+    def _fetch_subreddit_info(self, names: List[str]) -> Dict[str, Dict]:
+        """
+        Look up raw subreddit data through /api/info, INFO_BATCH_SIZE names
+        per request. Returns a dict keyed by lowercase subreddit name.
+        """
+        found: Dict[str, Dict] = {}
+        for start in range(0, len(names), self.INFO_BATCH_SIZE):
+            batch = names[start : start + self.INFO_BATCH_SIZE]
+            try:
+                resp = self._get(
+                    f"{self.base_url}/api/info.json",
+                    params={"sr_name": ",".join(batch), "raw_json": 1},
+                    timeout=10,
+                )
+                resp.raise_for_status()
+                data = resp.json()
+            except Exception as e:
+                print(f"Reddit subreddit lookup failed: {e}")
+                continue
+
+            for child in data.get("data", {}).get("children", []) or []:
+                raw = child.get("data", {})
+                if raw.get("display_name"):
+                    found[raw["display_name"].lower()] = raw
+        return found
+
+    def aggregate_by_subreddit(self, posts: List[Post]) -> List[Dict]:
+        """
+        Group a result pool by subreddit, with subscriber/activity metadata.
+
+        Metadata for every subreddit in the pool is resolved in one batched,
+        cached lookup (never per post).
+        """
+        metadata = self.subreddits.get_many(post.subreddit for post in posts)
+        return aggregate_by_subreddit(posts, metadata)
+
+    def get_posts_details(self, post_urls: Iterable[str]) -> Dict[str, Post]:
+        """
+        Get detailed information about many posts at once.
+
+        Args:
+            post_urls: Reddit post URLs (permalinks)
+
+        Returns:
+            Dictionary mapping each resolvable URL to its Post (with the full
+            selftext); URLs that could not be resolved are left out.
+        """
+        fullnames = {}
+        for url in post_urls:
+            post_id = id_from_permalink(url)
+            if post_id:
+                fullnames[url] = f"t3_{post_id}"
+
+        found = self._fetch_info(fullnames.values())
+        now = datetime.utcnow()
+        details = {
+            url: self._build_post(found[name], now, selftext_limit=None)
+            for url, name in fullnames.items()
+            if name in found
         }
+        self.post_store.add(details.values())
+        return details
+
+    def get_post_details(self, post_url: str) -> Post:
+        """
+        Get detailed information about a specific post.
+
+        Best-effort helper built on get_posts_details; returns an empty Post
+        if the URL cannot be resolved. The main UI does not rely on this.
+        """
+        post = self.get_posts_details([post_url]).get(post_url)
+        if post is not None:
+            return post
+
+        return Post(
+            title="",
+            url=post_url,
+            subreddit="",
+            score=0,
+            comments=0,
+            engagement_score=0,
+            created_utc=datetime.utcnow().timestamp(),
+            age_days=0,
+            is_recent=True,
+        )
+
+
+_velocity_poller: Optional[VelocityTracker] = None
+_velocity_poller_lock = threading.Lock()
+# Open lock file held by the process that polls (see _hold_poller_lock)
+_velocity_lock_file = None
+
+
+def _hold_poller_lock(db_path: str) -> bool:
+    """
+    Take the host-wide poller lock for a velocity database, without waiting.
+
+    The lock is held until the process exits, so when gunicorn replaces the
+    polling worker its successor takes over. Without fcntl every process polls.
+    """
+    global _velocity_lock_file
+    lock_path = db_path + ".lock"
+    if _velocity_lock_file is not None:
+        if _velocity_lock_file.name == lock_path:
+            return True
+        _velocity_lock_file.close()
+        _velocity_lock_file = None
+    if fcntl is None:
+        return True
+    lock_file = open(lock_path, "a")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    _velocity_lock_file = lock_file
+    return True
+
+
+def start_velocity_polling(scraper: RedditScraper, interval: Optional[float] = None) -> bool:
+    """
+    Poll `scraper`'s watched threads in the background, once per host.
+
+    A poller started for an earlier scraper is stopped first, so re-creating
+    the scraper (as app.init_components does) never leaves extra threads.
+    The watched set and samples live in the shared velocity database, so with
+    several gunicorn workers only the one holding the poller lock polls; the
+    others just add threads to watch and read velocities.
+
+    Args:
+        scraper: Scraper whose velocity tracker should be polled
+        interval: Seconds between polls (default: REDDIT_VELOCITY_POLL_SECONDS;
+                  0 disables scheduled polling)
+
+    Returns:
+        True if `scraper`'s watched threads are polled, by this process or
+        by the one holding the poller lock
+    """
+    global _velocity_poller
+    if interval is None:
+        interval = float(os.getenv("REDDIT_VELOCITY_POLL_SECONDS", "0"))
+    with _velocity_poller_lock:
+        if _velocity_poller is not None and _velocity_poller is not scraper.velocity:
+            _velocity_poller.stop()
+            _velocity_poller = None
+        if interval <= 0:
+            return False
+        if _hold_poller_lock(scraper.velocity.path):
+            scraper.velocity.start(interval)
+            _velocity_poller = scraper.velocity
+        return True
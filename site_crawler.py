@@ -0,0 +1,367 @@
+"""
+Bounded multi-page crawl of a product site.
+
+A homepage alone often says little about pricing or features. SiteCrawler
+starts at the homepage, picks the pages most likely to describe the product
+(pricing, features, about) from its links and from sitemap.xml, and fetches
+them concurrently through the shared PageFetcher. The crawl is bounded by a
+depth and page budget, at most `per_host` requests run against one host at a
+time, and robots.txt is respected. The pages' text is merged into one
+budget-limited, deduplicated text for the analyzer.
+"""
+import os
+import re
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urldefrag, urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+from api_metrics import ContextThreadPoolExecutor
+from html_extract import PageInfo, extract
+from page_fetcher import PageFetcher, default_fetcher
+
+# Name matched against robots.txt User-agent lines
+ROBOTS_AGENT = "redaccel"
+# Page kinds worth crawling, in merge order, with the words that identify them
+# in a link's first path segment or anchor text
+PAGE_KINDS = {
+    "pricing": ("pricing", "prices", "plans", "plan", "price", "buy", "subscribe"),
+    "features": ("features", "feature", "product", "how-it-works", "solutions", "tour", "use-cases"),
+    "about": ("about", "about-us", "company", "story", "team"),
+}
+# Site sections that hold articles rather than product pages
+SKIPPED_SECTIONS = frozenset({
+    "blog", "news", "docs", "doc", "help", "support", "kb", "articles", "posts",
+    "press", "resources", "learn", "tag", "tags", "category", "author", "careers", "jobs",
+})
+# Product pages sit near the root; deeper paths are articles, items, etc.
+MAX_PATH_SEGMENTS = 2
+# Longer anchors/slugs are prose (e.g. post titles), matched only as a whole
+MAX_HINT_WORDS = 3
+_LOCALE = re.compile(r"^[a-z]{2}(?:[-_][a-z]{2})?$")
+SITEMAP_TYPES = ("application/xml", "text/xml", "text/plain")
+_SKIPPED_EXTENSIONS = re.compile(
+    r"\.(?:pdf|png|jpe?g|gif|svg|webp|ico|css|js|json|zip|gz|mp4|mp3|woff2?)$", re.IGNORECASE
+)
+_LOC = re.compile(r"<loc>\s*(.*?)\s*</loc>", re.IGNORECASE | re.DOTALL)
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+MAX_SITEMAP_URLS = 2000
+
+
+@dataclass(slots=True)
+class CrawledPage:
+    url: str
+    kind: str  # "home", "pricing", "features" or "about"
+    depth: int
+    info: PageInfo
+
+
+@dataclass(slots=True)
+class CrawlResult:
+    url: str
+    pages: List[CrawledPage] = field(default_factory=list)  # homepage first
+    text: str = ""  # merged, deduplicated text of all pages
+    disallowed: List[str] = field(default_factory=list)  # skipped for robots.txt
+    errors: Dict[str, str] = field(default_factory=dict)  # url -> error
+
+    @property
+    def home(self) -> Optional[PageInfo]:
+        return self.pages[0].info if self.pages and self.pages[0].kind == "home" else None
+
+    def to_dict(self) -> Dict:
+        return {
+            "url": self.url,
+            "pages": [{"url": p.url, "kind": p.kind, "depth": p.depth} for p in self.pages],
+            "disallowed": self.disallowed,
+            "errors": self.errors,
+        }
+
+
+def _host(url: str) -> str:
+    return urlparse(url).netloc.lower().removeprefix("www.")
+
+
+def _segments(url: str) -> List[str]:
+    """Path segments, without a leading locale ("/en/pricing" -> ["pricing"])."""
+    segments = [s for s in urlparse(url).path.lower().split("/") if s]
+    if len(segments) > 1 and _LOCALE.match(segments[0]):
+        segments = segments[1:]
+    return segments
+
+
+def _hint_words(text: str) -> set:
+    """`text` as a whole, plus its words when it is short."""
+    text = text.strip().lower()
+    words = [w for w in re.split(r"[-_.\s]+", text) if w]
+    return {text, *words} if len(words) <= MAX_HINT_WORDS else {text}
+
+
+def page_kind(url: str, anchor: str = "") -> Optional[str]:
+    """
+    The PAGE_KINDS entry a link points to, judged by its first path segment
+    and anchor text; None for article sections and deep paths.
+    """
+    segments = _segments(url)
+    if (
+        not segments
+        or len(segments) > MAX_PATH_SEGMENTS
+        or segments[0] in SKIPPED_SECTIONS
+    ):
+        return None
+    # "/pricing-plans" matches "pricing", "/how-it-works" matches as a whole
+    words = _hint_words(segments[0]) | _hint_words(anchor)
+    for kind, hints in PAGE_KINDS.items():
+        if any(hint in words for hint in hints):
+            return kind
+    return None
+
+
+def merge_texts(sections: List[Tuple[str, str]], budget: int) -> str:
+    """
+    Join (label, text) sections within `budget` characters.
+
+    Sentences already seen on an earlier page (navigation, footers, shared
+    taglines) are dropped, and every section gets a fair share of the
+    budget; what a short section leaves unused goes to the others, in order.
+    """
+    seen = set()
+    unique: List[Tuple[str, str]] = []
+    for label, text in sections:
+        kept = []
+        for sentence in _SENTENCE_END.split(text):
+            key = " ".join(sentence.lower().split())
+            if key and key not in seen:
+                seen.add(key)
+                kept.append(sentence)
+        if kept:
+            unique.append((f"[{label}] ", " ".join(kept)))
+
+    if not unique:
+        return ""
+    available = budget - sum(len(header) + 1 for header, _ in unique)
+    shares = [0] * len(unique)
+    remaining = list(range(len(unique)))
+    # Water-filling: equal shares, capped by each section's length
+    while remaining and available > 0:
+        share = max(available // len(remaining), 1)
+        still = []
+        for i in remaining:
+            take = min(share, len(unique[i][1]) - shares[i], available)
+            shares[i] += take
+            available -= take
+            if shares[i] < len(unique[i][1]):
+                still.append(i)
+        remaining = still
+    return "\n".join(
+        header + text[:shares[i]] for i, (header, text) in enumerate(unique) if shares[i]
+    )
+
+
+class SiteCrawler:
+    """Concurrent, budgeted crawl of a site's product pages."""
+
+    def __init__(
+        self,
+        fetcher: Optional[PageFetcher] = None,
+        max_pages: int = 6,
+        max_depth: int = 1,
+        per_host: int = 2,
+        max_workers: int = 4,
+        text_budget: int = 10000,
+        timeout: float = 10,
+    ):
+        """
+        Initialize the crawler.
+
+        Args:
+            fetcher: PageFetcher used for pages, robots.txt and sitemaps
+                     (the shared one by default)
+            max_pages: Most pages fetched per crawl, homepage included
+            max_depth: Link hops followed from the homepage
+            per_host: Most concurrent requests to one host
+            max_workers: Most concurrent requests overall
+            text_budget: Characters of merged text returned
+            timeout: Per-request timeout in seconds
+        """
+        self.fetcher = fetcher or default_fetcher()
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.per_host = per_host
+        self.max_workers = max_workers
+        self.text_budget = text_budget
+        self.timeout = timeout
+
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_lock = threading.Lock()
+
+    def _slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc.lower()
+        with self._host_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return slot
+
+    def _get(self, url: str, **kwargs):
+        with self._slot(url):
+            return self.fetcher.fetch(url, timeout=self.timeout, **kwargs)
+
+    def _robots(self, root: str) -> RobotFileParser:
+        robots = RobotFileParser(urljoin(root, "/robots.txt"))
+        try:
+            page = self._get(robots.url)
+            robots.parse(page.text.splitlines())
+        except requests.HTTPError as e:
+            # Same reading as RobotFileParser.read(): 401/403 forbid crawling,
+            # a missing robots.txt allows everything
+            status = e.response.status_code if e.response is not None else 0
+            if status in (401, 403):
+                robots.disallow_all = True
+            else:
+                robots.allow_all = True
+        except requests.RequestException:
+            robots.allow_all = True
+        return robots
+
+    def _sitemap_urls(self, root: str, robots: RobotFileParser) -> List[str]:
+        """Page URLs listed in the site's sitemaps (one level of index followed)."""
+        sitemaps = list(robots.site_maps() or []) or [urljoin(root, "/sitemap.xml")]
+        urls: List[str] = []
+        nested = 0
+        while sitemaps and len(urls) < MAX_SITEMAP_URLS:
+            sitemap = sitemaps.pop(0)
+            try:
+                page = self._get(sitemap, allowed_types=SITEMAP_TYPES)
+            except requests.RequestException:
+                continue
+            for loc in _LOC.findall(page.text):
+                if loc.lower().endswith((".xml", ".xml.gz")):
+                    # Sitemap index: follow a couple of its sitemaps
+                    if nested < 2 and not loc.lower().endswith(".gz"):
+                        nested += 1
+                        sitemaps.append(loc)
+                else:
+                    urls.append(loc)
+        return urls[:MAX_SITEMAP_URLS]
+
+    def _candidates(self, root_host: str, links, seen, robots, result) -> Dict[str, List[str]]:
+        """
+        Unseen, allowed same-site URLs per page kind, best first: links found
+        on pages before sitemap entries, shallow paths before deep ones.
+        """
+        ranked: Dict[str, List[Tuple[Tuple[bool, int, int], str]]] = defaultdict(list)
+        queued = set()
+        for order, (url, anchor, from_sitemap) in enumerate(links):
+            url = urldefrag(url)[0]
+            if (
+                not url.startswith(("http://", "https://"))
+                or url in seen
+                or url in queued
+                or _host(url) != root_host
+                or _SKIPPED_EXTENSIONS.search(urlparse(url).path)
+            ):
+                continue
+            kind = page_kind(url, anchor)
+            if kind is None:
+                continue
+            if not robots.can_fetch(ROBOTS_AGENT, url):
+                if url not in result.disallowed:
+                    result.disallowed.append(url)
+                continue
+            queued.add(url)
+            ranked[kind].append(((from_sitemap, len(_segments(url)), order), url))
+        return {kind: [url for _, url in sorted(urls)] for kind, urls in ranked.items()}
+
+    def _fetch_page(self, url: str) -> PageInfo:
+        # The full page is needed for its links, so no early stop here
+        return extract(self._get(url).text)
+
+    def crawl(self, url: str) -> CrawlResult:
+        """
+        Crawl a site starting at `url` within the page and depth budgets.
+
+        Returns:
+            CrawlResult with the pages fetched and their merged text
+
+        Raises:
+            requests.RequestException: If the start page cannot be fetched
+        """
+        if not url.startswith(("http://", "https://")):
+            url = "https://" + url
+        result = CrawlResult(url=url)
+        parsed = urlparse(url)
+        root = f"{parsed.scheme}://{parsed.netloc}/"
+        root_host = _host(url)
+
+        robots = self._robots(root)
+        if not robots.can_fetch(ROBOTS_AGENT, url):
+            result.disallowed.append(url)
+            return result
+
+        with ContextThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="crawl"
+        ) as executor:
+            sitemap = executor.submit(self._sitemap_urls, root, robots)
+            home = self._fetch_page(url)
+            result.pages.append(CrawledPage(url, "home", 0, home))
+            seen = {url, urldefrag(url)[0], root}
+
+            frontier = [(urljoin(url, href), text, False) for href, text in home.links]
+            sitemap_links = [(loc, "", True) for loc in sitemap.result()]
+            for depth in range(1, self.max_depth + 1):
+                links = frontier + (sitemap_links if depth == 1 else [])
+                found = self._candidates(root_host, links, seen, robots, result)
+                # One page of each kind first, then the runners-up
+                picked: List[Tuple[str, str]] = []
+                budget = self.max_pages - len(result.pages)
+                rank = 0
+                while len(picked) < budget and any(len(v) > rank for v in found.values()):
+                    for kind in PAGE_KINDS:
+                        urls = found.get(kind, [])
+                        if len(urls) > rank and len(picked) < budget:
+                            picked.append((urls[rank], kind))
+                    rank += 1
+                if not picked:
+                    break
+
+                seen.update(page_url for page_url, _ in picked)
+                futures = [
+                    (page_url, kind, executor.submit(self._fetch_page, page_url))
+                    for page_url, kind in picked
+                ]
+                frontier = []
+                for page_url, kind, future in futures:
+                    try:
+                        info = future.result()
+                    except Exception as e:
+                        result.errors[page_url] = str(e)
+                        continue
+                    result.pages.append(CrawledPage(page_url, kind, depth, info))
+                    frontier.extend(
+                        (urljoin(page_url, href), text, False) for href, text in info.links
+                    )
+
+        order = ["home", *PAGE_KINDS]
+        pages = sorted(result.pages, key=lambda p: (order.index(p.kind), p.depth))
+        result.text = merge_texts(
+            # Main content leaves out the navigation and footer every page repeats
+            [(p.kind, p.info.main_content or p.info.text) for p in pages],
+            self.text_budget,
+        )
+        return result
+
+
+def crawler_from_env(fetcher: Optional[PageFetcher] = None, text_budget: int = 10000) -> SiteCrawler:
+    """SiteCrawler configured from CRAWL_* environment variables."""
+    return SiteCrawler(
+        fetcher=fetcher,
+        max_pages=int(os.getenv("CRAWL_MAX_PAGES", "6")),
+        max_depth=int(os.getenv("CRAWL_MAX_DEPTH", "1")),
+        per_host=int(os.getenv("CRAWL_PER_HOST", "2")),
+        max_workers=int(os.getenv("CRAWL_MAX_WORKERS", "4")),
+        text_budget=text_budget,
+    )
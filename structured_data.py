@@ -0,0 +1,223 @@
+"""
+Product facts from a page's structured data (JSON-LD and OpenGraph).
+
+Many product sites describe themselves with schema.org Product /
+SoftwareApplication / Offer data and OpenGraph tags. Reading those is
+deterministic and takes microseconds, so WebsiteAnalyzer uses it first and
+only asks the LLM for what is still missing (or skips it entirely).
+"""
+import json
+import re
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from html_extract import PageInfo
+
+# schema.org types describing the product itself -> product_type label
+PRODUCT_TYPES = {
+    "softwareapplication": "Software",
+    "webapplication": "Web App",
+    "mobileapplication": "Mobile App",
+    "videogame": "Game",
+    "product": "Product",
+    "service": "Service",
+}
+# Fields that, once filled, make an LLM call unnecessary
+COMPLETE_FIELDS = (
+    "product_name",
+    "product_description",
+    "product_features",
+    "pricing",
+    "product_type",
+)
+CURRENCY_SYMBOLS = {"USD": "$", "EUR": "€", "GBP": "£", "JPY": "¥", "INR": "₹"}
+BILLING_UNITS = {
+    "month": "/month", "monthly": "/month", "mon": "/month", "p1m": "/month",
+    "year": "/year", "yearly": "/year", "annual": "/year", "ann": "/year", "p1y": "/year",
+    "week": "/week", "p1w": "/week",
+    "day": "/day", "p1d": "/day",
+}
+MAX_FEATURES = 10
+MAX_OFFERS = 4
+_LIST_SEPARATORS = re.compile(r"\s*(?:\n|;|,(?!\d))\s*")
+
+
+def _json_ld_items(blocks: Iterable[str]) -> Iterator[Dict]:
+    """Every object in the JSON-LD blocks (lists and @graph flattened)."""
+    def walk(node):
+        if isinstance(node, list):
+            for item in node:
+                yield from walk(item)
+        elif isinstance(node, dict):
+            yield node
+            for key in ("@graph", "mainEntity"):
+                if key in node:
+                    yield from walk(node[key])
+
+    for block in blocks:
+        block = block.strip()
+        # Some CMSs wrap the JSON in an HTML comment or CDATA section
+        block = re.sub(r"^\s*(?:<!--|<!\[CDATA\[)|(?:-->|\]\]>)\s*$", "", block)
+        try:
+            # strict=False tolerates raw newlines/tabs inside strings
+            yield from walk(json.loads(block, strict=False))
+        except ValueError:
+            continue
+
+
+def _types(item: Dict) -> List[str]:
+    types = item.get("@type", [])
+    if isinstance(types, str):
+        types = [types]
+    return [t.rsplit("/", 1)[-1].lower() for t in types if isinstance(t, str)]
+
+
+def _text(value) -> str:
+    if isinstance(value, list):
+        value = value[0] if value else ""
+    if isinstance(value, dict):
+        value = value.get("name") or value.get("@value") or ""
+    return " ".join(str(value).split()) if value is not None else ""
+
+
+def _money(amount, currency: str) -> Optional[str]:
+    try:
+        value = float(str(amount).replace(",", ""))
+    except (TypeError, ValueError):
+        return None
+    if value == 0:
+        return "Free"
+    number = f"{int(value):,}" if value.is_integer() else f"{value:,.2f}"
+    symbol = CURRENCY_SYMBOLS.get(currency.upper())
+    return f"{symbol}{number}" if symbol else f"{number} {currency}".strip()
+
+
+def _billing_unit(spec: Dict) -> str:
+    unit = spec.get("unitText") or spec.get("billingDuration") or ""
+    reference = spec.get("referenceQuantity")
+    if not unit and isinstance(reference, dict):
+        unit = reference.get("unitText") or reference.get("unitCode") or ""
+    unit = str(unit).strip().lower().replace("per ", "")
+    return BILLING_UNITS.get(unit, "")
+
+
+def _offer_price(offer: Dict) -> Optional[str]:
+    currency = _text(offer.get("priceCurrency"))
+    if "lowPrice" in offer:  # AggregateOffer
+        low = _money(offer.get("lowPrice"), currency)
+        high = _money(offer.get("highPrice"), currency) if "highPrice" in offer else None
+        if low and high and high != low:
+            return f"{low} - {high}"
+        return f"From {low}" if low and low != "Free" else low
+
+    spec = offer.get("priceSpecification")
+    if isinstance(spec, list):
+        spec = spec[0] if spec else None
+    if "price" not in offer and isinstance(spec, dict):
+        price = _money(spec.get("price"), _text(spec.get("priceCurrency")) or currency)
+        if price and price != "Free":
+            price += _billing_unit(spec)
+        return price
+
+    price = _money(offer.get("price"), currency)
+    if price and price != "Free" and isinstance(spec, dict):
+        price += _billing_unit(spec)
+    return price
+
+
+def _pricing(offers) -> str:
+    if isinstance(offers, dict):
+        offers = [offers]
+    prices: List[str] = []
+    for offer in offers or []:
+        if not isinstance(offer, dict):
+            continue
+        price = _offer_price(offer)
+        if not price:
+            continue
+        name = _text(offer.get("name"))
+        labelled = name and len(offers) > 1 and name.lower() != price.lower()
+        entry = f"{name}: {price}" if labelled else price
+        if entry not in prices:
+            prices.append(entry)
+    return ", ".join(prices[:MAX_OFFERS])
+
+
+def _features(value) -> List[str]:
+    if isinstance(value, str):
+        value = _LIST_SEPARATORS.split(value)
+    elif not isinstance(value, list):
+        return []
+    features = []
+    for feature in value:
+        feature = _text(feature)
+        if feature and feature not in features:
+            features.append(feature)
+    return features[:MAX_FEATURES]
+
+
+def _product_type(item: Dict, types: List[str]) -> str:
+    label = next((PRODUCT_TYPES[t] for t in types if t in PRODUCT_TYPES), "")
+    category = _text(item.get("applicationCategory"))
+    if label and category:
+        # "BusinessApplication" -> "Software (Business)"
+        category = re.sub(r"Application$", "", category) or category
+        return f"{label} ({category})"
+    return label
+
+
+def product_info_from_page(info: PageInfo) -> Dict:
+    """
+    Product fields (as in WebsiteAnalyzer's schema) found in structured data.
+
+    Only fields that were actually found are returned.
+    """
+    product = None
+    product_types: List[str] = []
+    for item in _json_ld_items(info.json_ld):
+        types = _types(item)
+        if any(t in PRODUCT_TYPES for t in types):
+            product, product_types = item, types
+            break
+
+    data: Dict = {}
+    if product is not None:
+        name = _text(product.get("name"))
+        if name:
+            data["product_name"] = name
+        description = _text(product.get("description"))
+        if description:
+            data["product_description"] = description
+        features = _features(product.get("featureList"))
+        if features:
+            data["product_features"] = features
+        pricing = _pricing(product.get("offers"))
+        if pricing:
+            data["pricing"] = pricing
+        product_type = _product_type(product, product_types)
+        if product_type:
+            data["product_type"] = product_type
+
+    og = info.og
+    if "product_name" not in data and og.get("og:site_name"):
+        data["product_name"] = og["og:site_name"]
+    if "product_description" not in data:
+        description = info.meta.get("description") or og.get("og:description")
+        if description:
+            data["product_description"] = description
+    if "pricing" not in data and og.get("product:price:amount"):
+        pricing = _money(og["product:price:amount"], og.get("product:price:currency", ""))
+        if pricing:
+            data["pricing"] = pricing
+    if "product_type" not in data and og.get("og:type", "").lower() == "product":
+        data["product_type"] = "Product"
+    return data
+
+
+def is_complete(data: Dict) -> bool:
+    """Whether structured data alone answers the analysis."""
+    return all(data.get(field) for field in COMPLETE_FIELDS)
+
+
+def known_fields(data: Dict) -> int:
+    """How many of the essential fields structured data filled."""
+    return sum(1 for field in COMPLETE_FIELDS if data.get(field))
@@ -0,0 +1,182 @@
+"""
+Subreddit metadata cache (subscribers, active users, NSFW flag, age).
+
+Metadata is looked up in bulk (RedditScraper resolves up to 100 subreddits
+per /api/info?sr_name= request) and kept in the shared TTL cache. Entries
+older than the TTL but within the stale window are served immediately and
+revalidated in the background, so aggregations over a result pool cost at
+most one batched lookup for the subreddits never seen before.
+"""
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Sequence
+
+from reddit_post import Post
+from ttl_cache import TTLCache
+
+
+@dataclass(slots=True)
+class SubredditInfo:
+    name: str
+    subscribers: int = 0
+    active_users: int = 0
+    over18: bool = False
+    created_utc: float = 0.0
+
+    @classmethod
+    def from_raw(cls, raw: Dict) -> "SubredditInfo":
+        """Build from a raw t5 listing item."""
+        return cls(
+            name=raw.get("display_name", ""),
+            subscribers=int(raw.get("subscribers") or 0),
+            active_users=int(
+                raw.get("active_user_count") or raw.get("accounts_active") or 0
+            ),
+            over18=bool(raw.get("over18", False)),
+            created_utc=float(raw.get("created_utc") or 0.0),
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "subscribers": self.subscribers,
+            "active_users": self.active_users,
+            "over18": self.over18,
+            "created_utc": self.created_utc,
+        }
+
+
+class SubredditMetadataCache:
+    """TTL + stale-while-revalidate cache of subreddit metadata."""
+
+    def __init__(
+        self,
+        fetch: Callable[[List[str]], Dict[str, Dict]],
+        cache: TTLCache,
+        stale_ttl: float = 7 * 86400,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            fetch: Bulk lookup returning raw subreddit data keyed by lowercase name
+            cache: Backing store; its `ttl` is how long an entry counts as fresh
+            stale_ttl: Extra seconds a stale entry may be served while refreshing
+        """
+        self.fetch = fetch
+        self.cache = cache
+        self.stale_ttl = stale_ttl
+        self.stale_served = 0
+        self.refreshes = 0
+
+        self._refreshing: set = set()
+        self._lock = threading.Lock()
+
+    def _store(self, raw_by_name: Dict[str, Dict]) -> Dict[str, SubredditInfo]:
+        found = {}
+        for key, raw in raw_by_name.items():
+            info = SubredditInfo.from_raw(raw)
+            self.cache.set(key, json.dumps(info.to_dict()))
+            found[key] = info
+        return found
+
+    def _revalidate(self, names: List[str]) -> None:
+        """Refresh stale entries in the background (one refresh per name at a time)."""
+        with self._lock:
+            names = [name for name in names if name not in self._refreshing]
+            self._refreshing.update(names)
+        if not names:
+            return
+
+        def run():
+            try:
+                self._store(self.fetch(names))
+                self.refreshes += 1
+            except Exception as e:
+                print(f"Subreddit metadata refresh failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.difference_update(names)
+
+        threading.Thread(target=run, name="subreddit-refresh", daemon=True).start()
+
+    def get_many(self, names: Iterable[str]) -> Dict[str, SubredditInfo]:
+        """
+        Metadata for the given subreddits, keyed by lowercase name.
+
+        Fresh and stale entries are answered from the cache; only subreddits
+        missing (or past the stale window) are fetched before returning.
+        Subreddits that cannot be resolved are left out.
+        """
+        now = time.time()
+        result: Dict[str, SubredditInfo] = {}
+        stale: List[str] = []
+        missing: List[str] = []
+        for key in dict.fromkeys(name.lower() for name in names if name):
+            entry = self.cache.get_entry(key)
+            age = now - entry[1] if entry is not None else None
+            if age is None or age >= self.cache.ttl + self.stale_ttl:
+                self.cache.misses += 1
+                missing.append(key)
+                continue
+            self.cache.hits += 1
+            result[key] = SubredditInfo(**json.loads(entry[0]))
+            if age >= self.cache.ttl:
+                stale.append(key)
+
+        if stale:
+            self.stale_served += len(stale)
+            self._revalidate(stale)
+        if missing:
+            try:
+                result.update(self._store(self.fetch(missing)))
+            except Exception as e:
+                print(f"Subreddit metadata lookup failed: {e}")
+        return result
+
+    def stats(self) -> Dict:
+        return dict(
+            self.cache.stats(), stale_served=self.stale_served, refreshes=self.refreshes
+        )
+
+
+def aggregate_by_subreddit(
+    posts: Sequence[Post], metadata: Dict[str, SubredditInfo]
+) -> List[Dict]:
+    """
+    Per-subreddit totals over a result pool, largest engagement first.
+
+    Args:
+        posts: Posts to group
+        metadata: Subreddit metadata keyed by lowercase name (see get_many)
+    """
+    groups: Dict[str, Dict] = {}
+    for post in posts:
+        key = post.subreddit.lower()
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {
+                "subreddit": post.subreddit,
+                "posts": 0,
+                "total_score": 0,
+                "total_comments": 0,
+                "total_engagement": 0,
+            }
+        group["posts"] += 1
+        group["total_score"] += post.score
+        group["total_comments"] += post.comments
+        group["total_engagement"] += post.engagement_score
+
+    for key, group in groups.items():
+        info = metadata.get(key)
+        group["subscribers"] = info.subscribers if info else None
+        group["active_users"] = info.active_users if info else None
+        group["over18"] = info.over18 if info else None
+        group["engagement_per_1k_subscribers"] = (
+            round(group["total_engagement"] * 1000 / info.subscribers, 3)
+            if info and info.subscribers
+            else None
+        )
+    return sorted(groups.values(), key=lambda g: g["total_engagement"], reverse=True)
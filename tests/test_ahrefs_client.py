@@ -0,0 +1,117 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import ttl_cache
+from ahrefs_client import AhrefsClient
+from api_metrics import registry, track_request
+from benchmarks.stub_server import StubServer
+
+
+class AhrefsClientTestCase(unittest.TestCase):
+    """An AhrefsClient pointed at a local StubServer with an empty cache."""
+
+    latency = 0.0
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.stub = StubServer(latency=self.latency).start()
+        self.addCleanup(self.stub.stop)
+        patches = [
+            mock.patch.object(ttl_cache, "CACHE_DIR", self.tmp.name),
+            mock.patch.dict(
+                os.environ,
+                {
+                    "AHREFS_API_TOKEN": "test-token",
+                    "AHREFS_BASE_URL": self.stub.url,
+                    "HTTP_REPLAY_MODE": "off",
+                },
+            ),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        registry("ahrefs").reset()
+        self.client = AhrefsClient()
+
+    def upstream_calls(self, path: str) -> int:
+        return self.stub.stats()["by_path"].get(path, 0)
+
+
+class BulkLookupTest(AhrefsClientTestCase):
+    def test_repeated_urls_cost_one_billed_request(self):
+        urls = ["https://example.com/pricing"] * 5
+        with track_request("bulk") as usage:
+            metrics = self.client.get_urls_metrics(urls)
+        self.assertEqual(list(metrics), ["https://example.com/pricing"])
+        self.assertIsNotNone(metrics["https://example.com/pricing"])
+        self.assertEqual(self.upstream_calls("/url-metrics"), 1)
+        spent = usage.summary()["apis"]["ahrefs"]["url-metrics"]["units_spent"]
+        self.assertEqual(spent, 1)
+
+        # A second batch is served from the cache
+        self.client.get_urls_metrics(urls + [""])
+        self.assertEqual(self.upstream_calls("/url-metrics"), 1)
+
+    def test_each_unique_url_is_fetched_once(self):
+        urls = [f"https://example.com/{i}" for i in range(6)]
+        metrics = self.client.get_urls_metrics(urls + urls)
+        self.assertEqual(list(metrics), urls)
+        self.assertEqual(self.upstream_calls("/url-metrics"), len(urls))
+
+
+class SingleFlightTest(AhrefsClientTestCase):
+    # Long enough that every caller arrives while the first request is in flight
+    latency = 0.3
+
+    def test_concurrent_identical_lookups_share_one_request(self):
+        callers = 6
+        barrier = threading.Barrier(callers)
+        results = []
+
+        def lookup(keyword):
+            barrier.wait()
+            results.append(self.client.get_keyword_metrics(keyword))
+
+        threads = [
+            threading.Thread(target=lookup, args=(keyword,))
+            for keyword in ["SEO tools", "seo  tools", "seo tools"] * (callers // 3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.upstream_calls("/keywords-explorer"), 1)
+        self.assertEqual(len(results), callers)
+        self.assertTrue(all(result == results[0] for result in results))
+        totals = self.client.stats()["totals"]
+        self.assertEqual(totals["units_spent"], 1)
+        self.assertEqual(totals["coalesced"] + totals["cache_hits"], callers - 1)
+        self.assertEqual(totals["units_saved"], callers - 1)
+
+    def test_cache_persists_across_clients_and_is_attributed_per_request(self):
+        self.client.get_keyword_metrics("seo tools")
+        with track_request("later") as usage:
+            AhrefsClient().get_keyword_metrics("Seo Tools")
+        self.assertEqual(self.upstream_calls("/keywords-explorer"), 1)
+        stats = usage.summary()["apis"]["ahrefs"]["keywords-explorer"]
+        self.assertEqual((stats["calls"], stats["cache_hits"]), (0, 1))
+        self.assertEqual((stats["units_spent"], stats["units_saved"]), (0, 1))
+        self.assertEqual(self.client.stats()["cache"]["entries"], 1)
+
+    def test_failed_lookups_are_not_cached_or_billed(self):
+        # Nothing listens on the discard port
+        self.client.base_url = "http://127.0.0.1:9"
+        self.client.rate_limiter.max_retries = 0
+        self.assertIsNone(self.client.get_keyword_metrics("seo"))
+        totals = self.client.stats()["totals"]
+        self.assertEqual(totals["units_spent"], 0)
+        self.assertEqual(self.client.stats()["cache"]["entries"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import ttl_cache
+from dedup_index import DedupIndex, PostCache, id_from_permalink, thread_keys
+from reddit_post import Post
+
+NOW = time.time()
+
+
+def make_post(fullname: str) -> Post:
+    return Post(
+        title="title",
+        url="https://reddit.com/",
+        subreddit="test",
+        score=1,
+        comments=0,
+        engagement_score=1,
+        created_utc=NOW,
+        age_days=0,
+        is_recent=True,
+        fullname=fullname,
+    )
+
+
+class ThreadKeysTest(unittest.TestCase):
+    def test_crosspost_shares_its_parents_key(self):
+        original = {"name": "t3_ABC", "permalink": "/r/a/comments/abc/x/"}
+        crosspost = {
+            "name": "t3_def",
+            "crosspost_parent": "t3_abc",
+            "crosspost_parent_list": [{"permalink": "/r/a/comments/abc/x/"}],
+        }
+        self.assertEqual(thread_keys(original), {"abc"})
+        self.assertEqual(thread_keys(crosspost), {"abc", "def"})
+        self.assertEqual(id_from_permalink("https://www.reddit.com/r/a/comments/Q1/t/"), "q1")
+        self.assertEqual(thread_keys({}), frozenset())
+
+
+class DedupIndexTest(unittest.TestCase):
+    def test_first_sighting_wins(self):
+        index = DedupIndex()
+        self.assertFalse(index.seen({"abc"}))
+        self.assertTrue(index.claim({"abc"}))
+        self.assertFalse(index.claim({"abc", "def"}))
+        self.assertTrue(index.seen({"def", "abc"}))
+        self.assertTrue(index.claim(set()))
+        self.assertEqual(index.stats(), {"unique_threads": 1, "duplicates_skipped": 2})
+
+    def test_concurrent_claims_admit_one(self):
+        index = DedupIndex()
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(index.claim({"abc"})))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results.count(True), 1)
+
+
+class PostCacheTest(unittest.TestCase):
+    def test_builds_once_and_hands_out_copies(self):
+        cache = PostCache()
+        builds = []
+
+        def build():
+            builds.append(1)
+            return make_post("t3_abc")
+
+        first = cache.get_or_build("t3_abc", build)
+        second = cache.get_or_build("t3_abc", build)
+        self.assertEqual(len(builds), 1)
+        self.assertIsNot(first, second)
+        first.search_traffic = 99
+        self.assertEqual(second.search_traffic, 0)
+        # Posts without a fullname are never cached
+        cache.get_or_build("", build)
+        cache.get_or_build("", build)
+        self.assertEqual(len(builds), 3)
+        self.assertEqual(cache.stats(), {"posts_built": 1, "posts_reused": 1})
+
+
+def raw_post(name: str, title: str) -> dict:
+    return {
+        "id": name[3:],
+        "name": name,
+        "title": title,
+        "selftext": "",
+        "permalink": f"/r/python/comments/{name[3:]}/thread/",
+        "subreddit": "python",
+        "score": 40,
+        "num_comments": 5,
+        "created_utc": NOW - 86400,
+        "author": "someone",
+    }
+
+
+SHARED = raw_post("t3_shared", "python seo tools for beginners")
+
+
+class SearchManyDedupTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        patcher = mock.patch.object(ttl_cache, "CACHE_DIR", self.tmp.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        from reddit_scraper import RedditScraper
+
+        self.scraper = RedditScraper()
+        self.scraper.reddit = None
+
+        pages = {
+            "python": [[SHARED, raw_post("t3_py", "python packaging tips")]],
+            "seo tools": [[SHARED, raw_post("t3_seo", "seo tools compared")]],
+        }
+
+        def search_pages(keyword, limit=200, sort="hot", status=None, use_cache=True):
+            for page in pages[keyword]:
+                if status is not None:
+                    status.scanned += len(page)
+                yield page
+
+        patcher = mock.patch.object(self.scraper, "_iter_search_pages", search_pages)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_shared_thread_is_in_each_keyword_and_built_once(self):
+        build = self.scraper._build_post
+        built = []
+
+        def counting_build(post, now):
+            built.append(post["name"])
+            return build(post, now)
+
+        with mock.patch.object(self.scraper, "_build_post", counting_build):
+            results = dict(
+                self.scraper.search_many(["python", "seo tools"], prioritize_traffic=False)
+            )
+
+        self.assertEqual(
+            {keyword: sorted(p.fullname for p in posts) for keyword, posts in results.items()},
+            {"python": ["t3_py", "t3_shared"], "seo tools": ["t3_seo", "t3_shared"]},
+        )
+        self.assertEqual(built.count("t3_shared"), 1)
+        # Each keyword got its own copy of the shared post
+        shared = [p for posts in results.values() for p in posts if p.fullname == "t3_shared"]
+        self.assertIsNot(shared[0], shared[1])
+
+    def test_batch_ranks_like_single_searches(self):
+        single = [
+            p.fullname
+            for p in self.scraper.get_top_posts("seo tools", prioritize_traffic=False)
+        ]
+        batch = dict(self.scraper.search_many(["python", "seo tools"], prioritize_traffic=False))
+        self.assertEqual([p.fullname for p in batch["seo tools"]], single)
+
+
+if __name__ == "__main__":
+    unittest.main()
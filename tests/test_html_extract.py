@@ -0,0 +1,87 @@
+import unittest
+
+import html_extract
+from html_extract import PageExtractor, extract
+
+PAGE = (
+    "<!DOCTYPE html><html><head><title>Acme &amp; Co &#8212; Widgets</title>"
+    '<meta name="description" content="Widgets for teams &gt; 10">'
+    "<meta property='og:title' content=Acme>"
+    "<style>p > a { color: red }</style>"
+    "<script>var s = '<p>not text</p>';</script></head><body>"
+    "<header><nav><a href='/pricing'>Pricing</a><a href=/about>About us</a></nav></header>"
+    "<!-- <h1>commented out</h1> -->"
+    '<div class="main-content"><h1>Build <b>faster</b></h1>'
+    + "".join(
+        f"<h2>Feature {i}</h2><p>Plans start at 5 &euro; a month, 1 < 2 and it's simple.</p>"
+        "<img src=x.png alt='a > b'><br/>"
+        for i in range(40)
+    )
+    + "</div><footer>Contact</footer>"
+    '<script type="application/ld+json">{"@type": "Product", "name": "Widget <b>"}</script>'
+    '<meta property="product:price:amount" content="5"></body></html>'
+)
+
+
+def fed_in_chunks(html: str, size: int, **kwargs):
+    extractor = PageExtractor(**kwargs)
+    for start in range(0, len(html), size):
+        if extractor.feed(html[start : start + size]):
+            break
+    return extractor.close()
+
+
+class PageExtractorTest(unittest.TestCase):
+    backends = ["stdlib"] + (["lxml"] if html_extract.etree is not None else [])
+
+    def test_chunked_feed_matches_whole_document(self):
+        for backend in self.backends:
+            whole = extract(PAGE, backend=backend)
+            for size in (1, 3, 17, 256, 16 * 1024):
+                with self.subTest(backend=backend, size=size):
+                    self.assertEqual(fed_in_chunks(PAGE, size, backend=backend), whole)
+
+    def test_stdlib_extracts_what_lxml_does(self):
+        if html_extract.etree is None:
+            self.skipTest("lxml is not installed")
+        stdlib, lxml = extract(PAGE, backend="stdlib"), extract(PAGE, backend="lxml")
+        for name in ("title", "description", "meta", "og", "headings", "main_content", "json_ld", "links"):
+            self.assertEqual(getattr(stdlib, name), getattr(lxml, name), name)
+
+    def test_stdlib_fields(self):
+        info = extract(PAGE, backend="stdlib")
+        self.assertEqual(info.title, "Acme & Co — Widgets")
+        self.assertEqual(info.description, "Widgets for teams > 10")
+        self.assertEqual(info.og["og:title"], "Acme")
+        self.assertEqual(info.headings[0], "Build faster")
+        self.assertEqual(info.links, [("/pricing", "Pricing"), ("/about", "About us")])
+        self.assertIn("5 € a month, 1 < 2 and it's simple.", info.main_content)
+        self.assertNotIn("not text", info.text)
+        self.assertNotIn("commented out", info.text)
+        self.assertNotIn("Contact", info.main_content)
+
+    def test_structured_scan_past_text_limit_matches_whole_document(self):
+        for backend in self.backends:
+            whole = PageExtractor(text_limit=200, backend=backend, scan_structured=True)
+            whole.feed(PAGE)
+            expected = whole.close()
+            self.assertEqual(expected.json_ld, ['{"@type": "Product", "name": "Widget <b>"}'])
+            self.assertEqual(expected.og["product:price:amount"], "5")
+            for size in (1, 7, 64, 1024):
+                with self.subTest(backend=backend, size=size):
+                    got = fed_in_chunks(
+                        PAGE, size, text_limit=200, backend=backend, scan_structured=True
+                    )
+                    self.assertEqual(got.json_ld, expected.json_ld)
+                    self.assertEqual(got.meta, expected.meta)
+                    self.assertEqual(got.og, expected.og)
+                    self.assertEqual(got.text, expected.text)
+
+    def test_text_limit_stops_feeding(self):
+        extractor = PageExtractor(text_limit=100, backend="stdlib")
+        self.assertTrue(extractor.feed(PAGE))
+        self.assertEqual(len(extractor.close().text), 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import random
+import unittest
+
+from keyword_matcher import KeywordMatcher, get_matcher
+
+
+def legacy_is_relevant(text: str, keyword: str) -> bool:
+    """The per-field check KeywordMatcher replaced."""
+    if not text:
+        return False
+    text_lower = text.lower()
+    keyword_lower = keyword.lower()
+    if keyword_lower in text_lower:
+        return True
+    keyword_words = keyword_lower.split()
+    if len(keyword_words) > 1:
+        matches = sum(1 for word in keyword_words if word in text_lower)
+        if matches >= len(keyword_words) * 0.7:
+            return True
+    return False
+
+
+# (keyword, title, body, relevant)
+CASES = [
+    ("python", "Learning Python in 2024", "", True),
+    ("python", "", "I use PYTHON daily", True),
+    ("python", "Rust or Go?", "neither", False),
+    # Substring, not word-boundary, matching
+    ("java", "JavaScript tips", "", True),
+    ("rust", "Do you trust your tools?", "", True),
+    ("py", "python", "", True),
+    # Multi-word: the whole phrase, or at least 70% of its words in one field
+    ("machine learning", "Machine learning for beginners", "", True),
+    ("machine learning", "Learning about machine shops", "", True),
+    ("machine learning", "A machine for coffee", "", False),
+    ("machine learning model", "Which machine learning course?", "", False),
+    ("machine learning model", "A model of machine learning", "", True),
+    ("best crm for startups", "Best crm tools", "", False),
+    ("best crm for startups", "Best crm for you", "", True),
+    # Words split across title and body do not add up
+    ("machine learning", "machine", "learning", False),
+    # A term never spans the title/body boundary
+    ("python", "I love pyth", "on the weekend", False),
+    # Overlapping and nested terms
+    ("seo tools", "seotools roundup", "", True),
+    ("ab bc", "abc", "", True),
+    ("aaa", "aaaa", "", True),
+    ("new york times", "times new york", "", True),
+    ("", "anything", "", False),
+]
+
+KEYWORD_SETS = [
+    ("python", "py", "python tools"),
+    ("ab", "bc", "abc", "b"),
+    ("seo", "seo tools", "tools for seo", "so"),
+    ("machine learning", "learning", "machine learning model"),
+]
+
+
+class KeywordMatcherTest(unittest.TestCase):
+    def test_cases(self):
+        for keyword, title, body, relevant in CASES:
+            with self.subTest(keyword=keyword, title=title, body=body):
+                if not keyword:
+                    self.assertEqual(KeywordMatcher([keyword]).relevant_keywords(title, body), [])
+                    continue
+                matcher = KeywordMatcher([keyword])
+                self.assertEqual(matcher.is_relevant(keyword, title, body), relevant)
+                self.assertEqual(
+                    relevant,
+                    legacy_is_relevant(title, keyword) or legacy_is_relevant(body, keyword),
+                )
+
+    def test_overlapping_keywords_are_all_found(self):
+        matcher = KeywordMatcher(["ab", "bc", "abc", "b", "cd"])
+        self.assertEqual(matcher.relevant_keywords("xabcx"), ["ab", "bc", "abc", "b"])
+        self.assertEqual(matcher.relevant_keywords("", "ABCD"), ["ab", "bc", "abc", "b", "cd"])
+
+    def test_prefix_terms_are_implied(self):
+        matcher = KeywordMatcher(["python", "py", "python tools"])
+        self.assertEqual(matcher.relevant_keywords("python"), ["python", "py"])
+        self.assertEqual(
+            matcher.relevant_keywords("tools for python"), ["python", "py", "python tools"]
+        )
+
+    def test_keywords_keep_order_and_drop_blanks(self):
+        matcher = KeywordMatcher(["seo", "", "  ", "seo", "marketing"])
+        self.assertEqual(matcher.keywords, ("seo", "marketing"))
+        self.assertEqual(matcher.relevant_keywords("Marketing and SEO"), ["seo", "marketing"])
+
+    def test_unknown_keyword_raises(self):
+        with self.assertRaises(KeyError):
+            KeywordMatcher(["seo"]).is_relevant("python", "python")
+
+    def test_get_matcher_is_cached(self):
+        self.assertIs(get_matcher(("seo", "ads")), get_matcher(("seo", "ads")))
+
+    def test_matches_legacy_check_on_random_text(self):
+        rng = random.Random(6)
+        alphabet = ["a", "b", "c", " ", "ab", "bc", "seo", "tools", "py", "thon"]
+        for keywords in KEYWORD_SETS:
+            matcher = KeywordMatcher(keywords)
+            for _ in range(500):
+                title = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+                body = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+                expected = [
+                    k
+                    for k in keywords
+                    if legacy_is_relevant(title, k) or legacy_is_relevant(body, k)
+                ]
+                self.assertEqual(
+                    matcher.relevant_keywords(title, body),
+                    expected,
+                    msg=f"{keywords!r} title={title!r} body={body!r}",
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
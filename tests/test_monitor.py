@@ -0,0 +1,158 @@
+import json
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import ttl_cache
+from rate_limiter import RateLimitTimeout
+
+NOW = time.time()
+
+
+TITLES = {
+    "t3_a": "Which python web framework should I pick?",
+    "t3_b": "Packaging a python CLI for Windows users",
+    "t3_c": "Is python fast enough for realtime audio?",
+}
+
+
+def raw_post(name: str, created_utc: float) -> dict:
+    return {
+        "id": name[3:],
+        "name": name,
+        "title": TITLES.get(name, f"python question {name}"),
+        "selftext": "",
+        "permalink": f"/r/python/comments/{name[3:]}/thread/",
+        "subreddit": "python",
+        "score": 40,
+        "num_comments": 5,
+        "created_utc": created_utc,
+        "author": "someone",
+    }
+
+
+class FakeSearch:
+    """Stands in for RedditScraper._iter_search_pages."""
+
+    def __init__(self, pages, fail_after=None):
+        self.pages = pages
+        self.fail_after = fail_after  # pages served before a request fails
+        self.served = 0
+        self.calls = []
+
+    def __call__(self, keyword, limit=200, sort="hot", status=None, use_cache=True):
+        self.calls.append({"sort": sort, "use_cache": use_cache})
+        for page in self.pages:
+            if self.fail_after is not None and self.served >= self.fail_after:
+                if status is not None:
+                    status.failed = True
+                    status.timed_out = True
+                print(f"Public search failed: {RateLimitTimeout('out of time')}")
+                return
+            self.served += 1
+            if status is not None:
+                status.scanned += len(page)
+            yield page
+
+
+class MonitorKeywordTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        patcher = mock.patch.object(ttl_cache, "CACHE_DIR", self.tmp.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        from reddit_scraper import RedditScraper
+
+        self.scraper = RedditScraper()
+        self.scraper.reddit = None
+
+    def use_search(self, search: FakeSearch) -> FakeSearch:
+        patcher = mock.patch.object(self.scraper, "_iter_search_pages", search)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return search
+
+    def stored_state(self, keyword: str = "python"):
+        cached = self.scraper.monitor_store.get(keyword)
+        return json.loads(cached) if cached is not None else None
+
+    def test_refresh_stops_at_the_watermark(self):
+        search = self.use_search(
+            FakeSearch(
+                [
+                    [
+                        raw_post("t3_new2", NOW - 10),
+                        raw_post("t3_new1", NOW - 20),
+                        raw_post("t3_mark", NOW - 30),
+                        raw_post("t3_old", NOW - 40),
+                    ],
+                    [raw_post("t3_older", NOW - 50)],
+                ]
+            )
+        )
+        fresh, newest_utc, newest_name = self.scraper._fetch_newer_posts(
+            "python", NOW - 30, "t3_mark"
+        )
+        self.assertEqual([post.fullname for post in fresh], ["t3_new2", "t3_new1"])
+        self.assertEqual((newest_utc, newest_name), (NOW - 10, "t3_new2"))
+        self.assertEqual(search.served, 1)
+        self.assertEqual(search.calls, [{"sort": "new", "use_cache": False}])
+
+    def test_failed_refresh_keeps_the_old_watermark(self):
+        self.use_search(
+            FakeSearch(
+                [
+                    [raw_post("t3_new2", NOW - 10), raw_post("t3_new1", NOW - 20)],
+                    [raw_post("t3_mark", NOW - 30)],
+                ],
+                fail_after=1,
+            )
+        )
+        fresh, newest_utc, newest_name = self.scraper._fetch_newer_posts(
+            "python", NOW - 30, "t3_mark"
+        )
+        self.assertEqual(len(fresh), 2)
+        self.assertEqual((newest_utc, newest_name), (NOW - 30, "t3_mark"))
+
+    def test_failed_seed_is_not_stored(self):
+        self.use_search(FakeSearch([[raw_post("t3_a", NOW - 86400)]], fail_after=0))
+        self.assertEqual(self.scraper.monitor_keyword("python", prioritize_traffic=False), [])
+        self.assertIsNone(self.stored_state())
+
+    def test_partial_seed_is_returned_but_not_stored(self):
+        self.use_search(
+            FakeSearch(
+                [[raw_post("t3_a", NOW - 86400)], [raw_post("t3_b", NOW - 2 * 86400)]],
+                fail_after=1,
+            )
+        )
+        posts = self.scraper.monitor_keyword("python", prioritize_traffic=False)
+        self.assertEqual([post.fullname for post in posts], ["t3_a"])
+        self.assertIsNone(self.stored_state())
+
+    def test_successful_seed_then_incremental_refresh(self):
+        self.use_search(
+            FakeSearch([[raw_post("t3_a", NOW - 86400), raw_post("t3_b", NOW - 2 * 86400)]])
+        )
+        seeded = self.scraper.monitor_keyword("python", prioritize_traffic=False)
+        self.assertEqual(len(seeded), 2)
+        state = self.stored_state()
+        self.assertEqual(len(state["posts"]), 2)
+        watermark = state["newest_utc"]
+
+        search = self.use_search(
+            FakeSearch([[raw_post("t3_c", watermark + 5), raw_post("t3_a", NOW - 86400)]])
+        )
+        refreshed = self.scraper.monitor_keyword("python", prioritize_traffic=False)
+        self.assertEqual(
+            sorted(post.fullname for post in refreshed), ["t3_a", "t3_b", "t3_c"]
+        )
+        self.assertEqual(search.served, 1)
+        self.assertEqual(self.stored_state()["newest_name"], "t3_c")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+
+from demo_mode import SyntheticCorpus
+from near_duplicates import NearDuplicateClusterer, jaccard, title_shingles
+from reddit_post import Post
+
+# A~B and B~C meet the 0.7 threshold, A~C does not
+CHAIN = (
+    "best budget mechanical keyboard for coding",
+    "best budget mechanical keyboard for coding and gaming",
+    "budget mechanical keyboard for coding and gaming setups",
+)
+
+
+def make_post(title: str, score: int = 10) -> Post:
+    return Post(
+        title=title,
+        url="https://reddit.com/r/test/comments/x/",
+        subreddit="test",
+        score=score,
+        comments=0,
+        engagement_score=score,
+        created_utc=0.0,
+        age_days=0,
+        is_recent=True,
+    )
+
+
+class NearDuplicateClustererTest(unittest.TestCase):
+    def setUp(self):
+        # One-row bands, so every similar pair shares a bucket
+        self.clusterer = NearDuplicateClusterer(threshold=0.7, bands=32, rows=1)
+
+    def test_chain_is_not_merged_transitively(self):
+        a, b, c = (title_shingles(title) for title in CHAIN)
+        self.assertGreaterEqual(jaccard(a, b), 0.7)
+        self.assertGreaterEqual(jaccard(b, c), 0.7)
+        self.assertLess(jaccard(a, c), 0.7)
+
+        clusters = self.clusterer.cluster([make_post(title) for title in CHAIN])
+        self.assertEqual(clusters, [[0, 1], [2]])
+
+    def test_every_member_meets_threshold_against_its_head(self):
+        titles = list(CHAIN) + [CHAIN[1] + "?", "how do I learn rust as a python developer"]
+        shingles = [title_shingles(title) for title in titles]
+        for members in self.clusterer.cluster([make_post(title) for title in titles]):
+            for i in members:
+                self.assertGreaterEqual(jaccard(shingles[i], shingles[members[0]]), 0.7)
+
+    def test_incremental_index_matches_batch_clustering(self):
+        posts = [make_post(title) for title in CHAIN]
+        index = self.clusterer.index()
+        for post in posts:
+            index.add(post)
+        self.assertEqual(len(index), 2)
+        self.assertEqual(index.clusters, self.clusterer.cluster(posts))
+
+    def test_collapse_keeps_best_post_of_each_cluster(self):
+        posts = [
+            make_post("best budget mechanical keyboard for coding", score=5),
+            make_post("how do I learn rust as a python developer", score=3),
+            make_post("Best budget mechanical keyboard for coding!", score=50),
+        ]
+        kept = self.clusterer.collapse(posts)
+        self.assertEqual([post.score for post in kept], [3, 50])
+        self.assertEqual(kept[1].cluster_size, 2)
+
+
+class NearDuplicateScalingTest(unittest.TestCase):
+    def test_comparisons_per_post_are_bounded(self):
+        # Template titles crowd the same LSH buckets; each post is still
+        # compared with at most max_candidates cluster heads
+        corpus = SyntheticCorpus("python", size=5000, seed=1)
+        posts = [make_post(raw["title"]) for raw in corpus.slice(0, 5000)]
+        clusterer = NearDuplicateClusterer(max_candidates=8)
+        index = clusterer.index()
+        for post in posts:
+            index.add(post)
+        self.assertLessEqual(index.comparisons, 8 * len(posts))
+        self.assertEqual(sum(len(members) for members in index.clusters), len(posts))
+
+
+if __name__ == "__main__":
+    unittest.main()
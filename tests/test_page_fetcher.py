@@ -0,0 +1,112 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from page_fetcher import PARTIAL_KEY_SUFFIX, PageFetcher
+from ttl_cache import TTLCache
+
+
+class PageServer:
+    """Serves one versioned HTML page, answering 304 to a matching ETag."""
+
+    def __init__(self, cache_control: str = "max-age=300"):
+        self.version = 1
+        self.cache_control = cache_control
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                etag = f'"v{server.version}"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                body = (f"<html><body><p>version {server.version}</p>" + "x" * 100_000).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Cache-Control", server.cache_control)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/"
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def stop_after_first_chunk(text: str) -> bool:
+    return True
+
+
+class PageFetcherPartialTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = TTLCache(os.path.join(self.tmp.name, "pages.sqlite3"), namespace="pages")
+        self.fetcher = PageFetcher(cache=self.cache)
+
+    def tearDown(self):
+        self.server.stop()
+        self.tmp.cleanup()
+
+    def partial(self):
+        return self.fetcher.fetch(
+            self.server.url, consume=stop_after_first_chunk, text_limit=100
+        )
+
+    def stored(self, key):
+        return json.loads(self.cache.get(key))
+
+    def test_full_page_serves_partial_callers_and_partial_does_not_serve_full(self):
+        self.server = PageServer()
+        self.assertTrue(self.partial().truncated)
+        self.assertEqual(self.server.requests, 1)
+
+        # The partial page can't answer a whole-page call...
+        self.assertFalse(self.fetcher.fetch(self.server.url).truncated)
+        self.assertEqual(self.server.requests, 2)
+
+        # ...but afterwards both kinds of caller are served from cache
+        self.assertTrue(self.partial().from_cache)
+        self.assertTrue(self.fetcher.fetch(self.server.url).from_cache)
+        self.assertEqual(self.server.requests, 2)
+
+    def test_partial_download_never_replaces_the_full_page(self):
+        self.server = PageServer(cache_control="no-cache")
+        self.fetcher.fetch(self.server.url)
+        self.server.version = 2
+
+        # Revalidation finds a new version, which the analyzer reads partially
+        page = self.partial()
+        self.assertTrue(page.truncated)
+        self.assertIn("version 2", page.text)
+
+        full = self.stored(self.server.url)
+        self.assertFalse(full["stopped"])
+        self.assertEqual(full["etag"], '"v1"')
+        self.assertTrue(self.stored(self.server.url + PARTIAL_KEY_SUFFIX)["stopped"])
+
+    def test_revalidated_partial_page_stays_under_its_own_key(self):
+        self.server = PageServer(cache_control="no-cache")
+        self.partial()
+        page = self.partial()
+        self.assertTrue(page.revalidated)
+        self.assertEqual(self.server.requests, 2)
+        self.assertIsNone(self.cache.get(self.server.url))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import ttl_cache
+from benchmarks.stub_server import StubServer
+
+
+class LazySubmission:
+    """A PRAW-like submission that records attribute reads it can't answer."""
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+        self.__dict__["lazy_reads"] = []
+
+    def __getattr__(self, name):
+        self.__dict__["lazy_reads"].append(name)
+        raise AttributeError(name)
+
+
+class Named:
+    def __init__(self, name):
+        self.name = name
+
+    def __str__(self):
+        return self.name
+
+
+class PostDetailsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.stub = StubServer(corpus_size=500).start()
+        self.addCleanup(self.stub.stop)
+        patches = [
+            mock.patch.object(ttl_cache, "CACHE_DIR", self.tmp.name),
+            mock.patch.dict(
+                os.environ,
+                {"REDDIT_BASE_URL": self.stub.url, "HTTP_REPLAY_MODE": "off"},
+            ),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        from reddit_scraper import RedditScraper
+
+        self.scraper = RedditScraper()
+        raws = self.stub._corpus("python").slice(0, 250)
+        self.urls = [f"https://www.reddit.com{raw['permalink']}" for raw in raws]
+
+    def info_requests(self) -> int:
+        return self.stub.stats()["by_path"].get("/api/info.json", 0)
+
+    def test_details_cost_one_request_per_hundred_posts(self):
+        details = self.scraper.get_posts_details(self.urls + self.urls[:10] + ["not a post"])
+        self.assertEqual(len(details), 250)
+        self.assertEqual(self.info_requests(), 3)
+        self.assertEqual(self.scraper.post_store.count(), 250)
+
+        # Resolved posts are cached; only new ones are looked up
+        self.stub.reset_stats()
+        self.scraper.get_posts_details(self.urls[:50])
+        self.assertEqual(self.info_requests(), 0)
+        self.assertEqual(
+            self.scraper.get_post_details(self.urls[0]).url, details[self.urls[0]].url
+        )
+        self.assertEqual(self.info_requests(), 0)
+
+    def test_refresh_bypasses_the_cache_in_batches(self):
+        names = [f"t3_{url.split('/comments/')[1].split('/')[0]}" for url in self.urls]
+        self.scraper.get_posts_details(self.urls)
+        self.stub.reset_stats()
+        found = self.scraper._fetch_info(names, refresh=True)
+        self.assertEqual(len(found), 250)
+        self.assertEqual(self.info_requests(), 3)
+
+    def test_praw_submissions_are_read_without_lazy_fetches(self):
+        submission = LazySubmission(
+            id="abc",
+            name="t3_abc",
+            title="python tips",
+            selftext="",
+            permalink="/r/python/comments/abc/tips/",
+            score=12,
+            num_comments=3,
+            created_utc=1700000000.0,
+            subreddit=Named("python"),
+            author=Named("someone"),
+        )
+        data = self.scraper._submission_data(submission)
+        self.assertEqual(data["subreddit"], "python")
+        self.assertEqual(data["author"], "someone")
+        self.assertEqual(submission.lazy_reads, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+import ttl_cache
+from post_store import PostStore
+from reddit_post import Post
+
+NOW = time.time()
+DAY = 86400
+
+
+def make_post(
+    fullname: str,
+    title: str,
+    subreddit: str = "python",
+    score: int = 10,
+    comments: int = 0,
+    age_days: int = 1,
+    selftext: str = "",
+) -> Post:
+    return Post(
+        title=title,
+        url=f"https://reddit.com/r/{subreddit}/comments/{fullname[3:]}/",
+        subreddit=subreddit,
+        score=score,
+        comments=comments,
+        engagement_score=score + comments * 2,
+        created_utc=NOW - age_days * DAY,
+        age_days=age_days,
+        is_recent=age_days <= 14,
+        selftext=selftext,
+        fullname=fullname,
+    )
+
+
+POSTS = [
+    make_post("t3_a", "Best python web framework?", score=50, comments=10),
+    make_post("t3_b", "Learning rust after python", subreddit="rust", score=30),
+    make_post("t3_c", "Weekly thread", selftext="Share your python projects", score=5),
+    make_post("t3_d", "Old django migration question", score=80, age_days=60),
+]
+
+
+class NoFts5Connection:
+    """Stands in for a SQLite build compiled without FTS5."""
+
+    def executescript(self, script):
+        raise sqlite3.OperationalError("no such module: fts5")
+
+
+class NoFts5PostStore(PostStore):
+    def _create_fts(self, conn):
+        super()._create_fts(NoFts5Connection())
+
+
+class PostStoreTest(unittest.TestCase):
+    store_class = PostStore
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = self.store_class(os.path.join(self.tmp.name, "posts.sqlite3"))
+        self.assertEqual(self.store.add(POSTS), len(POSTS))
+
+    def names(self, posts):
+        return [post.fullname for post in posts]
+
+    def test_text_query_matches_title_and_selftext(self):
+        self.assertEqual(self.names(self.store.query("python")), ["t3_a", "t3_b", "t3_c"])
+        # All words must match unless match_any is set
+        self.assertEqual(self.names(self.store.query("python rust")), ["t3_b"])
+        self.assertEqual(
+            self.names(self.store.query("django rust", match_any=True)), ["t3_d", "t3_b"]
+        )
+
+    def test_query_syntax_in_user_input_is_literal(self):
+        self.assertEqual(self.store.query('python" OR "rust*'), [])
+
+    def test_filters(self):
+        self.assertEqual(self.names(self.store.query(subreddit="RUST")), ["t3_b"])
+        self.assertEqual(
+            self.names(self.store.query(since=datetime.now() - timedelta(days=30))),
+            ["t3_a", "t3_b", "t3_c"],
+        )
+        self.assertEqual(
+            self.names(self.store.query(until=datetime.now() - timedelta(days=30))),
+            ["t3_d"],
+        )
+        self.assertEqual(self.names(self.store.query(min_score=30)), ["t3_d", "t3_a", "t3_b"])
+        self.assertEqual(self.names(self.store.query(min_comments=1)), ["t3_a"])
+        self.assertEqual(self.names(self.store.query(min_engagement=60)), ["t3_d", "t3_a"])
+        self.assertEqual(self.names(self.store.query(limit=2)), ["t3_d", "t3_a"])
+
+    def test_upsert_refreshes_row_and_text_index(self):
+        updated = make_post("t3_c", "Weekly thread", selftext="Share your golang projects", score=99)
+        self.assertEqual(self.store.add([updated, make_post("t3_", "no id")]), 1)
+        self.assertEqual(self.store.count(), len(POSTS))
+        self.assertEqual(self.names(self.store.query("golang")), ["t3_c"])
+        self.assertEqual(self.names(self.store.query("python")), ["t3_a", "t3_b"])
+        self.assertEqual(self.store.query("golang")[0].score, 99)
+
+    def test_ages_are_recomputed_on_read(self):
+        post = self.store.query("django")[0]
+        self.assertGreaterEqual(post.age_days, 59)
+        self.assertFalse(post.is_recent)
+
+
+class PostStoreWithoutFts5Test(PostStoreTest):
+    store_class = NoFts5PostStore
+
+    def test_like_fallback_is_used(self):
+        self.assertFalse(self.store.fts_enabled)
+        self.assertEqual(self.names(self.store.query("PYTHON web")), ["t3_a"])
+
+
+class OfflineSearchTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        patcher = mock.patch.object(ttl_cache, "CACHE_DIR", self.tmp.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        from reddit_scraper import RedditScraper
+
+        self.scraper = RedditScraper()
+        self.scraper.post_store.add(POSTS)
+
+    def test_search_local_applies_relevance_rules(self):
+        posts = self.scraper.search_local("python web framework")
+        self.assertEqual([post.fullname for post in posts], ["t3_a"])
+        self.assertEqual(
+            [post.fullname for post in self.scraper.search_local(subreddit="rust")],
+            ["t3_b"],
+        )
+
+    def test_offline_top_posts_never_touch_reddit(self):
+        with mock.patch.object(
+            self.scraper, "_get", side_effect=AssertionError("network used")
+        ):
+            posts = self.scraper.get_top_posts("python", top_n=2, offline=True)
+        self.assertEqual([post.fullname for post in posts], ["t3_a", "t3_b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
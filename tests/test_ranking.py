@@ -0,0 +1,80 @@
+import random
+import unittest
+
+import ranking
+from ranking import NUMPY_MIN_POOL, RankingWeights, score_post, top_k
+from reddit_post import Post
+
+
+def make_posts(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    posts = []
+    for i in range(count):
+        # Small value ranges so plenty of scores tie
+        engagement = rng.randint(0, 20)
+        posts.append(
+            Post(
+                title=f"post {i}",
+                url=f"https://reddit.com/{i}",
+                subreddit="test",
+                score=engagement,
+                comments=0,
+                engagement_score=engagement,
+                created_utc=0.0,
+                age_days=rng.randint(0, 30),
+                is_recent=rng.random() < 0.5,
+                search_traffic=rng.choice([0, 0, 5, 10]),
+                fullname=f"t3_{i}",
+                velocity=float(rng.randint(0, 4)),
+            )
+        )
+    return posts
+
+
+def stable_order(posts, k, weights):
+    return sorted(posts, key=lambda post: score_post(post, weights), reverse=True)[:k]
+
+
+class TopKTest(unittest.TestCase):
+    WEIGHTS = [RankingWeights(), RankingWeights(velocity=2.5)]
+
+    def assert_matches_stable_sort(self, posts, k):
+        for weights in self.WEIGHTS:
+            with self.subTest(pool=len(posts), k=k, weights=weights):
+                expected = [p.fullname for p in stable_order(posts, k, weights)]
+                actual = [p.fullname for p in top_k(posts, k, weights)]
+                self.assertEqual(actual, expected)
+
+    def test_small_pools_match_stable_sort(self):
+        posts = make_posts(NUMPY_MIN_POOL - 1, seed=1)
+        for k in (1, 5, 50, len(posts), len(posts) + 10):
+            self.assert_matches_stable_sort(posts, k)
+
+    @unittest.skipIf(ranking.np is None, "NumPy not installed")
+    def test_large_pools_match_stable_sort(self):
+        posts = make_posts(NUMPY_MIN_POOL * 4, seed=2)
+        for k in (1, 5, 50, len(posts), len(posts) + 10):
+            self.assert_matches_stable_sort(posts, k)
+
+    @unittest.skipIf(ranking.np is None, "NumPy not installed")
+    def test_ties_keep_input_order(self):
+        posts = make_posts(NUMPY_MIN_POOL * 2, seed=3)
+        for post in posts:
+            post.engagement_score, post.search_traffic, post.is_recent = 1, 0, False
+        self.assertEqual(top_k(posts, 10), posts[:10])
+
+    def test_velocity_weight_reorders_posts(self):
+        slow, fast = make_posts(2, seed=4)
+        slow.engagement_score, slow.search_traffic, slow.velocity = 10, 0, 0.0
+        fast.engagement_score, fast.search_traffic, fast.velocity = 5, 0, 10.0
+        slow.is_recent = fast.is_recent = False
+        self.assertEqual(top_k([slow, fast], 1), [slow])
+        self.assertEqual(top_k([slow, fast], 1, RankingWeights(velocity=1.0)), [fast])
+
+    def test_empty_inputs(self):
+        self.assertEqual(top_k([], 5), [])
+        self.assertEqual(top_k(make_posts(3), 0), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import time
+import unittest
+
+from rate_limiter import RateLimitScheduler, RateLimitTimeout, time_budget
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class RateLimitDeadlineTest(unittest.TestCase):
+    def test_blocked_window_past_max_wait_raises_without_sleeping(self):
+        scheduler = RateLimitScheduler(rate=1.0, burst=1, max_wait=1.0)
+        scheduler.update_from_headers(
+            {"X-Ratelimit-Remaining": "0", "X-Ratelimit-Reset": "120"}
+        )
+        start = time.monotonic()
+        with self.assertRaises(RateLimitTimeout):
+            scheduler.call(lambda: FakeResponse(200))
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(scheduler.requests_sent, 0)
+
+    def test_throttled_response_is_returned_when_backoff_exceeds_budget(self):
+        scheduler = RateLimitScheduler(rate=100.0, burst=5, max_retries=4)
+        responses = []
+
+        def send():
+            responses.append(FakeResponse(429, {"Retry-After": "30"}))
+            return responses[-1]
+
+        start = time.monotonic()
+        with time_budget(1.0):
+            resp = scheduler.call(send)
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(resp.status_code, 429)
+        self.assertEqual(len(responses), 1)
+        self.assertEqual(scheduler.timeouts, 1)
+
+    def test_nested_budget_keeps_the_earlier_deadline(self):
+        scheduler = RateLimitScheduler(rate=0.01, burst=1)
+        with time_budget(0.1), time_budget(60):
+            scheduler.call(lambda: FakeResponse(200))
+            with self.assertRaises(RateLimitTimeout):
+                scheduler.call(lambda: FakeResponse(200))
+
+    def test_calls_without_deadline_still_retry(self):
+        scheduler = RateLimitScheduler(rate=100.0, burst=5, backoff_base=0.001)
+        statuses = iter([503, 200])
+        resp = scheduler.call(lambda: FakeResponse(next(statuses)))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(scheduler.retries, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+import json
+import os
+import tempfile
+import unittest
+from urllib.parse import urlsplit
+
+from http_replay import ReplayAdapter, fixture_key
+from page_fetcher import PageFetcher
+from site_crawler import SiteCrawler, merge_texts, page_kind
+from ttl_cache import TTLCache
+
+SITE = "https://example.com"
+
+HOME = """<html><head><title>Acme</title></head><body>
+<nav><a href="/pricing">Pricing</a><a href="/about">About us</a>
+<a href="/blog/launch">Our launch</a><a href="/logo.png">Logo</a>
+<a href="https://other.example.org/features">Partner</a></nav>
+<main><p>Acme syncs your notes across every device.</p></main>
+</body></html>"""
+
+PRICING = """<html><body><main><p>Acme Pro costs $8 per month.</p></main></body></html>"""
+FEATURES = """<html><body><main><p>Offline mode and end-to-end encryption.</p></main></body></html>"""
+
+
+class PageKindTest(unittest.TestCase):
+    CASES = [
+        # (url, anchor, expected kind)
+        ("/pricing", "", "pricing"),
+        ("/pricing-plans", "", "pricing"),
+        ("/en/pricing", "", "pricing"),
+        ("/de-de/features", "", "features"),
+        ("/how-it-works", "", "features"),
+        ("/company", "", "about"),
+        ("/p/123", "Plans", "pricing"),
+        ("/p/123", "Meet the team", "about"),
+        ("/", "", None),
+        ("/en", "", None),
+        ("/blog/pricing", "", None),
+        ("/docs", "Features", None),
+        ("/a/b/pricing", "", None),
+        # Long slugs and anchors are prose, only matched as a whole
+        ("/why-we-changed-our-pricing", "", None),
+        ("/p/123", "Read how we rethought our pricing", None),
+    ]
+
+    def test_cases(self):
+        for path, anchor, expected in self.CASES:
+            with self.subTest(path=path, anchor=anchor):
+                self.assertEqual(page_kind(SITE + path, anchor), expected)
+
+
+class MergeTextsTest(unittest.TestCase):
+    def test_sentences_seen_on_earlier_pages_are_dropped(self):
+        merged = merge_texts(
+            [
+                ("home", "Acme syncs notes. Sign up today!"),
+                ("pricing", "Acme Pro is $8. sign up   today!"),
+                ("about", "Sign up today!"),
+            ],
+            budget=1000,
+        )
+        self.assertEqual(merged, "[home] Acme syncs notes. Sign up today!\n[pricing] Acme Pro is $8.")
+
+    def test_short_section_donates_its_unused_budget(self):
+        sections = [("home", "Short."), ("pricing", "p" * 1000), ("features", "f" * 1000)]
+        budget = 300
+        merged = merge_texts(sections, budget)
+        lines = merged.split("\n")
+        self.assertEqual(lines[0], "[home] Short.")
+        available = budget - sum(len(f"[{label}] ") + 1 for label, _ in sections)
+        # An equal three-way split would give each long section a third; the
+        # short one's leftover is shared between them instead
+        pricing = len(lines[1]) - len("[pricing] ")
+        features = len(lines[2]) - len("[features] ")
+        self.assertGreater(pricing, available // 3)
+        self.assertLessEqual(abs(pricing - features), 1)
+        self.assertEqual(len("Short.") + pricing + features, available)
+
+    def test_output_stays_within_budget(self):
+        sections = [("home", "Acme syncs notes.")] + [
+            (kind, f"{kind} " * 200) for kind in ("pricing", "features", "about")
+        ]
+        for budget in (40, 100, 333, 1000, 5000):
+            with self.subTest(budget=budget):
+                self.assertLessEqual(len(merge_texts(sections, budget)), budget)
+
+    def test_empty_sections_are_left_out(self):
+        self.assertEqual(merge_texts([("home", ""), ("pricing", "$5.")], 100), "[pricing] $5.")
+        self.assertEqual(merge_texts([], 100), "")
+
+
+class SiteCrawlerTest(unittest.TestCase):
+    """Crawls a site replayed from fixtures, without network access."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.fixtures = os.path.join(self.tmp.name, "fixtures")
+        os.makedirs(self.fixtures)
+        cache = TTLCache(os.path.join(self.tmp.name, "pages.sqlite3"), namespace="pages")
+        self.fetcher = PageFetcher(cache=cache)
+        self.adapter = ReplayAdapter(self.fixtures)
+        self.fetcher.session.mount("https://", self.adapter)
+        self.crawler = SiteCrawler(fetcher=self.fetcher, max_pages=4)
+
+    def serve(self, path: str, body: str = "", status: int = 200, content_type: str = "text/html"):
+        url = SITE + path
+        fixture = {
+            "method": "GET",
+            "path": urlsplit(url).path,
+            "query": "",
+            "status": status,
+            "headers": {"Content-Type": f"{content_type}; charset=utf-8"},
+            "body": body,
+        }
+        name = fixture_key("GET", url) + ".json"
+        with open(os.path.join(self.fixtures, name), "w", encoding="utf-8") as f:
+            json.dump(fixture, f)
+
+    def serve_site(self, robots: str):
+        self.serve("/robots.txt", robots, content_type="text/plain")
+        self.serve("/", HOME)
+        self.serve("/pricing", PRICING)
+        self.serve("/features", FEATURES)
+        self.serve("/about", "<html><body><p>Founded in 2020.</p></body></html>")
+
+    def test_robots_sitemap_index_is_followed(self):
+        self.serve_site(f"User-agent: *\nDisallow: /about\nSitemap: {SITE}/sitemap-index.xml\n")
+        self.serve(
+            "/sitemap-index.xml",
+            f"<sitemapindex><sitemap><loc>{SITE}/sitemap-pages.xml</loc></sitemap></sitemapindex>",
+            content_type="application/xml",
+        )
+        self.serve(
+            "/sitemap-pages.xml",
+            f"<urlset><url><loc>{SITE}/features</loc></url>"
+            f"<url><loc>{SITE}/blog/launch</loc></url></urlset>",
+            content_type="application/xml",
+        )
+
+        result = self.crawler.crawl(SITE + "/")
+
+        self.assertEqual(
+            [(p.url, p.kind) for p in result.pages],
+            [(SITE + "/", "home"), (SITE + "/pricing", "pricing"), (SITE + "/features", "features")],
+        )
+        self.assertEqual(result.disallowed, [SITE + "/about"])
+        self.assertEqual(result.errors, {})
+        self.assertIn("[pricing] Acme Pro costs $8 per month.", result.text)
+        self.assertIn("[features] Offline mode", result.text)
+
+    def test_default_sitemap_is_used_without_a_sitemap_line(self):
+        self.serve_site("User-agent: *\nDisallow:\n")
+        self.serve(
+            "/sitemap.xml",
+            f"<urlset><url><loc>{SITE}/features</loc></url></urlset>",
+            content_type="text/xml",
+        )
+
+        result = self.crawler.crawl(SITE)
+
+        self.assertEqual(
+            [p.kind for p in result.pages], ["home", "pricing", "features", "about"]
+        )
+        self.assertEqual(result.disallowed, [])
+
+    def test_missing_robots_and_sitemap_allow_crawling(self):
+        self.serve_site("")
+        self.serve("/robots.txt", "Not found", status=404)
+        # No sitemap fixture at all: the replayed request fails and is skipped
+
+        result = self.crawler.crawl(SITE + "/")
+
+        self.assertEqual([p.kind for p in result.pages], ["home", "pricing", "about"])
+
+    def test_forbidden_robots_disallows_everything(self):
+        for status in (401, 403):
+            with self.subTest(status=status):
+                self.serve_site("")
+                self.serve("/robots.txt", "Forbidden", status=status)
+                requests_before = self.adapter.replayed
+
+                result = self.crawler.crawl(SITE + "/")
+
+                self.assertEqual(result.pages, [])
+                self.assertEqual(result.disallowed, [SITE + "/"])
+                # Only robots.txt was requested
+                self.assertEqual(self.adapter.replayed - requests_before, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+import json
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import ttl_cache
+import website_analyzer
+from html_extract import PageInfo, extract
+from structured_data import is_complete, product_info_from_page
+
+
+def page_with(*blocks, og=None, meta=None) -> PageInfo:
+    return PageInfo(
+        json_ld=[json.dumps(block) for block in blocks], og=og or {}, meta=meta or {}
+    )
+
+
+COMPLETE = {
+    "@type": "SoftwareApplication",
+    "name": "Acme",
+    "description": "Widgets for teams",
+    "applicationCategory": "BusinessApplication",
+    "featureList": "Dashboards, Alerts; Exports",
+    "offers": {"@type": "Offer", "price": "29", "priceCurrency": "USD"},
+}
+
+
+class ProductInfoTest(unittest.TestCase):
+    def test_graph_is_flattened(self):
+        html = (
+            '<script type="application/ld+json"><!--'
+            + json.dumps(
+                {
+                    "@context": "https://schema.org",
+                    "@graph": [
+                        {"@type": "Organization", "name": "Acme Inc"},
+                        {"@type": "WebPage", "mainEntity": COMPLETE},
+                    ],
+                }
+            )
+            + "--></script>"
+        )
+        data = product_info_from_page(extract(html))
+        self.assertEqual(data["product_name"], "Acme")
+        self.assertEqual(data["product_features"], ["Dashboards", "Alerts", "Exports"])
+        self.assertEqual(data["product_type"], "Software (Business)")
+        self.assertEqual(data["pricing"], "$29")
+        self.assertTrue(is_complete(data))
+
+    def test_aggregate_offer_ranges(self):
+        cases = [
+            ({"lowPrice": "9", "highPrice": "49.5", "priceCurrency": "EUR"}, "€9 - €49.50"),
+            ({"lowPrice": "9", "priceCurrency": "USD"}, "From $9"),
+            ({"lowPrice": "0", "highPrice": "0", "priceCurrency": "USD"}, "Free"),
+            ({"lowPrice": "1,200", "highPrice": "1200", "priceCurrency": "CAD"}, "From 1,200 CAD"),
+        ]
+        for offer, pricing in cases:
+            with self.subTest(offer=offer):
+                product = {"@type": "Product", "offers": dict(offer, **{"@type": "AggregateOffer"})}
+                data = product_info_from_page(page_with(product))
+                self.assertEqual(data["pricing"], pricing)
+
+    def test_price_specification_billing_units(self):
+        offers = [
+            {
+                "name": "Pro",
+                "priceSpecification": {
+                    "price": 29,
+                    "priceCurrency": "USD",
+                    "unitText": "per month",
+                },
+            },
+            {
+                "name": "Team",
+                "price": "290",
+                "priceCurrency": "USD",
+                "priceSpecification": [
+                    {"referenceQuantity": {"unitCode": "ANN"}, "price": 290}
+                ],
+            },
+            {"name": "Starter", "price": "0", "priceCurrency": "USD"},
+            # The same plan listed twice
+            {
+                "name": "Pro",
+                "priceSpecification": {
+                    "price": 29,
+                    "priceCurrency": "USD",
+                    "billingDuration": "P1M",
+                },
+            },
+        ]
+        data = product_info_from_page(page_with({"@type": "Service", "offers": offers}))
+        self.assertEqual(data["pricing"], "Pro: $29/month, Team: $290/year, Starter: Free")
+        self.assertEqual(data["product_type"], "Service")
+
+    def test_opengraph_and_meta_fallbacks(self):
+        page = page_with(
+            {"@type": "Organization", "name": "Not a product"},
+            og={
+                "og:site_name": "Acme",
+                "og:description": "OG description",
+                "og:type": "product",
+                "product:price:amount": "19.99",
+                "product:price:currency": "GBP",
+            },
+            meta={"description": "Meta description"},
+        )
+        self.assertEqual(
+            product_info_from_page(page),
+            {
+                "product_name": "Acme",
+                "product_description": "Meta description",
+                "pricing": "£19.99",
+                "product_type": "Product",
+            },
+        )
+        # Structured data wins over OpenGraph
+        page.json_ld.append(json.dumps({"@type": "Product", "name": "Widget"}))
+        self.assertEqual(product_info_from_page(page)["product_name"], "Widget")
+
+    def test_invalid_blocks_are_skipped(self):
+        page = PageInfo(json_ld=["{not json", json.dumps([COMPLETE])])
+        self.assertEqual(product_info_from_page(page)["product_name"], "Acme")
+        self.assertEqual(product_info_from_page(PageInfo()), {})
+
+
+def llm_response(data):
+    message = SimpleNamespace(content=json.dumps(data))
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class WebsiteAnalyzerCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        patches = [
+            mock.patch.object(ttl_cache, "CACHE_DIR", self.tmp.name),
+            mock.patch.dict(
+                os.environ, {"OPENAI_API_KEY": "test-key", "ANALYZER_STRUCTURED_SKIP_LLM": "1"}
+            ),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.analyzer = website_analyzer.WebsiteAnalyzer()
+        self.page = PageInfo(text="Acme builds widgets for teams.")
+        self.analyzer.fetch_page = lambda url, text_limit=10000: self.page
+        self.llm = mock.Mock(return_value=llm_response({"product_name": "Acme"}))
+        self.analyzer.client = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=self.llm))
+        )
+
+    def test_complete_structured_data_skips_the_llm(self):
+        self.page.json_ld = [json.dumps(COMPLETE)]
+        data = self.analyzer.analyze_website("https://acme.test")
+        self.llm.assert_not_called()
+        self.assertEqual(data["analysis_source"], "structured_data")
+        self.assertEqual(data["pricing"], "$29")
+
+    def test_incomplete_structured_data_asks_the_llm_once(self):
+        self.page.json_ld = [json.dumps({"@type": "Product", "name": "Acme"})]
+        for _ in range(2):
+            data = self.analyzer.analyze_website("https://acme.test")
+        self.assertEqual(self.llm.call_count, 1)
+        self.assertEqual(data["analysis_source"], "structured_data+llm")
+
+    def test_prompt_version_or_model_change_invalidates_the_cache(self):
+        self.analyzer.analyze_website("https://acme.test")
+        with mock.patch.object(website_analyzer, "PROMPT_VERSION", "999"):
+            self.analyzer.analyze_website("https://acme.test")
+        with mock.patch.object(website_analyzer, "MODEL", "other-model"):
+            self.analyzer.analyze_website("https://acme.test")
+        self.assertEqual(self.llm.call_count, 3)
+        self.assertEqual(self.llm.call_args.kwargs["model"], "other-model")
+
+    def test_cache_key_tracks_content_not_formatting(self):
+        key = website_analyzer.WebsiteAnalyzer._cache_key
+        base = key("https://acme.test", "Acme  builds\nwidgets", {})
+        prefix = f"v{website_analyzer.PROMPT_VERSION}:{website_analyzer.MODEL}:https://acme.test:"
+        self.assertTrue(base.startswith(prefix))
+        self.assertEqual(base, key("https://acme.test", "acme builds widgets", {}))
+        self.assertNotEqual(base, key("https://acme.test", "Acme builds gadgets", {}))
+        known = {"pricing": "$5"}
+        self.assertNotEqual(base, key("https://acme.test", "Acme builds widgets", known))
+        self.assertNotEqual(base, key("https://other.test", "Acme builds widgets", {}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from reddit_post import Post
+from subreddit_metadata import SubredditMetadataCache, aggregate_by_subreddit
+from ttl_cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+def make_post(subreddit: str, score: int) -> Post:
+    return Post(
+        title="title",
+        url="https://reddit.com/",
+        subreddit=subreddit,
+        score=score,
+        comments=0,
+        engagement_score=score,
+        created_utc=0.0,
+        age_days=0,
+        is_recent=True,
+    )
+
+
+class SubredditMetadataCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.clock = FakeClock()
+        for target in ("ttl_cache.time", "subreddit_metadata.time"):
+            patcher = mock.patch(target, self.clock)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.subscribers = {"python": 1000, "rust": 500, "golang": 200}
+        self.fetches = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.metadata = SubredditMetadataCache(
+            self.fetch,
+            TTLCache(os.path.join(self.tmp.name, "subs.sqlite3"), namespace="subs", ttl=3600),
+            stale_ttl=86400,
+        )
+
+    def fetch(self, names):
+        self.fetches.append(sorted(names))
+        self.gate.wait(5)
+        return {
+            name: {"display_name": name, "subscribers": self.subscribers[name]}
+            for name in names
+            if name in self.subscribers
+        }
+
+    def wait_for_refresh(self):
+        deadline = time.monotonic() + 5
+        while self.metadata._refreshing and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_missing_subreddits_are_fetched_in_one_batch(self):
+        info = self.metadata.get_many(["Python", "rust", "python", "unknown", ""])
+        self.assertEqual(sorted(info), ["python", "rust"])
+        self.assertEqual(info["python"].subscribers, 1000)
+        self.assertEqual(self.fetches, [["python", "rust", "unknown"]])
+
+        self.metadata.get_many(["python", "rust"])
+        self.assertEqual(len(self.fetches), 1)
+
+    def test_stale_value_is_served_while_a_refresh_runs(self):
+        self.metadata.get_many(["python"])
+        self.clock.now += 3600 + 1
+        self.subscribers["python"] = 2000
+        self.gate.clear()
+
+        info = self.metadata.get_many(["python"])
+        self.assertEqual(info["python"].subscribers, 1000)
+        # A second read while the refresh is blocked neither waits nor refetches
+        info = self.metadata.get_many(["python"])
+        self.assertEqual(info["python"].subscribers, 1000)
+        self.assertEqual(len(self.fetches), 2)
+        self.assertEqual(self.metadata.stale_served, 2)
+
+        self.gate.set()
+        self.wait_for_refresh()
+        self.assertEqual(self.metadata.refreshes, 1)
+        self.assertEqual(self.metadata.get_many(["python"])["python"].subscribers, 2000)
+        self.assertEqual(len(self.fetches), 2)
+
+    def test_entries_past_the_stale_window_are_refetched(self):
+        self.metadata.get_many(["python"])
+        self.clock.now += 3600 + 86400
+        self.subscribers["python"] = 3000
+        self.assertEqual(self.metadata.get_many(["python"])["python"].subscribers, 3000)
+        self.assertEqual(len(self.fetches), 2)
+        self.assertEqual(self.metadata.stale_served, 0)
+
+    def test_aggregation_needs_one_lookup_for_the_pool(self):
+        pool = [("python", 10), ("Python", 30), ("rust", 5), ("golang", 1), ("nope", 2)]
+        posts = [make_post(subreddit, score) for subreddit, score in pool]
+        metadata = self.metadata.get_many(post.subreddit for post in posts)
+        groups = aggregate_by_subreddit(posts, metadata)
+        self.assertEqual(len(self.fetches), 1)
+        self.assertEqual(
+            [(g["subreddit"], g["posts"], g["total_engagement"]) for g in groups],
+            [("python", 2, 40), ("rust", 1, 5), ("nope", 1, 2), ("golang", 1, 1)],
+        )
+        self.assertEqual(groups[0]["engagement_per_1k_subscribers"], 40.0)
+        self.assertIsNone(groups[2]["subscribers"])
+
+
+if __name__ == "__main__":
+    unittest.main()
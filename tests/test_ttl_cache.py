@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from ttl_cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+class TTLCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.clock = FakeClock()
+        patcher = mock.patch("ttl_cache.time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_cache(self, **kwargs) -> TTLCache:
+        return TTLCache(os.path.join(self.tmp.name, "cache.sqlite3"), **kwargs)
+
+    def accessed_at(self, cache: TTLCache, key: str) -> float:
+        return cache._connection().execute(
+            "SELECT accessed_at FROM cache_entries WHERE namespace = ? AND key = ?",
+            (cache.namespace, key),
+        ).fetchone()[0]
+
+    def test_entries_expire_after_ttl(self):
+        cache = self.make_cache(ttl=60)
+        cache.set("a", "1")
+        self.clock.now += 59
+        self.assertEqual(cache.get("a"), "1")
+        self.clock.now += 2
+        self.assertIsNone(cache.get("a"))
+        # Expired entries are still available to revalidating callers
+        self.assertEqual(cache.get_entry("a")[0], "1")
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = self.make_cache(ttl=3600, max_entries=3, touch_interval=0)
+        for key in "abc":
+            cache.set(key, key)
+            self.clock.now += 1
+        # Reading "a" makes "b" the least recently used
+        self.assertEqual(cache.get("a"), "a")
+        self.clock.now += 1
+        cache.set("d", "d")
+        self.assertIsNone(cache.get_entry("b"))
+        for key in "acd":
+            self.assertEqual(cache.get(key), key)
+        self.assertEqual(cache.stats()["entries"], 3)
+
+    def test_reads_touch_entries_at_most_once_per_interval(self):
+        cache = self.make_cache(ttl=3600, touch_interval=60)
+        cache.set("a", "1")
+        stored = self.accessed_at(cache, "a")
+        self.clock.now += 30
+        cache.get("a")
+        self.assertEqual(self.accessed_at(cache, "a"), stored)
+        self.clock.now += 30
+        cache.get("a")
+        self.assertEqual(self.accessed_at(cache, "a"), self.clock.now)
+
+    def test_namespaces_are_evicted_independently(self):
+        path = os.path.join(self.tmp.name, "shared.sqlite3")
+        first = TTLCache(path, namespace="first", max_entries=1)
+        second = TTLCache(path, namespace="second", max_entries=1)
+        first.set("a", "1")
+        second.set("a", "2")
+        second.set("b", "3")
+        self.assertEqual(first.get("a"), "1")
+        self.assertIsNone(second.get_entry("a"))
+
+    def test_non_positive_ttl_disables_the_cache(self):
+        cache = self.make_cache(ttl=0)
+        cache.set("a", "1")
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["entries"], 0)
+        self.assertEqual(cache.misses, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
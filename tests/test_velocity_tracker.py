@@ -0,0 +1,144 @@
+import fcntl
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from velocity_tracker import VelocityTracker
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+class VelocityTrackerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.clock = FakeClock()
+        patcher = mock.patch("velocity_tracker.time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.engagement = {}  # fullname -> (score, comments)
+        self.fetches = []
+        self.tracker = VelocityTracker(
+            self.fetch, os.path.join(self.tmp.name, "velocity.sqlite3"), max_watched=3
+        )
+
+    def fetch(self, fullnames):
+        self.fetches.append(list(fullnames))
+        return {
+            name: {"score": score, "num_comments": comments}
+            for name, (score, comments) in self.engagement.items()
+            if name in fullnames
+        }
+
+    def poll_after(self, seconds: float, **engagement) -> int:
+        self.clock.now += seconds
+        self.engagement.update(engagement)
+        return self.tracker.poll()
+
+    def test_velocity_from_two_samples(self):
+        self.tracker.watch(["t3_a", "t3_b"])
+        self.assertEqual(self.poll_after(0, t3_a=(10, 2), t3_b=(5, 0)), 2)
+        # One poll only sets the baseline
+        self.assertEqual(self.tracker.velocities(["t3_a"]), {})
+
+        self.poll_after(3600, t3_a=(40, 7), t3_b=(5, 0))
+        rates = self.tracker.velocities(["t3_a", "t3_b", "t3_unknown"])
+        self.assertEqual(set(rates), {"t3_a", "t3_b"})
+        # 30 points + 5 comments (weighted x2) in one hour
+        self.assertEqual(rates["t3_a"]["velocity"], 40.0)
+        self.assertEqual(rates["t3_a"]["score_per_hour"], 30.0)
+        self.assertEqual(rates["t3_a"]["comments_per_hour"], 5.0)
+        self.assertEqual(rates["t3_a"]["acceleration"], 0.0)
+        self.assertEqual(rates["t3_b"]["velocity"], 0.0)
+
+        # A slower second hour decelerates
+        self.poll_after(3600, t3_a=(50, 7))
+        rate = self.tracker.velocities(["t3_a"])["t3_a"]
+        self.assertEqual(rate["velocity"], 10.0)
+        self.assertEqual(rate["acceleration"], -30.0)
+
+    def test_each_poll_is_one_bulk_fetch(self):
+        self.tracker.watch(["t3_a", "t3_b", "t3_c", "t3_", ""])
+        self.poll_after(0, t3_a=(1, 0), t3_b=(1, 0), t3_c=(1, 0))
+        self.assertEqual(len(self.fetches), 1)
+        self.assertEqual(sorted(self.fetches[0]), ["t3_a", "t3_b", "t3_c"])
+        self.assertEqual(VelocityTracker(self.fetch, ":memory:").poll(), 0)
+
+    def test_oldest_threads_are_dropped_past_max_watched(self):
+        self.tracker.watch(["t3_a", "t3_b"])
+        self.poll_after(0, t3_a=(1, 0), t3_b=(1, 0))
+        self.poll_after(60, t3_a=(2, 0), t3_b=(2, 0))
+        self.tracker.watch(["t3_c", "t3_d", "t3_b"])
+        self.assertEqual(sorted(self.tracker.watched()), ["t3_b", "t3_c", "t3_d"])
+        self.assertEqual(set(self.tracker.velocities(["t3_a", "t3_b"])), {"t3_b"})
+
+    def test_unwatch_drops_history(self):
+        self.tracker.watch(["t3_a"])
+        self.poll_after(0, t3_a=(1, 0))
+        self.poll_after(60, t3_a=(5, 0))
+        self.tracker.unwatch(["t3_a"])
+        self.assertEqual(self.tracker.watched(), [])
+        self.assertEqual(self.tracker.velocities(["t3_a"]), {})
+
+
+class StartVelocityPollingTest(unittest.TestCase):
+    """Only the process holding the poller lock polls the shared database."""
+
+    def setUp(self):
+        import reddit_scraper
+
+        self.module = reddit_scraper
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "velocity.sqlite3")
+        self.addCleanup(self.reset_module)
+
+    def reset_module(self):
+        if self.module._velocity_poller is not None:
+            self.module._velocity_poller.stop()
+            self.module._velocity_poller = None
+        if self.module._velocity_lock_file is not None:
+            self.module._velocity_lock_file.close()
+            self.module._velocity_lock_file = None
+
+    def scraper(self):
+        return SimpleNamespace(velocity=VelocityTracker(lambda fullnames: {}, self.path))
+
+    def test_second_process_does_not_poll(self):
+        # Another worker holds the lock (flock locks are per open file)
+        with open(self.path + ".lock", "a") as other:
+            fcntl.flock(other, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            scraper = self.scraper()
+            self.assertTrue(self.module.start_velocity_polling(scraper, interval=3600))
+            self.assertIsNone(scraper.velocity._thread)
+
+        # Once it exits, the next start takes over polling
+        scraper = self.scraper()
+        self.assertTrue(self.module.start_velocity_polling(scraper, interval=3600))
+        self.assertTrue(scraper.velocity._thread.is_alive())
+
+    def test_restarting_in_the_polling_process_keeps_the_lock(self):
+        first = self.scraper()
+        self.module.start_velocity_polling(first, interval=3600)
+        second = self.scraper()
+        self.assertTrue(self.module.start_velocity_polling(second, interval=3600))
+        self.assertTrue(second.velocity._thread.is_alive())
+        self.assertTrue(first.velocity._stop.is_set())
+
+    def test_zero_interval_disables_polling(self):
+        scraper = self.scraper()
+        self.assertFalse(self.module.start_velocity_polling(scraper, interval=0))
+        self.assertIsNone(scraper.velocity._thread)
+
+
+if __name__ == "__main__":
+    unittest.main()
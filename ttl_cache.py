@@ -0,0 +1,261 @@
+"""
+Persistent SQLite-backed TTL cache shared by the API clients.
+
+Values are stored as text (callers serialize JSON themselves). Entries expire
+after `ttl` seconds and the least recently used rows are evicted once a
+namespace grows beyond `max_entries`. Reads refresh an entry's LRU timestamp
+at most once per `touch_interval`, so cache hits are not each a write. The
+database lives on disk, so warm entries survive process and gunicorn worker
+restarts.
+"""
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+CACHE_DIR = os.getenv(
+    "REDACCEL_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"),
+)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS cache_entries_lru ON cache_entries (namespace, accessed_at);
+"""
+
+
+def cache_path(filename: str) -> str:
+    """Return the path of a cache database inside the shared cache directory."""
+    return os.path.join(CACHE_DIR, filename)
+
+
+def open_sqlite(
+    path: str,
+    schema: str,
+    setup: Optional[Callable[[sqlite3.Connection], None]] = None,
+) -> Callable[[], sqlite3.Connection]:
+    """
+    Return a getter for a lazily opened SQLite connection.
+
+    The database is opened on first use and again after a fork (connections
+    must not cross processes), in WAL mode with autocommit, and `schema` is
+    applied. One connection is shared by all threads, so callers serialize
+    access with their own lock.
+
+    Args:
+        path: SQLite database file (created, with its directory, if missing;
+              an OSError is raised when the directory cannot be created)
+        schema: SQL script creating the tables (IF NOT EXISTS)
+        setup: Optional extra step run on each newly opened connection
+    """
+    conn: Optional[sqlite3.Connection] = None
+    pid: Optional[int] = None
+
+    def connection() -> sqlite3.Connection:
+        nonlocal conn, pid
+        if conn is None or pid != os.getpid():
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            new = sqlite3.connect(
+                path, timeout=10, check_same_thread=False, isolation_level=None
+            )
+            new.execute("PRAGMA journal_mode=WAL")
+            new.execute("PRAGMA synchronous=NORMAL")
+            new.executescript(schema)
+            if setup is not None:
+                setup(new)
+            conn, pid = new, os.getpid()
+        return conn
+
+    return connection
+
+
+@contextmanager
+def transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """
+    Run a block of writes in one explicit transaction.
+
+    Rolls back when the block raises (e.g. "database is locked"), so the
+    shared connection is never left inside an open transaction.
+    """
+    conn.execute("BEGIN")
+    try:
+        yield conn
+        conn.execute("COMMIT")
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+
+
+class TTLCache:
+    """Key/value cache with expiry, LRU size eviction and hit/miss counters."""
+
+    def __init__(
+        self,
+        path: str,
+        namespace: str = "default",
+        ttl: float = 900,
+        max_entries: int = 2000,
+        touch_interval: float = 60,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            path: SQLite database file (created if missing)
+            namespace: Logical table partition, so several caches can share a file
+            ttl: Seconds an entry stays valid; 0 or less disables the cache
+            max_entries: Entries kept per namespace before LRU eviction
+            touch_interval: Seconds before a read refreshes an entry's LRU
+                            timestamp again
+        """
+        self.path = path
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.touch_interval = touch_interval
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._connection = open_sqlite(path, SCHEMA)
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get_entry(self, key: str) -> Optional[Tuple[str, float]]:
+        """
+        Return (value, stored_at) for a key regardless of age, or None.
+
+        Touches the entry for LRU purposes (at most once per touch_interval)
+        but does not update hit/miss counters.
+        """
+        if not self.enabled:
+            return None
+        try:
+            with self._lock:
+                conn = self._connection()
+                row = conn.execute(
+                    "SELECT value, stored_at, accessed_at FROM cache_entries "
+                    "WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                ).fetchone()
+                if row is None:
+                    return None
+                now = time.time()
+                if now - row[2] >= self.touch_interval:
+                    conn.execute(
+                        "UPDATE cache_entries SET accessed_at = ? "
+                        "WHERE namespace = ? AND key = ?",
+                        (now, self.namespace, key),
+                    )
+            return row[0], row[1]
+        except (sqlite3.Error, OSError) as e:
+            print(f"Cache read failed ({self.namespace}): {e}")
+            return None
+
+    def get(self, key: str, count_miss: bool = True) -> Optional[str]:
+        """
+        Return the cached value if present and not expired.
+
+        With `count_miss=False` a miss is not counted, for callers that look
+        again before acting on it (see AhrefsClient._cached_call).
+        """
+        if not self.enabled:
+            return None
+        entry = self.get_entry(key)
+        if entry is not None and time.time() - entry[1] < self.ttl:
+            self.hits += 1
+            return entry[0]
+        if count_miss:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: str) -> None:
+        """Store a value and evict least recently used entries over the size cap."""
+        if not self.enabled:
+            return
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache_entries "
+                    "(namespace, key, value, stored_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (self.namespace, key, value, now, now),
+                )
+                (count,) = conn.execute(
+                    "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?",
+                    (self.namespace,),
+                ).fetchone()
+                if count > self.max_entries:
+                    conn.execute(
+                        "DELETE FROM cache_entries WHERE namespace = ? AND key IN ("
+                        "SELECT key FROM cache_entries WHERE namespace = ? "
+                        "ORDER BY accessed_at ASC LIMIT ?)",
+                        (self.namespace, self.namespace, count - self.max_entries),
+                    )
+        except (sqlite3.Error, OSError) as e:
+            print(f"Cache write failed ({self.namespace}): {e}")
+
+    def delete(self, key: str) -> None:
+        """Remove a single entry."""
+        if not self.enabled:
+            return
+        try:
+            with self._lock:
+                self._connection().execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                )
+        except (sqlite3.Error, OSError) as e:
+            print(f"Cache delete failed ({self.namespace}): {e}")
+
+    def clear(self) -> None:
+        """Remove every entry in this namespace."""
+        if not self.enabled:
+            return
+        try:
+            with self._lock:
+                self._connection().execute(
+                    "DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,)
+                )
+        except (sqlite3.Error, OSError) as e:
+            print(f"Cache clear failed ({self.namespace}): {e}")
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for this process plus the current entry count."""
+        entries = 0
+        if self.enabled:
+            try:
+                with self._lock:
+                    (entries,) = self._connection().execute(
+                        "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?",
+                        (self.namespace,),
+                    ).fetchone()
+            except (sqlite3.Error, OSError):
+                pass
+        lookups = self.hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": entries,
+            "ttl": self.ttl,
+            "max_entries": self.max_entries,
+        }
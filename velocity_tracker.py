@@ -0,0 +1,226 @@
+"""
+Engagement velocity tracking for watched Reddit threads.
+
+A watched set of thread fullnames is re-polled on a schedule through a bulk
+lookup (RedditScraper re-fetches them 100 ids per /api/info request), so
+polling cost grows with the number of batches rather than the number of
+threads. Each poll appends a compact delta sample (seconds, score delta,
+comment delta) per thread; velocity and acceleration of the engagement score
+are derived from the latest samples and can be used as ranking inputs.
+"""
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from ttl_cache import open_sqlite, transaction
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS watched (
+    fullname TEXT PRIMARY KEY,
+    last_ts INTEGER,
+    last_score INTEGER,
+    last_comments INTEGER
+);
+CREATE TABLE IF NOT EXISTS samples (
+    fullname TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    dt INTEGER NOT NULL,
+    d_score INTEGER NOT NULL,
+    d_comments INTEGER NOT NULL,
+    PRIMARY KEY (fullname, ts)
+) WITHOUT ROWID;
+"""
+# Engagement weights match RedditScraper._calculate_engagement_score
+_COMMENT_WEIGHT = 2
+
+
+class VelocityTracker:
+    """Persistent per-thread score/comment time series with velocity estimates."""
+
+    def __init__(
+        self,
+        fetch: Callable[[List[str]], Dict[str, Dict]],
+        path: str,
+        max_samples: int = 96,
+        max_watched: int = 1000,
+    ):
+        """
+        Initialize the tracker.
+
+        Args:
+            fetch: Bulk lookup returning fresh raw post data keyed by fullname
+            path: SQLite database file (created if missing)
+            max_samples: Delta samples kept per thread
+            max_watched: Threads watched at once (the oldest are dropped first)
+        """
+        self.fetch = fetch
+        self.path = path
+        self.max_samples = max_samples
+        self.max_watched = max_watched
+        self.interval = 3600.0
+        self.polls = 0
+
+        self._lock = threading.Lock()
+        self._connection = open_sqlite(path, SCHEMA)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, fullnames: Iterable[str]) -> None:
+        """Add threads to the watched set, dropping the oldest past max_watched."""
+        rows = [(name,) for name in fullnames if name and name != "t3_"]
+        if not rows:
+            return
+        with self._lock:
+            with transaction(self._connection()) as conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO watched (fullname) VALUES (?)", rows
+                )
+                (count,) = conn.execute("SELECT COUNT(*) FROM watched").fetchone()
+                if count > self.max_watched:
+                    dropped = conn.execute(
+                        "SELECT fullname FROM watched ORDER BY rowid LIMIT ?",
+                        (count - self.max_watched,),
+                    ).fetchall()
+                    conn.executemany("DELETE FROM watched WHERE fullname = ?", dropped)
+                    conn.executemany("DELETE FROM samples WHERE fullname = ?", dropped)
+
+    def unwatch(self, fullnames: Iterable[str]) -> None:
+        """Stop tracking threads and drop their history."""
+        rows = [(name,) for name in fullnames]
+        with self._lock:
+            conn = self._connection()
+            conn.executemany("DELETE FROM watched WHERE fullname = ?", rows)
+            conn.executemany("DELETE FROM samples WHERE fullname = ?", rows)
+
+    def watched(self) -> List[str]:
+        with self._lock:
+            rows = self._connection().execute("SELECT fullname FROM watched").fetchall()
+        return [row[0] for row in rows]
+
+    def poll(self) -> int:
+        """
+        Re-fetch every watched thread once and record a sample for each.
+
+        Returns:
+            Number of threads sampled
+        """
+        with self._lock:
+            previous = {
+                row[0]: row[1:]
+                for row in self._connection().execute(
+                    "SELECT fullname, last_ts, last_score, last_comments FROM watched"
+                )
+            }
+        if not previous:
+            return 0
+
+        fresh = self.fetch(list(previous))
+        now = int(time.time())
+        samples = []
+        latest = []
+        for name, raw in fresh.items():
+            if name not in previous:
+                continue
+            score = int(raw.get("score", 0))
+            comments = int(raw.get("num_comments", 0))
+            last_ts, last_score, last_comments = previous[name]
+            if last_ts is not None and now > last_ts:
+                samples.append(
+                    (name, now, now - last_ts, score - last_score, comments - last_comments)
+                )
+            latest.append((now, score, comments, name))
+
+        with self._lock:
+            with transaction(self._connection()) as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO samples (fullname, ts, dt, d_score, d_comments) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    samples,
+                )
+                conn.executemany(
+                    "UPDATE watched SET last_ts = ?, last_score = ?, last_comments = ? "
+                    "WHERE fullname = ?",
+                    latest,
+                )
+                # Keep roughly max_samples polls of history per thread
+                conn.execute(
+                    "DELETE FROM samples WHERE ts <= ?",
+                    (now - int(self.interval * self.max_samples),),
+                )
+        self.polls += 1
+        return len(latest)
+
+    def velocities(self, fullnames: Iterable[str]) -> Dict[str, Dict]:
+        """
+        Velocity and acceleration of engagement for the given threads.
+
+        Returns:
+            fullname -> {"velocity": engagement per hour over the latest
+            interval, "acceleration": change in velocity per hour,
+            "score_per_hour", "comments_per_hour"}. Threads with no samples
+            yet are omitted.
+        """
+        names = list(dict.fromkeys(fullnames))
+        if not names:
+            return {}
+
+        result: Dict[str, Dict] = {}
+        with self._lock:
+            conn = self._connection()
+            for start in range(0, len(names), 500):
+                chunk = names[start : start + 500]
+                rows = conn.execute(
+                    "SELECT fullname, dt, d_score, d_comments FROM ("
+                    "  SELECT fullname, dt, d_score, d_comments, ROW_NUMBER() OVER ("
+                    "    PARTITION BY fullname ORDER BY ts DESC) AS rn "
+                    f"  FROM samples WHERE fullname IN ({','.join('?' * len(chunk))})"
+                    ") WHERE rn <= 2 ORDER BY fullname, rn",
+                    chunk,
+                ).fetchall()
+                latest: Dict[str, List] = {}
+                for name, dt, d_score, d_comments in rows:
+                    latest.setdefault(name, []).append((dt, d_score, d_comments))
+                for name, recent in latest.items():
+                    result[name] = self._rates(recent)
+        return result
+
+    @staticmethod
+    def _rates(recent: List) -> Dict:
+        """Per-hour rates from the newest sample (and the one before it)."""
+        dt, d_score, d_comments = recent[0]
+        hours = max(dt, 1) / 3600
+        velocity = (d_score + d_comments * _COMMENT_WEIGHT) / hours
+        acceleration = 0.0
+        if len(recent) > 1:
+            prev_dt, prev_score, prev_comments = recent[1]
+            prev_hours = max(prev_dt, 1) / 3600
+            prev_velocity = (prev_score + prev_comments * _COMMENT_WEIGHT) / prev_hours
+            acceleration = (velocity - prev_velocity) / ((hours + prev_hours) / 2)
+        return {
+            "velocity": round(velocity, 3),
+            "acceleration": round(acceleration, 3),
+            "score_per_hour": round(d_score / hours, 3),
+            "comments_per_hour": round(d_comments / hours, 3),
+        }
+
+    def start(self, interval: float = 3600) -> None:
+        """Poll in a background thread every `interval` seconds."""
+        if self._thread and self._thread.is_alive():
+            return
+        self.interval = interval
+        self._stop.clear()
+
+        def run():
+            while not self._stop.is_set():
+                try:
+                    self.poll()
+                except Exception as e:
+                    print(f"Velocity poll failed: {e}")
+                self._stop.wait(interval)
+
+        self._thread = threading.Thread(target=run, name="velocity-tracker", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop background polling."""
+        self._stop.set()
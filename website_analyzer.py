@@ -1,16 +1,43 @@
 """
 Website Analyzer - Extracts product information from websites.
+
+LLM answers are cached on disk under a hash of the page content they were
+derived from, so re-analyzing an unchanged page costs no OpenAI call while
+an edited page misses the cache and is analyzed again.
 """
+import hashlib
+import json
 import os
 from dotenv import load_dotenv
 from openai import OpenAI
-from typing import Dict, Optional
-import requests
-from urllib.parse import urlparse
-import re
+from typing import Dict
+from html_extract import PageExtractor, PageInfo
+from page_fetcher import default_fetcher
+from site_crawler import crawler_from_env
+from structured_data import is_complete, known_fields, product_info_from_page
+from ttl_cache import TTLCache, cache_path
 
 load_dotenv()
 
+# Fields extracted for every website, with the format hint given to the LLM
+PRODUCT_FIELDS = {
+    "product_name": '"Name of the product/service"',
+    "product_description": '"Clear description of what the product does and its value proposition"',
+    "product_features": '["feature1", "feature2", "feature3"]',
+    "pricing": '"Pricing information if available (e.g., $29/month, Free, Contact for pricing)"',
+    "target_audience": '"Who this product is for"',
+    "key_benefits": '["benefit1", "benefit2"]',
+    "product_type": '"Type of product (SaaS, Mobile App, Website, etc.)"',
+}
+# Essential fields structured data must fill before the LLM gets the short
+# prompt (the missing fields only, with a shorter page excerpt)
+PARTIAL_PROMPT_MIN_FIELDS = 3
+PARTIAL_PROMPT_CHARS = 4000
+MODEL = "gpt-4o-mini"
+# Part of every cache key: bump when the prompts, fields or model change so
+# earlier answers are no longer reused
+PROMPT_VERSION = "2"
+
 
 class WebsiteAnalyzer:
     """Analyzes websites to extract product information."""
@@ -22,95 +49,178 @@ class WebsiteAnalyzer:
             raise ValueError("OPENAI_API_KEY not found in environment variables")
         
         self.client = OpenAI(api_key=api_key)
+        # Shared with WebsiteScraper: one download per page, cached on disk
+        self.fetcher = default_fetcher()
+        # Answer from JSON-LD/OpenGraph data alone when it covers the essentials
+        self.skip_llm = os.getenv("ANALYZER_STRUCTURED_SKIP_LLM", "1") == "1"
+        # LLM answers by content hash; entries for edited pages simply age out
+        self.cache = TTLCache(
+            cache_path("website_analysis.sqlite3"),
+            namespace="website_analysis",
+            ttl=float(os.getenv("ANALYZER_CACHE_TTL", str(30 * 86400))),
+            max_entries=int(os.getenv("ANALYZER_CACHE_MAX_ENTRIES", "2000")),
+        )
+        # Multi-page mode: homepage plus pricing/features/about pages
+        self.crawler = crawler_from_env(self.fetcher, text_budget=10000)
     
-    def fetch_website_content(self, url: str) -> str:
+    def fetch_page(self, url: str, text_limit: int = 10000) -> PageInfo:
         """
-        Fetch and extract text content from a website.
-        
+        Fetch a website and extract its text, metadata and structured data.
+
         Args:
             url: Website URL to analyze
-            
+            text_limit: Characters of visible text to collect
+
         Returns:
-            Extracted text content from the website
+            PageInfo for the page
         """
         try:
-            # Add headers to mimic a browser
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            # Extract text from HTML (simple approach)
-            # Remove script and style tags
-            content = response.text
-            content = re.sub(r'<script[^>]*>.*?</script>', '', content, flags=re.DOTALL | re.IGNORECASE)
-            content = re.sub(r'<style[^>]*>.*?</style>', '', content, flags=re.DOTALL | re.IGNORECASE)
-            
-            # Extract text from HTML tags
-            text = re.sub(r'<[^>]+>', ' ', content)
-            text = re.sub(r'\s+', ' ', text)
-            
-            # Limit content length
-            return text[:10000]  # First 10k characters
+            # Browser-like fetch, served from / revalidated against the page
+            # cache. Text is extracted while the page streams in; past the
+            # first 10k characters only structured data is still read, for a
+            # bounded stretch (html_extract.STRUCTURED_SCAN_CHARS), then the
+            # download stops.
+            extractor = PageExtractor(text_limit=text_limit, scan_structured=True)
+            self.fetcher.fetch(
+                url, timeout=10, consume=extractor.feed, text_limit=text_limit
+            )
+            return extractor.close()
             
         except Exception as e:
             raise Exception(f"Error fetching website: {str(e)}")
     
-    def analyze_website(self, url: str) -> Dict:
+    def fetch_website_content(self, url: str, crawl: bool = False) -> str:
         """
-        Analyze a website and extract product information using AI.
+        Fetch and extract text content from a website.
         
         Args:
             url: Website URL to analyze
+            crawl: Also read the site's pricing/features/about pages
             
         Returns:
-            Dictionary containing extracted product information
+            Extracted text content from the website
         """
-        try:
-            # Fetch website content
-            website_content = self.fetch_website_content(url)
-            
-            # Use AI to extract product information
-            prompt = f"""Analyze this website content and extract key product information.
+        if crawl:
+            site = self.crawler.crawl(url)
+            if site.pages:
+                return site.text
+        return self.fetch_page(url).text
+    
+    def _prompt(self, url: str, content: str, known: Dict) -> str:
+        """Analysis prompt, asking only for missing fields when most are known."""
+        if known_fields(known) < PARTIAL_PROMPT_MIN_FIELDS:
+            known = {}
+        missing = {field: hint for field, hint in PRODUCT_FIELDS.items() if field not in known}
+        schema = ",\n".join(f'    "{field}": {hint}' for field, hint in missing.items())
+        if not known:
+            return f"""Analyze this website content and extract key product information.
 
 Website URL: {url}
 Website Content (first 10k chars):
-{website_content[:10000]}
+{content[:10000]}
 
 Extract and provide the following information in JSON format:
 {{
-    "product_name": "Name of the product/service",
-    "product_description": "Clear description of what the product does and its value proposition",
-    "product_features": ["feature1", "feature2", "feature3"],
-    "pricing": "Pricing information if available (e.g., $29/month, Free, Contact for pricing)",
-    "target_audience": "Who this product is for",
-    "key_benefits": ["benefit1", "benefit2"],
-    "product_type": "Type of product (SaaS, Mobile App, Website, etc.)"
+{schema}
 }}
 
 Be thorough and extract as much information as possible. If information is not available, use "Not specified" or empty arrays/lists."""
 
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert at analyzing websites and extracting product information. You provide accurate, structured information in JSON format."
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                response_format={"type": "json_object"}
-            )
+        # Structured data already answered most of it: a shorter excerpt is
+        # enough context for the rest
+        limit = PARTIAL_PROMPT_CHARS
+        return f"""Complete the product information for this website.
+
+Website URL: {url}
+Known from the site's structured data:
+{json.dumps(known, ensure_ascii=False)}
+Website Content (first {limit // 1000}k chars):
+{content[:limit]}
+
+Provide only the following missing information in JSON format:
+{{
+{schema}
+}}
+
+If information is not available, use "Not specified" or empty arrays/lists."""
+
+    @staticmethod
+    def _cache_key(url: str, content: str, known: Dict) -> str:
+        """Cache key for the LLM answer about this page content."""
+        digest = hashlib.sha256()
+        # Whitespace and case changes alone do not warrant a new analysis
+        digest.update(" ".join(content.split()).casefold().encode("utf-8"))
+        digest.update(json.dumps(known, sort_keys=True).encode("utf-8"))
+        return f"v{PROMPT_VERSION}:{MODEL}:{url}:{digest.hexdigest()}"
+
+    def _ask_llm(self, url: str, content: str, known: Dict) -> Dict:
+        """The LLM's product information, reused while the content is unchanged."""
+        cache_key = self._cache_key(url, content, known)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return json.loads(cached)
+
+        response = self.client.chat.completions.create(
+            model=MODEL,
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are an expert at analyzing websites and extracting product information. You provide accurate, structured information in JSON format."
+                },
+                {"role": "user", "content": self._prompt(url, content, known)}
+            ],
+            temperature=0.3,
+            response_format={"type": "json_object"}
+        )
+        
+        product_data = json.loads(response.choices[0].message.content)
+        self.cache.set(cache_key, json.dumps(product_data))
+        return product_data
+
+    def analyze_website(self, url: str, crawl: bool = False) -> Dict:
+        """
+        Analyze a website and extract product information using AI.
+        
+        Product name, description, features, pricing and type published as
+        JSON-LD/OpenGraph data are read directly; the LLM is only asked for
+        what is missing, and not called at all when nothing essential is.
+        
+        Args:
+            url: Website URL to analyze
+            crawl: Also read the site's pricing/features/about pages (see
+                   site_crawler), merged into one 10k-character text
+            
+        Returns:
+            Dictionary containing extracted product information
+        """
+        try:
+            # Fetch website content
+            site = self.crawler.crawl(url) if crawl else None
+            if site is not None and site.pages:
+                content = site.text
+                # Structured data from any page; the homepage's wins
+                known = {}
+                for crawled in reversed(site.pages):
+                    known.update(product_info_from_page(crawled.info))
+            else:
+                # Single page (or robots.txt does not allow crawling)
+                site = None
+                page = self.fetch_page(url)
+                content = page.text
+                known = product_info_from_page(page)
             
-            product_info = response.choices[0].message.content
-            import json
-            product_data = json.loads(product_info)
+            if self.skip_llm and is_complete(known):
+                product_data = {"target_audience": "Not specified", "key_benefits": [], **known}
+                product_data["analysis_source"] = "structured_data"
+            else:
+                # Use AI to extract product information
+                product_data = {**self._ask_llm(url, content, known), **known}
+                product_data["analysis_source"] = "structured_data+llm" if known else "llm"
             
             # Add the URL
             product_data["source_url"] = url
+            if site is not None:
+                product_data["crawled_pages"] = [crawled.url for crawled in site.pages]
             
             return product_data
             